@@ -4,22 +4,34 @@ import seaborn as sns
 import numpy as np
 from matplotlib.patches import Rectangle
 import warnings
+import os
+import sys
+from functools import partial
 warnings.filterwarnings('ignore')
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from survey_tools.association import association_battery, association_matrix, print_battery
+from survey_tools.chart_metadata import chart_metadata
+from survey_tools.logistic import logistic_by_stratum, plot_forest
+from survey_tools.loglinear import loglinear_analysis, print_loglinear
+from survey_tools.power import estimate_effects, plot_power_curves, power_curves, required_sample_size
+from survey_tools.respondents import load_respondents
+from survey_tools.variance import crosstab_se, format_se_table
+from survey_tools.weights import design_effect, load_margins, rake
+
 # Set style for better-looking plots
 plt.style.use('default')
 sns.set_palette("husl")
 
-# Read the CSV file
-df = pd.read_csv('Data2.csv')
+# Project the three questions out of the Section A respondent store
+# (survey_tools/respondents.py); answers are already canonical
+df = load_respondents(['Socioeconomic_Class', 'Consanguinity', 'Religion'], categorical=False)
+df = df.reset_index(drop=True)
+chart_meta = partial(chart_metadata, 'Data2.csv', script=__file__)
 
-# Clean column names
+# Short column names
 df.columns = ['socioeconomic_class', 'marriage_consanguineous', 'religion']
 
-# Strip whitespace from string columns
-df['marriage_consanguineous'] = df['marriage_consanguineous'].str.strip()
-df['religion'] = df['religion'].str.strip()
-
 # Remove rows where all values are missing
 df_clean = df.dropna(how='all')
 
@@ -71,7 +83,8 @@ ax.text(0.02, 0.98, f'Total Valid Responses: {len(df_valid)}',
         color='black')
 
 plt.tight_layout()
-plt.savefig('1_socioeconomic_distribution.png', dpi=300, bbox_inches='tight')
+plt.savefig('1_socioeconomic_distribution.png', dpi=300, bbox_inches='tight',
+            metadata=chart_meta('socioeconomic_class', n=len(df_valid), title='Distribution of Socioeconomic Classes'))
 plt.close()
 print("✓ Saved: 1_socioeconomic_distribution.png")
 
@@ -119,7 +132,8 @@ ax.text(0.02, 0.98, f'Total Valid Responses: {len(df_valid)}',
         color='black')
 
 plt.tight_layout()
-plt.savefig('2_marriage_consanguinity_distribution.png', dpi=300, bbox_inches='tight')
+plt.savefig('2_marriage_consanguinity_distribution.png', dpi=300, bbox_inches='tight',
+            metadata=chart_meta('marriage_consanguineous', n=len(df_valid), title='Distribution of Marriage Consanguinity'))
 plt.close()
 print("✓ Saved: 2_marriage_consanguinity_distribution.png")
 
@@ -167,7 +181,8 @@ ax.text(0.02, 0.98, f'Total Valid Responses: {len(df_valid)}',
         color='black')
 
 plt.tight_layout()
-plt.savefig('3_religion_distribution.png', dpi=300, bbox_inches='tight')
+plt.savefig('3_religion_distribution.png', dpi=300, bbox_inches='tight',
+            metadata=chart_meta('religion', n=len(df_valid), title='Distribution of Religion'))
 plt.close()
 print("✓ Saved: 3_religion_distribution.png")
 
@@ -220,7 +235,8 @@ ax.text(0.02, 0.98, f'Total Valid Responses: {len(df_valid)}',
         color='black')
 
 plt.tight_layout()
-plt.savefig('4_socioeconomic_vs_marriage.png', dpi=300, bbox_inches='tight')
+plt.savefig('4_socioeconomic_vs_marriage.png', dpi=300, bbox_inches='tight',
+            metadata=chart_meta('socioeconomic_class x marriage_consanguineous', n=len(df_valid)))
 plt.close()
 print("✓ Saved: 4_socioeconomic_vs_marriage.png")
 
@@ -273,7 +289,8 @@ ax.text(0.02, 0.98, f'Total Valid Responses: {len(df_valid)}',
         color='black')
 
 plt.tight_layout()
-plt.savefig('5_socioeconomic_vs_religion.png', dpi=300, bbox_inches='tight')
+plt.savefig('5_socioeconomic_vs_religion.png', dpi=300, bbox_inches='tight',
+            metadata=chart_meta('socioeconomic_class x religion', n=len(df_valid)))
 plt.close()
 print("✓ Saved: 5_socioeconomic_vs_religion.png")
 
@@ -324,7 +341,8 @@ ax.text(0.02, 0.98, f'Total Valid Responses: {len(df_valid)}',
         color='black')
 
 plt.tight_layout()
-plt.savefig('6_religion_vs_marriage.png', dpi=300, bbox_inches='tight')
+plt.savefig('6_religion_vs_marriage.png', dpi=300, bbox_inches='tight',
+            metadata=chart_meta('religion x marriage_consanguineous', n=len(df_valid)))
 plt.close()
 print("✓ Saved: 6_religion_vs_marriage.png")
 
@@ -393,14 +411,123 @@ for marriage_type in ['Yes', 'No']:
                 color='black')
         
         plt.tight_layout()
-        plt.savefig(f'7_threeway_heatmap_{marriage_type.lower()}.png', dpi=300, bbox_inches='tight')
+        plt.savefig(f'7_threeway_heatmap_{marriage_type.lower()}.png', dpi=300, bbox_inches='tight',
+                    metadata=chart_meta('socioeconomic_class x religion x marriage_consanguineous',
+                                        n=total_for_type,
+                                        title=f'Socioeconomic Class vs Religion (Marriage Consanguineous: {marriage_type})'))
         plt.close()
         print(f"✓ Saved: 7_threeway_heatmap_{marriage_type.lower()}.png")
 
+# Log-linear models for the three-way table behind the heatmaps
+loglinear_models, loglinear_terms = loglinear_analysis(
+    df_valid, ['socioeconomic_class', 'religion', 'marriage_consanguineous'])
+print("\nLog-linear models (socioeconomic class × religion × marriage):")
+print_loglinear(loglinear_models, loglinear_terms)
+loglinear_models.to_csv('loglinear_socio_religion_marriage.csv', index=False)
+print("✓ Saved: loglinear_socio_religion_marriage.csv")
+
+# Adjusted odds of consanguineous marriage by class and religion
+logit_table = logistic_by_stratum(df_valid, 'marriage_consanguineous', ['socioeconomic_class', 'religion'])
+print("\nLogistic regression (marriage_consanguineous = Yes):")
+logit_estimable = logit_table['odds_ratio'].notna() & logit_table['converged']
+print(logit_table.loc[logit_estimable, ['term', 'odds_ratio', 'or_low', 'or_high', 'p_value']]
+      .round(3).to_string(index=False))
+omitted = logit_table.loc[~logit_estimable & (logit_table['separated'] | ~logit_table['converged']), 'term']
+if len(omitted):
+    print(f"Not estimable (separated levels): {', '.join(omitted)}")
+logit_table.to_csv('logistic_consanguinity.csv', index=False)
+plot_forest(logit_table, '9_consanguinity_odds_ratios.png',
+            title='Adjusted Odds Ratios for Consanguineous Marriage',
+            metadata=chart_meta('marriage_consanguineous ~ socioeconomic_class + religion',
+                                n=int(logit_table['n'].iloc[0]),
+                                title='Adjusted Odds Ratios for Consanguineous Marriage'))
+print("✓ Saved: logistic_consanguinity.csv")
+print("✓ Saved: 9_consanguinity_odds_ratios.png")
+
+# ===================================================================
+# ANALYSIS 8: Population-weighted Consanguinity (raked to census margins)
+# ===================================================================
+print("\nANALYSIS 8: Population-weighted Consanguinity")
+print("-" * 60)
+weights, rake_info = rake(df_valid, load_margins(), return_info=True)
+print(f"Raked on: {', '.join(rake_info['columns'])} "
+      f"({rake_info['iterations']} iterations, design effect {design_effect(weights):.2f})")
+is_consanguineous = (df_valid['marriage_consanguineous'] == 'Yes').to_numpy()
+overall_shares = (f"{is_consanguineous.mean() * 100:.1f}% unweighted, "
+                  f"{np.average(is_consanguineous, weights=weights) * 100:.1f}% weighted")
+print(f"Overall % consanguineous: {overall_shares}")
+
+# Shares within the levels of a raking variable are identical by
+# construction, so only the variables weighting can change are compared
+weighted_panels = [(col, label) for col, label in [('religion', 'Religion'), ('socioeconomic_class', 'Socioeconomic Class')]
+                   if col not in rake_info['columns']]
+fig, axes = plt.subplots(1, len(weighted_panels), figsize=(8 * len(weighted_panels), 7), squeeze=False)
+for ax, (col, label) in zip(axes[0], weighted_panels):
+    # Taylor-linearized standard errors (respondents as independent PSUs)
+    estimates = {name: crosstab_se(df_valid[col], df_valid['marriage_consanguineous'], weights=w)
+                 for name, w in [('Unweighted', None), ('Weighted', weights)]}
+    shares = pd.DataFrame({name: pct['Yes'] for name, (pct, _) in estimates.items()})
+    print(f"\n% consanguineous by {label} (standard error):")
+    print(pd.DataFrame({name: format_se_table(pct, se)['Yes']
+                        for name, (pct, se) in estimates.items()}).to_string())
+    shares.plot(kind='bar', ax=ax, color=['#BDBDBD', '#4ECDC4'], edgecolor='black', width=0.7)
+    for container in ax.containers:
+        ax.bar_label(container, fmt='%.1f%%', padding=3, fontsize=9, fontweight='bold')
+    ax.set_xlabel(label, fontsize=12, fontweight='bold')
+    ax.set_ylabel('% Consanguineous Marriage', fontsize=12, fontweight='bold')
+    ax.set_ylim(0, shares.to_numpy().max() * 1.15)
+    ax.tick_params(axis='x', rotation=0)
+    ax.grid(axis='y', alpha=0.3, linestyle='--')
+plt.suptitle(f'Consanguineous Marriage, Unweighted vs Raked to Population Margins\n'
+             f'Overall: {overall_shares} | Total Valid Responses: {len(df_valid)}', fontsize=14, fontweight='bold')
+plt.tight_layout()
+plt.savefig('10_weighted_consanguinity.png', dpi=300, bbox_inches='tight',
+            metadata=chart_meta(f"marriage_consanguineous by {', '.join(col for col, _ in weighted_panels)} (weighted)",
+                                n=len(df_valid), title='Consanguineous Marriage, Unweighted vs Raked'))
+plt.close()
+print("✓ Saved: 10_weighted_consanguinity.png")
+
+# ===================================================================
+# ANALYSIS 9: Sample Size for the Next Survey Round (simulated power)
+# ===================================================================
+print("\nANALYSIS 9: Sample Size for the Next Survey Round")
+print("-" * 60)
+# Groups under POWER_MIN_GROUP respondents are left out: the one Christian and
+# one Sikh respondent have 100% rates that would dominate the planning number
+POWER_MIN_GROUP = 10
+power_frames = []
+for col, label in [('religion', 'Religion'), ('socioeconomic_class', 'Socioeconomic Class')]:
+    effects = estimate_effects(df_valid, col, 'marriage_consanguineous', min_group=POWER_MIN_GROUP)
+    curves = power_curves(effects, sample_sizes=range(50, 2001, 50), workers=1)
+    power_frames.append(curves.assign(label=label))
+    needed = ', '.join(f"{test}: {n if n else '> 2000'}" for test, n in required_sample_size(curves).items())
+    print(f"Respondents needed for 80% power, consanguinity by {label} ({needed}; "
+          f"groups: {', '.join(map(str, effects['levels']))})")
+power_table = pd.concat(power_frames, ignore_index=True)
+power_table.to_csv('power_curves.csv', index=False)
+plot_power_curves(power_table, '11_power_curves.png',
+                  title='Power to Detect Differences in Consanguinity Rate\n'
+                        '(effect sizes estimated from the current survey)',
+                  metadata=chart_meta('power: marriage_consanguineous by religion, socioeconomic_class',
+                                      n=len(df_valid)))
+print("✓ Saved: 11_power_curves.png, power_curves.csv")
+
+# ============================================================================
+# ASSOCIATION TESTS (every pair of categorical columns)
+# ============================================================================
+print("\nASSOCIATION TESTS")
+print("-"*60)
+# workers=1: this script has no __main__ guard, so no process pool
+associations = association_battery(df_clean, columns=['socioeconomic_class', 'marriage_consanguineous', 'religion'], permutations=2000, workers=1)
+print_battery(associations)
+associations.to_csv('association_battery.csv', index=False)
+print(f"\nCramér's V matrix:\n{association_matrix(associations).round(3)}")
+print("✓ Saved: association_battery.csv")
+
 print("\n" + "="*60 + "\n")
 print("All analyses completed successfully!")
 print(f"\nSummary:")
 print(f"- Total records in dataset: {len(df)}")
 print(f"- Valid records analyzed: {len(df_valid)}")
 print(f"- Missing/Invalid records: {len(df) - len(df_valid)}")
-print(f"- Generated 8 visualization files")
+print(f"- Generated 11 visualization files")
@@ -3,33 +3,37 @@ import matplotlib.pyplot as plt
 import numpy as np
 from matplotlib.patches import Rectangle
 import warnings
+import os
+import sys
+from functools import partial
 warnings.filterwarnings('ignore')
 
-# Read the CSV file
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from survey_tools.chart_metadata import chart_metadata
+from survey_tools.exact_test import format_exact_result, monte_carlo_exact_test
+from survey_tools.kinship import DEFAULT_ALLELE_FREQUENCY, risk_by_stratum
+from survey_tools.respondents import load_respondents
+
+# Project the questions out of the Section A respondent store
+# (survey_tools/respondents.py); answers are already canonical and the
+# repeated kuppuswamy column is coalesced into Socioeconomic_Class
+education_col = 'Education_Level'
+consanguineous_col = 'Consanguinity'
+relation_col = 'Spouse_Relation'
+class_col = 'Socioeconomic_Class'
 try:
-    df = pd.read_csv('DATA.csv')
+    df = load_respondents([education_col, consanguineous_col, relation_col, class_col], categorical=False)
+    df = df.reset_index(drop=True)
+    chart_meta = partial(chart_metadata, 'DATA.csv', script=__file__)
     print("Data loaded successfully!")
     print(f"Total rows in dataset: {len(df)}")
 except FileNotFoundError:
-    print("Error: DATA.csv file not found!")
+    print("Error: no Section A source CSV found!")
     exit()
 except Exception as e:
     print(f"Error reading file: {e}")
     exit()
 
-# Clean column names (remove extra spaces and newlines)
-df.columns = df.columns.str.strip().str.replace('\n', ' ')
-
-# Identify the correct column names
-education_col = '7) Highest Education Level Completed(of respondent):'
-consanguineous_col = '2) Is your marriage consanguineous (i.e., with a blood relative)?'
-relation_col = '(If Yes) What is the relation between you and your spouse?'
-
-# Clean the data
-df[education_col] = df[education_col].str.strip()
-df[consanguineous_col] = df[consanguineous_col].str.strip()
-df[relation_col] = df[relation_col].str.strip()
-
 # Remove rows with missing education data
 df_clean = df[df[education_col].notna() & (df[education_col] != '')]
 print(f"Rows with valid education data: {len(df_clean)}")
@@ -105,7 +109,8 @@ ax1.text(
 )
 
 plt.tight_layout()
-plt.savefig('education_level_piechart.png', dpi=300, bbox_inches='tight', facecolor='white')
+plt.savefig('education_level_piechart.png', dpi=300, bbox_inches='tight', facecolor='white',
+            metadata=chart_meta('Education_Level', n=total_valid_education, title='Highest Education Level Completed'))
 print("\n✓ Pie chart saved as 'education_level_piechart.png'")
 plt.close()
 
@@ -239,7 +244,8 @@ fig2.text(0.5, 0.02, total_text, ha='center', fontsize=11, weight='bold',
          edgecolor='black', linewidth=1.5))
 
 plt.tight_layout(rect=[0, 0.04, 1, 1])
-plt.savefig('education_vs_consanguineous.png', dpi=300, bbox_inches='tight', facecolor='white')
+plt.savefig('education_vs_consanguineous.png', dpi=300, bbox_inches='tight', facecolor='white',
+            metadata=chart_meta('Education_Level x Consanguinity', n=len(df_compare), title='Education Level vs Consanguineous Marriage'))
 print("\n✓ Comparison chart saved as 'education_vs_consanguineous.png'")
 plt.close()
 
@@ -336,7 +342,8 @@ if len(df_consang_yes) > 0:
              edgecolor='black', linewidth=1.5))
     
     plt.tight_layout(rect=[0, 0.04, 1, 1])
-    plt.savefig('relation_type_by_education.png', dpi=300, bbox_inches='tight', facecolor='white')
+    plt.savefig('relation_type_by_education.png', dpi=300, bbox_inches='tight', facecolor='white',
+                metadata=chart_meta('Education_Level x Spouse_Relation', n=total_consang, title='Spouse Relation by Education Level'))
     print("✓ Relation type chart saved as 'relation_type_by_education.png'")
     plt.close()
 
@@ -368,9 +375,34 @@ if len(df_consang_yes) > 0:
         print(f"{relation:30s} | Count: {int(count):3d} | Percentage: {pct:6.2f}%")
     print("-"*70)
     print(f"{'TOTAL':30s} | Count: {len(df_consang_yes):3d} | Percentage: 100.00%")
+
+    # Relation type by education level is a small, sparse table; workers=1
+    # keeps the replicates out of a process pool this unguarded script can't host
+    relation_exact = monte_carlo_exact_test(pivot_relation.values, replicates=1_000_000, workers=1)
+    print(f"Education x Relation exact test: {format_exact_result(relation_exact)}")
 else:
     print("No consanguineous marriages found in the dataset.")
 
+print("="*70)
+print(f"EXPECTED RECESSIVE RISK BY STRATUM (allele frequency {DEFAULT_ALLELE_FREQUENCY})")
+print("="*70)
+for stratum_col, stratum_label in [(education_col, 'Education level'), (class_col, 'Socioeconomic class')]:
+    risk = risk_by_stratum(df, stratum_col, relation_col, consanguineous_col)
+    print(f"{stratum_label:30s} | {'Scored':>6s} | {'Mean F':>7s} | {'Risk/1000':>9s} | {'Excess':>7s}")
+    for level, row in risk.iterrows():
+        print(f"{str(level):30s} | {int(row['n_scored']):6d} | {row['mean_inbreeding']:7.4f} | "
+              f"{row['risk_per_1000']:9.3f} | {row['excess_affected']:7.3f}")
+    print("-"*70)
+
+# Disease type lives in A/DATA.csv; the respondent store joins it to education
+print("="*70)
+print("EDUCATION x DISEASE TYPE (Section A respondent store)")
+print("="*70)
+joined = load_respondents(['Education_Level', 'Type_Of_Disease'], dropna=True)
+education_disease = pd.crosstab(joined['Education_Level'], joined['Type_Of_Disease'], margins=True,
+                                margins_name='Total')
+print(education_disease.to_string())
+print(f"Respondents with both answers: {len(joined)}")
 print("="*70)
 print("\n✓ All visualizations completed successfully!")
 print("\nGenerated files:")
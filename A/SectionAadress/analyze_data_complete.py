@@ -3,36 +3,59 @@ import matplotlib.pyplot as plt
 import numpy as np
 import warnings
 import os
+import sys
+from functools import partial
 warnings.filterwarnings('ignore')
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from survey_tools.association import association_battery, association_matrix, print_battery
+from survey_tools.chart_metadata import chart_metadata
+from survey_tools.correspondence import (coordinate_table, correspondence_analysis,
+                                         plot_ca_biplot, stacked_crosstab)
+from survey_tools.exact_test import exact_test_frame, format_exact_result
+from survey_tools.kinship import DEFAULT_ALLELE_FREQUENCY, risk_by_stratum
+from survey_tools.logistic import logistic_by_stratum, plot_forest
+from survey_tools.imputation import hot_deck, pooled_crosstab
+from survey_tools.missingness import MissingnessIndex, plot_patterns, print_patterns
+from survey_tools.respondents import ADDRESS_KEYS, load_respondents
+from survey_tools.variance import crosstab_se, jackknife_replicates
+from survey_tools.weights import design_effect, load_margins, rake
+
 # Create output directory for images
 output_dir = 'analysis_outputs'
 if not os.path.exists(output_dir):
     os.makedirs(output_dir)
     print(f"Created directory: {output_dir}\n")
 
-# Read the CSV file
-df = pd.read_csv('Data.csv')
+# Run the section analyses on hot-deck imputed answers instead of complete
+# cases (donors from the same location and consanguinity answer)
+IMPUTE_MISSING = False
 
-# Rename columns for easier handling
-df.columns = ['Consanguineous_Marriage', 'Socioeconomic_Class', 'Location_Type', 'Spouse_Relation', 'Education_Level']
+# Project the address questions out of the Section A respondent store
+# (survey_tools/respondents.py). Location_Type is only asked in this
+# section's Data.csv, so the store must have been built with it
+df = load_respondents(ADDRESS_KEYS, categorical=False, require=['A/SectionAadress/Data.csv'])
+df = df.reset_index(drop=True)
+chart_meta = partial(chart_metadata, 'Data.csv', script=__file__)
+df = df.rename(columns={'Consanguinity': 'Consanguineous_Marriage'})
 
 # Remove completely empty rows
 df = df.dropna(how='all')
 
-# Clean the data - remove extra whitespace and newlines
-df = df.apply(lambda x: x.str.strip() if x.dtype == "object" else x)
-df = df.apply(lambda x: x.str.replace('\n', '') if x.dtype == "object" else x)
-
-# Standardize education data
-df['Education_Level'] = df['Education_Level'].replace({
-    'Secondary school': 'Secondary School', 
-    'secondary school': 'Secondary School'
-})
+# The spouse relation is only asked of consanguineous couples, so it is not imputed
+df_observed = df
+if IMPUTE_MISSING:
+    df = hot_deck(df, columns=['Consanguineous_Marriage', 'Socioeconomic_Class', 'Location_Type',
+                               'Education_Level'],
+                  strata=['Location_Type', 'Consanguineous_Marriage'])
+    print(f"Missing answers imputed (hot-deck): {int(df_observed.isna().sum().sum() - df.isna().sum().sum())}\n")
 
 # Calculate total valid responses
 total_valid_responses = len(df)
 
+# Validity bitmasks: complete-case subsets and the missing-data panel
+missing = MissingnessIndex(df)
+
 # Location mapping
 location_map = {'R': 'Rural', 'S': 'Semi-urban', 'U': 'Urban'}
 
@@ -176,7 +199,7 @@ for bar, count, pct in zip(bars5, education_counts.values, education_percentages
 
 # 6. Missing Data
 ax6 = plt.subplot(2, 3, 6)
-missing_counts = df.isnull().sum()
+missing_counts = missing.missing_counts
 missing_counts = missing_counts[missing_counts > 0]
 missing_percentages = (missing_counts / total_valid_responses * 100)
 
@@ -205,7 +228,8 @@ else:
 
 plt.tight_layout(rect=[0, 0.03, 1, 0.96])
 output_file_1 = os.path.join(output_dir, '01_basic_distributions.png')
-plt.savefig(output_file_1, dpi=300, bbox_inches='tight', facecolor='white')
+plt.savefig(output_file_1, dpi=300, bbox_inches='tight', facecolor='white',
+            metadata=chart_meta('Basic distributions', n=total_valid_responses, title='Basic Data Analysis'))
 print(f"✓ Saved: {output_file_1}\n")
 plt.close()
 
@@ -218,7 +242,7 @@ fig2 = plt.figure(figsize=(14, 6))
 fig2.suptitle(f'Location vs Education Analysis\nTotal Valid Responses: {total_valid_responses}', 
              fontsize=14, fontweight='bold', color='black')
 
-df_loc_edu = df.dropna(subset=['Location_Type', 'Education_Level'])
+df_loc_edu = missing.complete('Location_Type', 'Education_Level')
 df_loc_edu = df_loc_edu[df_loc_edu['Location_Type'] != '']
 
 if len(df_loc_edu) > 0:
@@ -291,7 +315,8 @@ if len(df_loc_edu) > 0:
 
 plt.tight_layout(rect=[0, 0.03, 1, 0.96])
 output_file_2 = os.path.join(output_dir, '02_location_vs_education.png')
-plt.savefig(output_file_2, dpi=300, bbox_inches='tight', facecolor='white')
+plt.savefig(output_file_2, dpi=300, bbox_inches='tight', facecolor='white',
+            metadata=chart_meta('Location_Type x Education_Level', n=len(df_loc_edu), title='Location vs Education Analysis'))
 print(f"✓ Saved: {output_file_2}\n")
 plt.close()
 
@@ -304,7 +329,7 @@ fig3 = plt.figure(figsize=(16, 10))
 fig3.suptitle(f'Location vs Education vs Consanguinity Analysis\nTotal Valid Responses: {total_valid_responses}', 
              fontsize=14, fontweight='bold', color='black')
 
-df_triple = df.dropna(subset=['Location_Type', 'Education_Level', 'Consanguineous_Marriage'])
+df_triple = missing.complete('Location_Type', 'Education_Level', 'Consanguineous_Marriage')
 df_triple = df_triple[df_triple['Location_Type'] != '']
 
 if len(df_triple) > 0:
@@ -434,7 +459,9 @@ if len(df_triple) > 0:
 
 plt.tight_layout(rect=[0, 0.03, 1, 0.96])
 output_file_3 = os.path.join(output_dir, '03_location_education_consanguinity.png')
-plt.savefig(output_file_3, dpi=300, bbox_inches='tight', facecolor='white')
+plt.savefig(output_file_3, dpi=300, bbox_inches='tight', facecolor='white',
+            metadata=chart_meta('Location_Type x Education_Level x Consanguineous_Marriage', n=len(df_triple),
+                                title='Location vs Education vs Consanguinity Analysis'))
 print(f"✓ Saved: {output_file_3}\n")
 plt.close()
 
@@ -449,7 +476,7 @@ fig4.suptitle(f'Comparative Analysis: Consanguinity by Demographics\nTotal Valid
 
 # Plot 1: Consanguineous Marriage by Location
 ax_c1 = plt.subplot(1, 3, 1)
-df_clean = df.dropna(subset=['Consanguineous_Marriage', 'Location_Type'])
+df_clean = missing.complete('Consanguineous_Marriage', 'Location_Type')
 df_clean = df_clean[df_clean['Location_Type'] != '']
 crosstab_loc = pd.crosstab(df_clean['Location_Type'], df_clean['Consanguineous_Marriage'])
 crosstab_loc = crosstab_loc.reindex([x for x in ['R', 'S', 'U'] if x in crosstab_loc.index])
@@ -485,7 +512,7 @@ ax_c1.spines['right'].set_visible(False)
 
 # Plot 2: Consanguineous Marriage by Socioeconomic Class
 ax_c2 = plt.subplot(1, 3, 2)
-df_clean2 = df.dropna(subset=['Consanguineous_Marriage', 'Socioeconomic_Class'])
+df_clean2 = missing.complete('Consanguineous_Marriage', 'Socioeconomic_Class')
 crosstab_socio = pd.crosstab(df_clean2['Socioeconomic_Class'], df_clean2['Consanguineous_Marriage'])
 crosstab_socio = crosstab_socio.sort_index()
 
@@ -520,7 +547,7 @@ ax_c2.spines['right'].set_visible(False)
 
 # Plot 3: Socioeconomic Class by Location (Stacked)
 ax_c3 = plt.subplot(1, 3, 3)
-df_clean3 = df.dropna(subset=['Location_Type', 'Socioeconomic_Class'])
+df_clean3 = missing.complete('Location_Type', 'Socioeconomic_Class')
 df_clean3 = df_clean3[df_clean3['Location_Type'] != '']
 crosstab_loc_socio = pd.crosstab(df_clean3['Location_Type'], df_clean3['Socioeconomic_Class'])
 crosstab_loc_socio = crosstab_loc_socio.reindex([x for x in ['R', 'S', 'U'] if x in crosstab_loc_socio.index])
@@ -559,7 +586,9 @@ ax_c3.spines['right'].set_visible(False)
 
 plt.tight_layout(rect=[0, 0.03, 1, 0.96])
 output_file_4 = os.path.join(output_dir, '04_comparative_demographics.png')
-plt.savefig(output_file_4, dpi=300, bbox_inches='tight', facecolor='white')
+plt.savefig(output_file_4, dpi=300, bbox_inches='tight', facecolor='white',
+            metadata=chart_meta('Consanguineous_Marriage x Demographics', n=total_valid_responses,
+                                title='Comparative Analysis: Consanguinity by Demographics'))
 print(f"✓ Saved: {output_file_4}\n")
 plt.close()
 
@@ -573,7 +602,7 @@ fig5.suptitle(f'Location vs Education vs Socioeconomic Class Analysis\nTotal Val
              fontsize=15, fontweight='bold', color='black')
 
 # Filter data for triple analysis
-df_triple_class = df.dropna(subset=['Location_Type', 'Education_Level', 'Socioeconomic_Class'])
+df_triple_class = missing.complete('Location_Type', 'Education_Level', 'Socioeconomic_Class')
 df_triple_class = df_triple_class[df_triple_class['Location_Type'] != '']
 
 if len(df_triple_class) > 0:
@@ -899,7 +928,9 @@ if len(df_triple_class) > 0:
 
 plt.tight_layout(rect=[0, 0.03, 1, 0.96])
 output_file_5 = os.path.join(output_dir, '05_location_education_income_class.png')
-plt.savefig(output_file_5, dpi=300, bbox_inches='tight', facecolor='white')
+plt.savefig(output_file_5, dpi=300, bbox_inches='tight', facecolor='white',
+            metadata=chart_meta('Location_Type x Education_Level x Socioeconomic_Class', n=len(df_triple_class),
+                                title='Location vs Education vs Socioeconomic Class Analysis'))
 print(f"✓ Saved: {output_file_5}\n")
 plt.close()
 
@@ -915,7 +946,7 @@ print("Generating Image 6: Education by Location + Consanguinity...")
 fig6 = plt.figure(figsize=(16, 6))
 
 # Filter data
-df_loc_edu_consang = df.dropna(subset=['Location_Type', 'Education_Level', 'Consanguineous_Marriage'])
+df_loc_edu_consang = missing.complete('Location_Type', 'Education_Level', 'Consanguineous_Marriage')
 df_loc_edu_consang = df_loc_edu_consang[df_loc_edu_consang['Location_Type'] != '']
 total_valid_6 = len(df_loc_edu_consang)
 
@@ -1004,7 +1035,9 @@ if len(df_loc_edu_consang) > 0:
 
 plt.tight_layout(rect=[0, 0.03, 1, 0.96])
 output_file_6 = os.path.join(output_dir, '06_education_by_location_consanguinity.png')
-plt.savefig(output_file_6, dpi=300, bbox_inches='tight', facecolor='white')
+plt.savefig(output_file_6, dpi=300, bbox_inches='tight', facecolor='white',
+            metadata=chart_meta('Education_Level x Location_Type x Consanguineous_Marriage', n=total_valid_6,
+                                title='Education by Location with Consanguinity Comparison'))
 print(f"✓ Saved: {output_file_6}\n")
 plt.close()
 
@@ -1018,7 +1051,7 @@ print("Generating Image 7: Socioeconomic Class by Location + Consanguinity...")
 fig7 = plt.figure(figsize=(16, 6))
 
 # Filter data
-df_class_loc_consang = df.dropna(subset=['Location_Type', 'Socioeconomic_Class', 'Consanguineous_Marriage'])
+df_class_loc_consang = missing.complete('Location_Type', 'Socioeconomic_Class', 'Consanguineous_Marriage')
 df_class_loc_consang = df_class_loc_consang[df_class_loc_consang['Location_Type'] != '']
 total_valid_7 = len(df_class_loc_consang)
 
@@ -1107,13 +1140,196 @@ if len(df_class_loc_consang) > 0:
 
 plt.tight_layout(rect=[0, 0.03, 1, 0.96])
 output_file_7 = os.path.join(output_dir, '07_class_by_location_consanguinity.png')
-plt.savefig(output_file_7, dpi=300, bbox_inches='tight', facecolor='white')
+plt.savefig(output_file_7, dpi=300, bbox_inches='tight', facecolor='white',
+            metadata=chart_meta('Socioeconomic_Class x Location_Type x Consanguineous_Marriage', n=total_valid_7,
+                                title='Socioeconomic Class by Location with Consanguinity Comparison'))
 print(f"✓ Saved: {output_file_7}\n")
 plt.close()
 
 print("✓ Successfully generated Socioeconomic Class by Location with Consanguinity comparison!")
 print("="*80)
 
+# =============================================================================
+# ASSOCIATION TESTS (every pair of categorical columns)
+# =============================================================================
+print("\nASSOCIATION TESTS")
+print("-"*80)
+# workers=1: this script has no __main__ guard, so no process pool
+associations = association_battery(df, permutations=2000, workers=1)
+print_battery(associations)
+association_file = os.path.join(output_dir, 'association_battery.csv')
+associations.to_csv(association_file, index=False)
+print(f"\nCramér's V matrix:\n{association_matrix(associations).round(3)}")
+print(f"✓ Saved: {association_file}")
+
+# Spouse relation tables are sparse (consanguineous marriages only), so the
+# chi-square p-values above are backed by Monte Carlo exact tests
+df_related = df[(df['Consanguineous_Marriage'] == 'Yes') & df['Spouse_Relation'].notna()]
+for other in ['Socioeconomic_Class', 'Location_Type', 'Education_Level']:
+    exact = exact_test_frame(df_related, 'Spouse_Relation', other, replicates=1_000_000, workers=1)
+    print(f"Exact test Spouse_Relation x {other}: {format_exact_result(exact)}")
+print()
+
+# =============================================================================
+# LOGISTIC REGRESSION: adjusted odds of consanguineous marriage
+# =============================================================================
+print("LOGISTIC REGRESSION (Consanguineous_Marriage = Yes)")
+print("-"*80)
+logit_predictors = ['Socioeconomic_Class', 'Education_Level', 'Location_Type']
+logit_pooled = logistic_by_stratum(df, 'Consanguineous_Marriage', logit_predictors)
+# Same model within each location type (one batched fit for all strata)
+logit_by_location = logistic_by_stratum(df, 'Consanguineous_Marriage', logit_predictors[:2],
+                                        strata='Location_Type')
+logit_by_location['stratum'] = logit_by_location['stratum'].map(location_map).fillna(logit_by_location['stratum'])
+logit_table = pd.concat([logit_pooled, logit_by_location], ignore_index=True)
+logit_table.attrs = logit_pooled.attrs
+# Separated or diverging terms have no finite estimate: list them instead
+logit_estimable = logit_table['odds_ratio'].notna() & logit_table['converged']
+print(logit_table.loc[logit_estimable, ['stratum', 'term', 'odds_ratio', 'or_low', 'or_high', 'p_value', 'n']]
+      .round(3).to_string(index=False))
+omitted = logit_table.loc[~logit_estimable & (logit_table['separated'] | ~logit_table['converged'])]
+if len(omitted):
+    print("Not estimable (separated levels): "
+          + ', '.join(f"{row.term} ({row.stratum})" for row in omitted.itertuples()))
+logit_file = os.path.join(output_dir, 'logistic_consanguinity.csv')
+logit_table.to_csv(logit_file, index=False)
+print(f"✓ Saved: {logit_file}")
+
+output_file_8 = os.path.join(output_dir, '08_consanguinity_odds_ratios.png')
+plot_forest(logit_table, output_file_8, title='Adjusted Odds Ratios for Consanguineous Marriage',
+            metadata=chart_meta('Consanguineous_Marriage ~ Socioeconomic_Class + Education_Level + Location_Type',
+                                n=int(logit_pooled['n'].iloc[0]),
+                                title='Adjusted Odds Ratios for Consanguineous Marriage'))
+print(f"✓ Saved: {output_file_8}\n")
+
+# =============================================================================
+# CORRESPONDENCE ANALYSIS: one map instead of the grouped bars of Images 2, 5-7
+# =============================================================================
+print("CORRESPONDENCE ANALYSIS")
+print("-"*80)
+ca_df = df.assign(Location_Type=df['Location_Type'].map(location_map).fillna(df['Location_Type']))
+ca_analyses = [
+    ('09_ca_education_location.png', 'Education Level vs Location Type',
+     ['Education_Level'], 'Location_Type', 'Education level', 'Location'),
+    ('10_ca_class_by_education_location_consanguinity.png',
+     'Socioeconomic Class vs Education, Location and Consanguinity',
+     ['Education_Level', 'Location_Type', 'Consanguineous_Marriage'], 'Socioeconomic_Class',
+     'Education / location / consanguinity', 'Socioeconomic class'),
+]
+ca_coordinates = []
+for filename, title, row_vars, col_var, row_label, col_label in ca_analyses:
+    table = stacked_crosstab(ca_df, row_vars, col_var)
+    # A stacked table counts a respondent once per row variable; n is respondents
+    n_respondents = int((ca_df[col_var].notna() & ca_df[row_vars].notna().any(axis=1)).sum())
+    ca = correspondence_analysis(table)
+    explained = ', '.join(f'{share:.1%}' for share in ca['explained'])
+    print(f"{title}: inertia {ca['total_inertia']:.4f}, explained by dimensions {explained}")
+    ca_file = os.path.join(output_dir, filename)
+    plot_ca_biplot(ca, ca_file, title=f'Correspondence Analysis: {title}', row_label=row_label,
+                   col_label=col_label,
+                   metadata=chart_meta(f'{row_label} x {col_label}', n=n_respondents,
+                                       title=f'Correspondence Analysis: {title}'))
+    print(f"✓ Saved: {ca_file}")
+    ca_coordinates.append(coordinate_table(ca).assign(analysis=title))
+ca_coordinates_file = os.path.join(output_dir, 'correspondence_coordinates.csv')
+pd.concat(ca_coordinates, ignore_index=True).to_csv(ca_coordinates_file, index=False)
+print(f"✓ Saved: {ca_coordinates_file}\n")
+
+# =============================================================================
+# KINSHIP RISK: expected recessive-disease risk from spouse relation degree
+# =============================================================================
+print(f"EXPECTED RECESSIVE RISK BY STRATUM (allele frequency {DEFAULT_ALLELE_FREQUENCY})")
+print("-"*80)
+risk_tables = []
+for stratum_col in ['Education_Level', 'Location_Type', 'Socioeconomic_Class']:
+    risk = risk_by_stratum(df, stratum_col, 'Spouse_Relation', 'Consanguineous_Marriage')
+    print(risk[['n_scored', 'consanguineous', 'mean_inbreeding', 'expected_affected',
+                'excess_affected', 'risk_per_1000']].round(4).to_string())
+    print()
+    risk_tables.append(risk.reset_index().rename(columns={stratum_col: 'level'}).assign(stratum=stratum_col))
+risk_file = os.path.join(output_dir, 'kinship_risk_by_stratum.csv')
+pd.concat(risk_tables, ignore_index=True).to_csv(risk_file, index=False)
+print(f"✓ Saved: {risk_file}\n")
+
+# =============================================================================
+# SURVEY WEIGHTS: rake to population margins (survey_tools/population_margins.json)
+# =============================================================================
+print("POPULATION-WEIGHTED ESTIMATES")
+print("-"*80)
+weights, rake_info = rake(df, load_margins(), return_info=True)
+print(f"Raked on: {', '.join(rake_info['columns']) or 'nothing (no margins matched)'} "
+      f"({rake_info['iterations']} iterations, design effect {design_effect(weights):.2f})")
+# Standard errors: Taylor linearization, plus a delete-a-group jackknife
+# (one float32 replicate-weight array shared by every table). There is no
+# locality identifier, so respondents are treated as independent PSUs.
+replicates = jackknife_replicates(weights)
+# Shares within the levels of a raking variable are identical by
+# construction, so only the overall share and the other variables are shown
+weighted_strata = [None] + [col for col in ['Location_Type', 'Education_Level', 'Socioeconomic_Class']
+                            if col not in rake_info['columns']]
+weighted_rows = []
+for stratum_col in weighted_strata:
+    stratum = df[stratum_col] if stratum_col else pd.Series('All', index=df.index)
+    for label, options in [('unweighted', {}), ('weighted', {'weights': weights}),
+                           ('weighted_jackknife', {'design': replicates})]:
+        pct, se = crosstab_se(stratum, df['Consanguineous_Marriage'], **options)
+        if 'Yes' not in pct:
+            continue
+        weighted_rows.append(pd.DataFrame({'stratum': stratum_col or 'Overall', 'level': pct.index.astype(str),
+                                           'estimate': label, 'pct_consanguineous': pct['Yes'].to_numpy(),
+                                           'se': se['Yes'].to_numpy()}))
+weighted_table = pd.concat(weighted_rows, ignore_index=True)
+print("% consanguineous (standard error):")
+print(weighted_table.assign(value=weighted_table['pct_consanguineous'].map('{:.1f}'.format) + ' ('
+                            + weighted_table['se'].map('{:.1f}'.format) + ')')
+      .pivot(index=['stratum', 'level'], columns='estimate', values='value')
+      .reindex(pd.MultiIndex.from_frame(weighted_table[['stratum', 'level']].drop_duplicates())).to_string())
+weights_file = os.path.join(output_dir, 'weighted_consanguinity.csv')
+weighted_table.to_csv(weights_file, index=False)
+print(f"✓ Saved: {weights_file}\n")
+
+# =============================================================================
+# MISSING DATA: PATTERNS AND MULTIPLE IMPUTATION
+# =============================================================================
+print("="*80)
+print("MISSING DATA: PATTERNS AND MULTIPLE IMPUTATION")
+print("-"*80)
+observed_missing = MissingnessIndex(df_observed)
+print_patterns(observed_missing)
+output_file_11 = os.path.join(output_dir, '11_missingness_patterns.png')
+plot_patterns(observed_missing, output_file_11, title='Missing Data Patterns',
+              metadata=chart_meta('Missingness patterns', n=len(df_observed), title='Missing Data Patterns'))
+print(f"✓ Saved: {output_file_11}")
+
+# Complete-case vs pooled multiple-imputation estimates (Rubin's rules).
+# Donor cells include both tabulated variables, so imputed values keep
+# their association with consanguinity
+imputed_rows = []
+for stratum_col in ['Location_Type', 'Education_Level', 'Socioeconomic_Class']:
+    cc_pct, cc_se = crosstab_se(df_observed[stratum_col], df_observed['Consanguineous_Marriage'])
+    imputation_strata = list(dict.fromkeys([stratum_col, 'Consanguineous_Marriage', 'Location_Type',
+                                            'Education_Level']))
+    mi_pct, mi_se, mi_fmi = pooled_crosstab(df_observed, stratum_col, 'Consanguineous_Marriage',
+                                            strata=imputation_strata, workers=1)
+    if 'Yes' not in mi_pct:
+        continue
+    imputed_rows.append(pd.DataFrame({
+        'stratum': stratum_col, 'level': mi_pct.index.astype(str),
+        'complete_case_pct': cc_pct['Yes'].reindex(mi_pct.index).to_numpy(),
+        'complete_case_se': cc_se['Yes'].reindex(mi_pct.index).to_numpy(),
+        'imputed_pct': mi_pct['Yes'].to_numpy(), 'imputed_se': mi_se['Yes'].to_numpy(),
+        'fraction_missing_info': mi_fmi['Yes'].to_numpy(),
+    }))
+if imputed_rows:
+    imputed_table = pd.concat(imputed_rows, ignore_index=True)
+    print("\n% consanguineous, complete cases vs multiple imputation (standard error):")
+    for _, row in imputed_table.iterrows():
+        print(f"  {row['stratum']:<20} {row['level']:<16} {row['complete_case_pct']:5.1f} ({row['complete_case_se']:.1f})"
+              f"   {row['imputed_pct']:5.1f} ({row['imputed_se']:.1f})   FMI {row['fraction_missing_info']:.2f}")
+    imputed_file = os.path.join(output_dir, 'multiple_imputation_consanguinity.csv')
+    imputed_table.to_csv(imputed_file, index=False)
+    print(f"✓ Saved: {imputed_file}\n")
+
 # =============================================================================
 # SUMMARY STATISTICS
 # =============================================================================
@@ -1129,4 +1345,8 @@ print(f"  4. {output_file_4}")
 print(f"  5. {output_file_5}")
 print(f"  6. {output_file_6}")
 print(f"  7. {output_file_7}")
+print(f"  8. {output_file_8}")
+for number, (filename, *_) in enumerate(ca_analyses, start=9):
+    print(f"  {number}. {os.path.join(output_dir, filename)}")
+print(f"  11. {output_file_11}")
 print("\n" + "="*80)
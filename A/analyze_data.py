@@ -2,34 +2,34 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import numpy as np
 from collections import Counter
-
-# Read the CSV file
-df = pd.read_csv('DATA.csv')
-
-# Clean column names (remove extra spaces and special characters)
-df.columns = df.columns.str.strip()
-
-# Rename columns for easier access
-df.columns = ['Sex', 'Type_Of_Disease', 'Religion', 'Consanguinity']
-
-# Clean the data - strip whitespace and handle common data issues
-df['Sex'] = df['Sex'].str.strip()
-df['Type_Of_Disease'] = df['Type_Of_Disease'].str.strip()
-df['Religion'] = df['Religion'].str.strip()
-df['Consanguinity'] = df['Consanguinity'].str.strip()
-
-# Fix known data entry errors
-df['Sex'] = df['Sex'].replace({'Make': 'Male', 'Female=': 'Female', 'Male ': 'Male'})
-
-# Replace empty strings with NaN for proper missing data handling
-df.replace('', np.nan, inplace=True)
+import os
+import sys
+from functools import partial
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from survey_tools.association import association_battery, association_matrix, print_battery
+from survey_tools.chart_metadata import chart_metadata
+from survey_tools.exact_test import format_exact_result, monte_carlo_exact_test
+from survey_tools.intervals import error_bars, format_ci, proportion_intervals
+from survey_tools.loglinear import loglinear_analysis, print_loglinear
+from survey_tools.missingness import MissingnessIndex, print_patterns
+from survey_tools.respondents import load_respondents
+
+# Project only the questions charted here out of the Section A respondent
+# store (survey_tools/respondents.py), whose answers are already mapped onto
+# the canonical spellings; respondents answering none of them are left out
+df = load_respondents(['Sex', 'Type_Of_Disease', 'Religion', 'Consanguinity'], categorical=False)
+df = df.dropna(how='all').reset_index(drop=True)
+chart_meta = partial(chart_metadata, 'DATA.csv', script=__file__)
+
+# Validity bitmasks of every column: the per-column, pairwise and
+# triple-wise complete-case counts and subsets below all come from here
+missing = MissingnessIndex(df)
 
 # Calculate total valid responses for each column
 total_records = len(df)
-valid_sex = df['Sex'].notna().sum()
-valid_disease = df['Type_Of_Disease'].notna().sum()
-valid_religion = df['Religion'].notna().sum()
-valid_consanguinity = df['Consanguinity'].notna().sum()
+valid_sex, valid_disease, valid_religion, valid_consanguinity = missing.valid_counts[
+    ['Sex', 'Type_Of_Disease', 'Religion', 'Consanguinity']]
 
 print("="*60)
 print("DATA ANALYSIS SUMMARY")
@@ -43,6 +43,10 @@ print(f"Missing Sex entries: {total_records - valid_sex}")
 print(f"Missing Disease Type entries: {total_records - valid_disease}")
 print(f"Missing Religion entries: {total_records - valid_religion}")
 print(f"Missing Consanguinity entries: {total_records - valid_consanguinity}")
+print("\nRecords answering both questions:")
+print(missing.pairwise.to_string())
+print("\nMost frequent missingness patterns:")
+print_patterns(missing)
 print("="*60)
 
 # ============================================================================
@@ -56,9 +60,10 @@ sex_data = df['Sex'].dropna()
 sex_counts = sex_data.value_counts()
 
 print(f"Total valid responses: {len(sex_data)}")
-for sex, count in sex_counts.items():
+sex_low, sex_high = proportion_intervals(sex_counts.values)
+for (sex, count), low, high in zip(sex_counts.items(), sex_low, sex_high):
     percentage = (count / len(sex_data)) * 100
-    print(f"{sex}: {count} ({percentage:.2f}%)")
+    print(f"{sex}: {count} ({format_ci(percentage, low, high, 2)}, 95% CI)")
 
 # Create pie chart for Sex
 plt.figure(figsize=(10, 8))
@@ -81,7 +86,8 @@ plt.text(0, -1.3, f'Total Valid Responses: {len(sex_data)}',
          ha='center', fontsize=11, style='italic')
 plt.axis('equal')
 plt.tight_layout()
-plt.savefig('sex_distribution_piechart.png', dpi=300, bbox_inches='tight')
+plt.savefig('sex_distribution_piechart.png', dpi=300, bbox_inches='tight',
+            metadata=chart_meta('Sex', n=len(sex_data), title='Sex Distribution of Affected Individuals'))
 plt.close()
 print("✓ Saved: sex_distribution_piechart.png")
 
@@ -116,7 +122,8 @@ plt.text(0, -1.3, f'Total: {total} individuals',
          ha='center', fontsize=11, style='italic')
 plt.axis('equal')
 plt.tight_layout()
-plt.savefig('sex_ratio_piechart.png', dpi=300, bbox_inches='tight')
+plt.savefig('sex_ratio_piechart.png', dpi=300, bbox_inches='tight',
+            metadata=chart_meta('Sex', n=total, title='Sex Ratio of Affected Individuals'))
 plt.close()
 print("✓ Saved: sex_ratio_piechart.png")
 
@@ -131,9 +138,10 @@ disease_data = df['Type_Of_Disease'].dropna()
 disease_counts = disease_data.value_counts()
 
 print(f"Total valid responses: {len(disease_data)}")
-for disease, count in disease_counts.items():
+disease_low, disease_high = proportion_intervals(disease_counts.values)
+for (disease, count), low, high in zip(disease_counts.items(), disease_low, disease_high):
     percentage = (count / len(disease_data)) * 100
-    print(f"{disease}: {count} ({percentage:.2f}%)")
+    print(f"{disease}: {count} ({format_ci(percentage, low, high, 2)}, 95% CI)")
 
 # Create pie chart for Disease Type
 plt.figure(figsize=(14, 10))
@@ -167,7 +175,8 @@ plt.text(0, -1.2, f'Total Valid Responses: {len(disease_data)}',
          ha='center', fontsize=11, style='italic')
 plt.axis('equal')
 plt.tight_layout()
-plt.savefig('disease_type_piechart.png', dpi=300, bbox_inches='tight')
+plt.savefig('disease_type_piechart.png', dpi=300, bbox_inches='tight',
+            metadata=chart_meta('Type_Of_Disease', n=len(disease_data), title='Disease Type Distribution'))
 plt.close()
 print("✓ Saved: disease_type_piechart.png")
 
@@ -179,7 +188,7 @@ print("-"*60)
 
 # Note: Age data is not present in the CSV, so we'll focus on Disease Type vs Religion
 # Create a clean dataset for comparative analysis
-df_clean = df[df['Type_Of_Disease'].notna() & df['Religion'].notna()].copy()
+df_clean = missing.complete('Type_Of_Disease', 'Religion')
 
 print(f"Records with both Disease Type and Religion: {len(df_clean)}")
 
@@ -194,6 +203,12 @@ disease_religion_crosstab = pd.crosstab(
 print("\nDisease Type by Religion Cross-tabulation:")
 print(disease_religion_crosstab)
 
+# Many cells are sparse, so use a Monte Carlo exact test instead of chi-square
+# (in-process: the script runs at module level, without a __main__ guard)
+disease_religion_exact = monte_carlo_exact_test(disease_religion_crosstab.values, replicates=1_000_000,
+                                                workers=1)
+print(f"Exact test (Fisher-Freeman-Halton): {format_exact_result(disease_religion_exact)}")
+
 # Create grouped bar chart
 fig, ax = plt.subplots(figsize=(16, 10))
 disease_religion_crosstab.plot(kind='bar', ax=ax, width=0.8, edgecolor='black')
@@ -211,7 +226,8 @@ for container in ax.containers:
     ax.bar_label(container, label_type='edge', padding=3, fontsize=9)
 
 plt.tight_layout()
-plt.savefig('disease_by_religion_barchart.png', dpi=300, bbox_inches='tight')
+plt.savefig('disease_by_religion_barchart.png', dpi=300, bbox_inches='tight',
+            metadata=chart_meta('Type_Of_Disease x Religion', n=len(df_clean), title='Disease Type Distribution by Religion'))
 plt.close()
 print("✓ Saved: disease_by_religion_barchart.png")
 
@@ -246,14 +262,15 @@ plt.ylim(0, 100)
 plt.yticks(range(0, 101, 10))
 
 plt.tight_layout()
-plt.savefig('religion_percentage_by_disease_stacked.png', dpi=300, bbox_inches='tight')
+plt.savefig('religion_percentage_by_disease_stacked.png', dpi=300, bbox_inches='tight',
+            metadata=chart_meta('Type_Of_Disease x Religion', n=len(df_clean), title='Religion Distribution within Each Disease Type (%)'))
 plt.close()
 print("✓ Saved: religion_percentage_by_disease_stacked.png")
 
 # ----------------------------------------------------------------------------
 # 3c. Sex vs Disease Type (Grouped Bar Chart)
 # ----------------------------------------------------------------------------
-df_sex_disease = df[df['Type_Of_Disease'].notna() & df['Sex'].notna()].copy()
+df_sex_disease = missing.complete('Type_Of_Disease', 'Sex')
 sex_disease_crosstab = pd.crosstab(
     df_sex_disease['Type_Of_Disease'], 
     df_sex_disease['Sex']
@@ -278,7 +295,8 @@ for container in ax.containers:
     ax.bar_label(container, label_type='edge', padding=3, fontsize=9)
 
 plt.tight_layout()
-plt.savefig('disease_by_sex_barchart.png', dpi=300, bbox_inches='tight')
+plt.savefig('disease_by_sex_barchart.png', dpi=300, bbox_inches='tight',
+            metadata=chart_meta('Type_Of_Disease x Sex', n=len(df_sex_disease), title='Disease Type Distribution by Sex'))
 plt.close()
 print("✓ Saved: disease_by_sex_barchart.png")
 
@@ -290,14 +308,18 @@ religion_counts = religion_data.value_counts()
 
 print("\nReligion Distribution:")
 print(f"Total valid responses: {len(religion_data)}")
-for religion, count in religion_counts.items():
+religion_low, religion_high = proportion_intervals(religion_counts.values)
+for (religion, count), low, high in zip(religion_counts.items(), religion_low, religion_high):
     percentage = (count / len(religion_data)) * 100
-    print(f"{religion}: {count} ({percentage:.2f}%)")
+    print(f"{religion}: {count} ({format_ci(percentage, low, high, 2)}, 95% CI)")
 
 fig, ax = plt.subplots(figsize=(12, 8))
+religion_err = error_bars(religion_counts.values)
 bars = ax.bar(
     religion_counts.index, 
     religion_counts.values,
+    yerr=religion_err,
+    capsize=6,
     color=['#2ecc71', '#3498db', '#9b59b6'],
     edgecolor='black',
     linewidth=1.5
@@ -311,7 +333,7 @@ plt.grid(axis='y', alpha=0.3, linestyle='--')
 
 # Add value and percentage labels on bars
 for i, (bar, count) in enumerate(zip(bars, religion_counts.values)):
-    height = bar.get_height()
+    height = bar.get_height() + religion_err[1, i]
     percentage = (count / len(religion_data)) * 100
     ax.text(
         bar.get_x() + bar.get_width()/2., 
@@ -325,7 +347,7 @@ for i, (bar, count) in enumerate(zip(bars, religion_counts.values)):
 
 plt.text(
     0.5, -0.15, 
-    f'Total Valid Responses: {len(religion_data)}', 
+    f'Total Valid Responses: {len(religion_data)} (error bars: 95% Wilson CI)', 
     ha='center', 
     transform=ax.transAxes,
     fontsize=11, 
@@ -333,7 +355,8 @@ plt.text(
 )
 
 plt.tight_layout()
-plt.savefig('religion_distribution_barchart.png', dpi=300, bbox_inches='tight')
+plt.savefig('religion_distribution_barchart.png', dpi=300, bbox_inches='tight',
+            metadata=chart_meta('Religion', n=len(religion_data), title='Religion Distribution of Affected Individuals'))
 plt.close()
 print("✓ Saved: religion_distribution_barchart.png")
 
@@ -369,7 +392,8 @@ plt.title('Disease Type vs Religion Heatmap',
 plt.xlabel('Religion', fontsize=13, weight='bold')
 plt.ylabel('Type of Disease', fontsize=13, weight='bold')
 plt.tight_layout()
-plt.savefig('disease_religion_heatmap.png', dpi=300, bbox_inches='tight')
+plt.savefig('disease_religion_heatmap.png', dpi=300, bbox_inches='tight',
+            metadata=chart_meta('Type_Of_Disease x Religion', n=len(df_clean), title='Disease Type vs Religion Heatmap'))
 plt.close()
 print("✓ Saved: disease_religion_heatmap.png")
 
@@ -384,9 +408,10 @@ consanguinity_data = df['Consanguinity'].dropna()
 consanguinity_counts = consanguinity_data.value_counts()
 
 print(f"Total valid responses: {len(consanguinity_data)}")
-for status, count in consanguinity_counts.items():
+consanguinity_low, consanguinity_high = proportion_intervals(consanguinity_counts.values)
+for (status, count), low, high in zip(consanguinity_counts.items(), consanguinity_low, consanguinity_high):
     percentage = (count / len(consanguinity_data)) * 100
-    print(f"{status}: {count} ({percentage:.2f}%)")
+    print(f"{status}: {count} ({format_ci(percentage, low, high, 2)}, 95% CI)")
 
 # ----------------------------------------------------------------------------
 # 4a. Consanguinity Distribution (Pie Chart)
@@ -411,14 +436,15 @@ plt.text(0, -1.3, f'Total Valid Responses: {len(consanguinity_data)}',
          ha='center', fontsize=11, style='italic')
 plt.axis('equal')
 plt.tight_layout()
-plt.savefig('consanguinity_piechart.png', dpi=300, bbox_inches='tight')
+plt.savefig('consanguinity_piechart.png', dpi=300, bbox_inches='tight',
+            metadata=chart_meta('Consanguinity', n=len(consanguinity_data), title='Consanguineous Marriage Distribution'))
 plt.close()
 print("✓ Saved: consanguinity_piechart.png")
 
 # ----------------------------------------------------------------------------
 # 4b. Consanguinity vs Sex (Grouped Bar Chart)
 # ----------------------------------------------------------------------------
-df_cons_sex = df[df['Consanguinity'].notna() & df['Sex'].notna()].copy()
+df_cons_sex = missing.complete('Consanguinity', 'Sex')
 cons_sex_crosstab = pd.crosstab(df_cons_sex['Consanguinity'], df_cons_sex['Sex'])
 
 print("\nConsanguinity by Sex Cross-tabulation:")
@@ -446,14 +472,15 @@ for container in ax.containers:
 plt.text(0.5, -0.15, f'Total Valid Responses: {len(df_cons_sex)}', 
          ha='center', transform=ax.transAxes, fontsize=11, style='italic')
 plt.tight_layout()
-plt.savefig('consanguinity_by_sex.png', dpi=300, bbox_inches='tight')
+plt.savefig('consanguinity_by_sex.png', dpi=300, bbox_inches='tight',
+            metadata=chart_meta('Consanguinity x Sex', n=len(df_cons_sex), title='Consanguinity Distribution by Sex'))
 plt.close()
 print("✓ Saved: consanguinity_by_sex.png")
 
 # ----------------------------------------------------------------------------
 # 4c. Consanguinity vs Disease Type (Grouped Bar Chart)
 # ----------------------------------------------------------------------------
-df_cons_disease = df[df['Consanguinity'].notna() & df['Type_Of_Disease'].notna()].copy()
+df_cons_disease = missing.complete('Consanguinity', 'Type_Of_Disease')
 cons_disease_crosstab = pd.crosstab(df_cons_disease['Type_Of_Disease'], 
                                     df_cons_disease['Consanguinity'])
 
@@ -461,6 +488,19 @@ print("\nConsanguinity by Disease Type Cross-tabulation:")
 print(cons_disease_crosstab)
 print(f"Total valid responses: {len(df_cons_disease)}")
 
+# Row percentages with Wilson intervals (several disease rows are tiny)
+cons_disease_low, cons_disease_high = proportion_intervals(
+    cons_disease_crosstab.values, method='wilson', axis=1
+)
+print("\nConsanguinity within each Disease Type (95% Wilson CI):")
+for r, disease in enumerate(cons_disease_crosstab.index):
+    row_total = cons_disease_crosstab.loc[disease].sum()
+    cells = [
+        f"{status}: {format_ci(cons_disease_crosstab.iat[r, c] / row_total * 100, cons_disease_low[r, c], cons_disease_high[r, c])}"
+        for c, status in enumerate(cons_disease_crosstab.columns)
+    ]
+    print(f"  {disease} (n={row_total}): " + ", ".join(cells))
+
 fig, ax = plt.subplots(figsize=(16, 10))
 cons_disease_crosstab.plot(kind='bar', ax=ax, width=0.8, edgecolor='black',
                           color=['#2ecc71', '#e74c3c'])
@@ -480,7 +520,8 @@ for container in ax.containers:
 plt.text(0.5, -0.2, f'Total Valid Responses: {len(df_cons_disease)}', 
          ha='center', transform=ax.transAxes, fontsize=11, style='italic')
 plt.tight_layout()
-plt.savefig('consanguinity_by_disease.png', dpi=300, bbox_inches='tight')
+plt.savefig('consanguinity_by_disease.png', dpi=300, bbox_inches='tight',
+            metadata=chart_meta('Type_Of_Disease x Consanguinity', n=len(df_cons_disease), title='Consanguinity Distribution by Disease Type'))
 plt.close()
 print("✓ Saved: consanguinity_by_disease.png")
 
@@ -506,14 +547,15 @@ plt.yticks(range(0, 101, 10))
 plt.text(0.5, -0.2, f'Total Valid Responses: {len(df_cons_disease)}', 
          ha='center', transform=ax.transAxes, fontsize=11, style='italic')
 plt.tight_layout()
-plt.savefig('consanguinity_percentage_by_disease.png', dpi=300, bbox_inches='tight')
+plt.savefig('consanguinity_percentage_by_disease.png', dpi=300, bbox_inches='tight',
+            metadata=chart_meta('Type_Of_Disease x Consanguinity', n=len(df_cons_disease), title='Consanguinity Percentage within Each Disease Type'))
 plt.close()
 print("✓ Saved: consanguinity_percentage_by_disease.png")
 
 # ----------------------------------------------------------------------------
 # 4e. Consanguinity vs Religion (Grouped Bar Chart)
 # ----------------------------------------------------------------------------
-df_cons_religion = df[df['Consanguinity'].notna() & df['Religion'].notna()].copy()
+df_cons_religion = missing.complete('Consanguinity', 'Religion')
 cons_religion_crosstab = pd.crosstab(df_cons_religion['Religion'], 
                                      df_cons_religion['Consanguinity'])
 
@@ -542,7 +584,8 @@ for container in ax.containers:
 plt.text(0.5, -0.15, f'Total Valid Responses: {len(df_cons_religion)}', 
          ha='center', transform=ax.transAxes, fontsize=11, style='italic')
 plt.tight_layout()
-plt.savefig('consanguinity_by_religion.png', dpi=300, bbox_inches='tight')
+plt.savefig('consanguinity_by_religion.png', dpi=300, bbox_inches='tight',
+            metadata=chart_meta('Religion x Consanguinity', n=len(df_cons_religion), title='Consanguinity Distribution by Religion'))
 plt.close()
 print("✓ Saved: consanguinity_by_religion.png")
 
@@ -581,15 +624,15 @@ plt.ylabel('Type of Disease', fontsize=13, weight='bold')
 plt.text(0.5, -0.08, f'Total Valid Responses: {len(df_cons_disease)}', 
          ha='center', transform=ax.transAxes, fontsize=11, style='italic')
 plt.tight_layout()
-plt.savefig('disease_consanguinity_heatmap.png', dpi=300, bbox_inches='tight')
+plt.savefig('disease_consanguinity_heatmap.png', dpi=300, bbox_inches='tight',
+            metadata=chart_meta('Type_Of_Disease x Consanguinity', n=len(df_cons_disease), title='Disease Type vs Consanguinity Heatmap'))
 plt.close()
 print("✓ Saved: disease_consanguinity_heatmap.png")
 
 # ----------------------------------------------------------------------------
 # 4g. Combined Analysis: Sex, Disease Type, and Consanguinity
 # ----------------------------------------------------------------------------
-df_complete = df[df['Sex'].notna() & df['Type_Of_Disease'].notna() & 
-                 df['Consanguinity'].notna()].copy()
+df_complete = missing.complete('Sex', 'Type_Of_Disease', 'Consanguinity')
 
 print(f"\nRecords with Sex, Disease Type, and Consanguinity: {len(df_complete)}")
 
@@ -600,6 +643,13 @@ summary_table['Percentage'] = (summary_table['Count'] / len(df_complete)) * 100
 print("\nDetailed Cross-tabulation (Disease × Consanguinity × Sex):")
 print(summary_table.to_string(index=False))
 
+# Log-linear models: which associations does the three-way table need?
+loglinear_models, loglinear_terms = loglinear_analysis(df_complete, ['Type_Of_Disease', 'Consanguinity', 'Sex'])
+print("\nLog-linear models (Disease × Consanguinity × Sex):")
+print_loglinear(loglinear_models, loglinear_terms)
+loglinear_models.to_csv('loglinear_disease_consanguinity_sex.csv', index=False)
+print("✓ Saved: loglinear_disease_consanguinity_sex.csv")
+
 # ----------------------------------------------------------------------------
 # 4h. 3D Analysis: Top Diseases by Consanguinity and Sex
 # ----------------------------------------------------------------------------
@@ -646,10 +696,23 @@ axes[1].text(0.5, -0.25, f'Total: {len(df_no)}', ha='center',
 plt.suptitle('Disease Distribution by Sex and Consanguinity Status', 
              fontsize=16, weight='bold', y=1.02)
 plt.tight_layout()
-plt.savefig('disease_sex_consanguinity_comparison.png', dpi=300, bbox_inches='tight')
+plt.savefig('disease_sex_consanguinity_comparison.png', dpi=300, bbox_inches='tight',
+            metadata=chart_meta('Type_Of_Disease x Sex x Consanguinity', n=len(df_top), title='Disease Distribution by Sex and Consanguinity Status'))
 plt.close()
 print("✓ Saved: disease_sex_consanguinity_comparison.png")
 
+# ============================================================================
+# ASSOCIATION TESTS (every pair of categorical columns)
+# ============================================================================
+print("\nASSOCIATION TESTS")
+print("-"*60)
+# workers=1: this script has no __main__ guard, so no process pool
+associations = association_battery(df, columns=['Sex', 'Type_Of_Disease', 'Religion', 'Consanguinity'], permutations=2000, workers=1)
+print_battery(associations)
+associations.to_csv('association_battery.csv', index=False)
+print(f"\nCramér's V matrix:\n{association_matrix(associations).round(3)}")
+print("✓ Saved: association_battery.csv")
+
 # ============================================================================
 # SUMMARY STATISTICS
 # ============================================================================
@@ -2,8 +2,18 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import numpy as np
 import warnings
+import os
+import sys
+from functools import partial
 warnings.filterwarnings('ignore')
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from survey_tools.canonicalize import canonicalize_frame
+from survey_tools.chart_metadata import chart_metadata
+
+DATA_FILE = 'DATA.csv'
+chart_meta = partial(chart_metadata, DATA_FILE, script=__file__)
+
 def load_and_clean_data(filepath):
     """Load CSV data and handle missing values"""
     try:
@@ -13,10 +23,8 @@ def load_and_clean_data(filepath):
         # Rename columns for easier access
         df.columns = ['Sex', 'Type_Of_Disease', 'Religion', 'Consanguineous']
         
-        # Strip whitespace from all string columns
-        for col in df.columns:
-            if df[col].dtype == 'object':
-                df[col] = df[col].str.strip()
+        # Strip whitespace and map answer variants onto the canonical spellings
+        df = canonicalize_frame(df)
         
         return df
     except Exception as e:
@@ -89,7 +97,9 @@ def create_disease_by_religion_chart(df):
              bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.5))
     
     plt.tight_layout(rect=[0, 0.03, 1, 1])
-    plt.savefig('disease_by_religion.png', dpi=300, bbox_inches='tight')
+    plt.savefig('disease_by_religion.png', dpi=300, bbox_inches='tight',
+                metadata=chart_meta('Type_Of_Disease x Religion', n=total_valid,
+                                    title='Disease Type Distribution by Religion'))
     print(f"✓ Created: disease_by_religion.png (Valid responses: {total_valid})")
     plt.close()
 
@@ -172,7 +182,9 @@ def create_disease_by_sex_chart(df):
              bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.5))
     
     plt.tight_layout(rect=[0, 0.03, 1, 1])
-    plt.savefig('disease_by_sex.png', dpi=300, bbox_inches='tight')
+    plt.savefig('disease_by_sex.png', dpi=300, bbox_inches='tight',
+                metadata=chart_meta('Type_Of_Disease x Sex', n=total_valid,
+                                    title='Disease Type Distribution by Sex'))
     print(f"✓ Created: disease_by_sex.png (Valid responses: {total_valid})")
     plt.close()
 
@@ -255,7 +267,9 @@ def create_consanguinity_by_disease_chart(df):
              bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.5))
     
     plt.tight_layout(rect=[0, 0.03, 1, 1])
-    plt.savefig('consanguinity_by_disease.png', dpi=300, bbox_inches='tight')
+    plt.savefig('consanguinity_by_disease.png', dpi=300, bbox_inches='tight',
+                metadata=chart_meta('Type_Of_Disease x Consanguineous', n=total_valid,
+                                    title='Consanguinity by Disease Type'))
     print(f"✓ Created: consanguinity_by_disease.png (Valid responses: {total_valid})")
     plt.close()
 
@@ -266,7 +280,7 @@ def main():
     print("=" * 60)
     
     # Load data
-    df = load_and_clean_data('DATA.csv')
+    df = load_and_clean_data(DATA_FILE)
     
     if df is None:
         print("Failed to load data. Exiting.")
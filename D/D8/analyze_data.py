@@ -1,48 +1,34 @@
-import csv
 import matplotlib.pyplot as plt
+import pandas as pd
+import os
+import sys
+from functools import partial
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from survey_tools.chart_metadata import chart_metadata
+from survey_tools.multiselect import parse_multiselect
 
 # Read the CSV file
 csv_file = 'Data.csv'
-responses = []
-
-with open(csv_file, 'r', encoding='utf-8') as file:
-    csv_reader = csv.reader(file)
-    for i, row in enumerate(csv_reader):
-        if i == 0:  # Skip header
-            continue
-        if row and row[0].strip():  # Skip empty rows
-            responses.append(row[0].strip())
+chart_meta = partial(chart_metadata, csv_file, script=__file__)
+answers = pd.read_csv(csv_file, dtype=str, encoding='utf-8').iloc[:, 0]
 
-# Count options based on comma count
-# 1 comma = 2 options
-# 0 commas = 1 option
-# 2 commas = 3 options, etc.
+# Split each answer into the option codes it selects (one indicator column
+# per option), then count options per respondent as row sums
+selections = parse_multiselect(answers)
+selected = selections.selection_counts()[selections.answered]
 
-one_option = 0
-two_options = 0
-three_options = 0
-four_options = 0
-five_or_more = 0
+one_option = int((selected == 1).sum())
+two_options = int((selected == 2).sum())
+three_options = int((selected == 3).sum())
+four_options = int((selected == 4).sum())
+five_or_more = int((selected >= 5).sum())
 
-two_option_responses = []
-
-for response in responses:
-    comma_count = response.count(',')
-    
-    if comma_count == 0:
-        one_option += 1
-    elif comma_count == 1:
-        two_options += 1
-        two_option_responses.append(response)
-    elif comma_count == 2:
-        three_options += 1
-    elif comma_count == 3:
-        four_options += 1
-    else:
-        five_or_more += 1
+two_option_responses = answers[selections.respondents_with(2)].str.strip().tolist()
+option_counts = selections.option_counts()
 
 # Calculate total and percentages
-total = len(responses)
+total = selections.n_answered
 two_option_percentage = (two_options / total) * 100 if total > 0 else 0
 other_percentage = 100 - two_option_percentage
 
@@ -64,6 +50,13 @@ with open(report_filename, 'w', encoding='utf-8') as f:
     f.write(f"4 Options:      {four_options:3d} responses ({four_options/total*100:.2f}%)\n")
     f.write(f"5+ Options:     {five_or_more:3d} responses ({five_or_more/total*100:.2f}%)\n\n")
     
+    f.write("-"*70 + "\n")
+    f.write("RESPONDENTS SELECTING EACH OPTION:\n")
+    f.write("-"*70 + "\n")
+    for option, count in option_counts.items():
+        f.write(f"Option {option:<8} {count:3d} responses ({count/total*100:.2f}%)\n")
+    f.write("\n")
+    
     f.write("="*70 + "\n")
     f.write("KEY FINDING: TWO-OPTION SELECTIONS\n")
     f.write("="*70 + "\n")
@@ -100,7 +93,8 @@ plt.text(0, -1.45, f'2 Options: {two_options} | Other: {total - two_options}',
 
 plt.axis('equal')
 plt.tight_layout()
-plt.savefig('two_options_piechart.png', dpi=300, bbox_inches='tight')
+plt.savefig('two_options_piechart.png', dpi=300, bbox_inches='tight',
+            metadata=chart_meta('Q8', n=total, title='Two-Option Selections vs Others'))
 print(f"Pie chart saved to: two_options_piechart.png")
 
 plt.show()
@@ -1,6 +1,14 @@
 import pandas as pd
 import matplotlib.pyplot as plt
 import os
+import sys
+from functools import partial
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from survey_tools.chart_metadata import chart_metadata
+from survey_tools.cooccurrence import option_pairs, plot_cooccurrence_heatmap
+from survey_tools.intervals import error_bars, format_ci, proportion_intervals
+from survey_tools.multiselect import parse_multiselect
 
 # Read the CSV file with proper encoding handling
 try:
@@ -11,6 +19,8 @@ except UnicodeDecodeError:
     except UnicodeDecodeError:
         df = pd.read_csv('DQ1.csv', encoding='cp1252')
 
+chart_meta = partial(chart_metadata, 'DQ1.csv', script=__file__)
+
 # Create output directory for charts
 output_dir = 'pie_charts'
 os.makedirs(output_dir, exist_ok=True)
@@ -18,9 +28,33 @@ os.makedirs(output_dir, exist_ok=True)
 # Define colors for consistent visualization
 colors = ['#ff9999', '#66b3ff', '#99ff99', '#ffcc99', '#ff99cc', '#c2c2f0', '#ffb3e6']
 
+# Answer options offered for question 8 (multi-select); anything else is a write-in
+BARRIER_OPTIONS = [
+    'Lack of awareness',
+    'High cost',
+    'Fear of results',
+    'Lack of accessibility for the test',
+]
+
 # Get all column names (questions)
 questions = df.columns.tolist()
 
+# Answer options offered for question 2 (sources can be combined too)
+SOURCE_OPTIONS = [
+    'Doctor / Health worker (ASHA)',
+    'School / College',
+    'Friends / Relatives',
+]
+
+# Split the question 8 answers into one indicator column per option
+barriers = parse_multiselect(df[questions[-1]], options=BARRIER_OPTIONS)
+
+# Multi-select questions analysed for options chosen together: {number: (selections, short name)}
+multi_select = {
+    2: (parse_multiselect(df[questions[1]], options=SOURCE_OPTIONS), 'sources'),
+    8: (barriers, 'barriers'),
+}
+
 # Create a pie chart for questions 1-7, bar chart for question 8
 for i, question in enumerate(questions, 1):
     # Count the values for this question
@@ -30,17 +64,23 @@ for i, question in enumerate(questions, 1):
     is_bar_chart = (i == len(questions))
     
     if is_bar_chart:
-        # Create bar chart for question 8
+        # Create bar chart for question 8: one bar per option, as a share of
+        # respondents (a respondent can pick several, so bars sum past 100%)
+        value_counts = barriers.option_counts()
         fig, ax = plt.subplots(figsize=(12, 8))
         
-        # Create bar chart
-        bars = ax.bar(range(len(value_counts)), value_counts.values, color=colors[:len(value_counts)])
+        # Create bar chart; each option is its own yes/no share, so the
+        # error bars are per-option Wilson intervals over all respondents
+        total = barriers.n_answered
+        option_err = error_bars(value_counts.values, n=total)
+        bars = ax.bar(range(len(value_counts)), value_counts.values, color=colors[:len(value_counts)],
+                      yerr=option_err, capsize=5)
+        ax.set_ylim(0, (value_counts.values + option_err[1]).max() * 1.15)
         
         # Add value labels on top of bars with count and percentage
-        total = value_counts.sum()
         for idx, (bar, count) in enumerate(zip(bars, value_counts.values)):
             percentage = (count / total) * 100
-            height = bar.get_height()
+            height = bar.get_height() + option_err[1, idx]
             ax.text(bar.get_x() + bar.get_width()/2., height,
                    f'{count}\n({percentage:.1f}%)',
                    ha='center', va='bottom', fontweight='bold', fontsize=10)
@@ -50,8 +90,9 @@ for i, question in enumerate(questions, 1):
         ax.set_xticklabels(value_counts.index, rotation=45, ha='right', fontsize=10)
         
         # Set labels and title
-        ax.set_ylabel('Count', fontsize=12, fontweight='bold')
-        ax.set_xlabel('Response', fontsize=12, fontweight='bold')
+        ax.set_ylabel('Respondents selecting option', fontsize=12, fontweight='bold')
+        ax.set_xlabel(f'Option (Total respondents: {total}; error bars: 95% Wilson CI)',
+                      fontsize=12, fontweight='bold')
         title = question if len(question) <= 80 else question[:77] + '...'
         ax.set_title(f'Question {i}: {title}', fontsize=12, fontweight='bold', wrap=True, pad=20)
         
@@ -64,7 +105,8 @@ for i, question in enumerate(questions, 1):
         
         # Save the figure
         filename = f'{output_dir}/question_{i}_barchart.png'
-        plt.savefig(filename, dpi=300, bbox_inches='tight')
+        plt.savefig(filename, dpi=300, bbox_inches='tight',
+                    metadata=chart_meta(f'Q{i}', n=total, title=question))
         print(f'Saved: {filename}')
         
         # Close the figure to free memory
@@ -132,12 +174,26 @@ for i, question in enumerate(questions, 1):
         
         # Save the figure
         filename = f'{output_dir}/question_{i}_piechart.png'
-        plt.savefig(filename, dpi=300, bbox_inches='tight')
+        plt.savefig(filename, dpi=300, bbox_inches='tight',
+                    metadata=chart_meta(f'Q{i}', n=value_counts.sum(), title=question))
         print(f'Saved: {filename}')
         
         # Close the figure to free memory
         plt.close()
 
+# Co-occurrence heatmaps for the multi-select questions (counts and lift)
+for i, (selections, name) in multi_select.items():
+    question = questions[i - 1]
+    for metric in ('count', 'lift'):
+        filename = f'{output_dir}/question_{i}_{name}_cooccurrence_{metric}.png'
+        plot_cooccurrence_heatmap(
+            selections, filename, metric=metric,
+            title=f'Question {i}: options chosen together ({metric})',
+            metadata=chart_meta(f'Q{i}', n=selections.n_answered,
+                                title=f'{question} - co-occurrence ({metric})')
+        )
+        print(f'Saved: {filename}')
+
 print(f'\nAll pie charts have been created and saved in the "{output_dir}" directory!')
 
 # Print summary statistics
@@ -147,8 +203,31 @@ print('='*60)
 for i, question in enumerate(questions, 1):
     print(f'\nQuestion {i}: {question}')
     print('-' * 60)
-    value_counts = df[question].value_counts()
-    total = value_counts.sum()
-    for label, count in value_counts.items():
+    if i == len(questions):
+        value_counts = barriers.option_counts()
+        total = barriers.n_answered
+    else:
+        value_counts = df[question].value_counts()
+        total = value_counts.sum()
+    low, high = proportion_intervals(value_counts.values, n=total)
+    for (label, count), lo, hi in zip(value_counts.items(), low, high):
         percentage = (count / total) * 100
-        print(f'  {label}: {count} ({percentage:.1f}%)')
+        print(f'  {label}: {count} ({format_ci(percentage, lo, hi)})')
+
+# Options most often chosen together
+for i, (selections, name) in multi_select.items():
+    print(f'\nQuestion {i}: options chosen together')
+    print('-' * 60)
+    pairs = option_pairs(selections)
+    pairs = pairs[pairs['both'] > 0]
+    if pairs.empty:
+        print('  No respondent selected more than one option')
+    for _, pair in pairs.head(10).iterrows():
+        print(f"  {pair['option_a']} + {pair['option_b']}: {pair['both']} "
+              f"(lift {pair['lift']:.2f}, Jaccard {pair['jaccard']:.2f}, phi {pair['phi']:.2f})")
+
+# Number of options picked per respondent for question 8
+print('\nQuestion 8: options selected per respondent')
+print('-' * 60)
+for k, count in barriers.selection_histogram().items():
+    print(f'  {k} option{"s" if k > 1 else ""}: {count} ({count / barriers.n_answered * 100:.1f}%)')
@@ -1,9 +1,18 @@
 import pandas as pd
 import matplotlib.pyplot as plt
 import numpy as np
+import os
+import sys
+from functools import partial
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from survey_tools.chart_metadata import chart_metadata
+from survey_tools.intervals import error_bars, format_ci, proportion_intervals
+from survey_tools.likert import level_counts, likert_summary, plot_diverging_likert
 
 # Read the CSV file
 df = pd.read_csv('EsectionData.csv')
+chart_meta = partial(chart_metadata, 'EsectionData.csv', script=__file__)
 
 # Print basic information about the data
 print(f"Total respondents: {len(df)}")
@@ -20,25 +29,30 @@ questions = [
     "Q5: General preference towards\nconsanguineous marriage"
 ]
 
+# Distribution and statistics for all items at once (1-5 scale)
+summary = likert_summary(df, levels=[1, 2, 3, 4, 5], box=2)
+
 # Create 5 separate bar graphs
 for i, col in enumerate(df.columns):
-    # Count the frequency of each response (1-5 scale)
-    # Remove NaN values before counting
-    response_counts = df[col].dropna().value_counts().sort_index()
+    # Frequency of each response (1-5 scale), missing values excluded
+    response_counts = level_counts(summary, col)
+    response_counts = response_counts[response_counts > 0]
     
     # Create figure with larger size for better readability
     plt.figure(figsize=(10, 6))
     
     # Create bar chart
-    bars = plt.bar(response_counts.index, response_counts.values, 
+    total_responses = int(summary.at[col, 'n_valid'])
+    response_err = error_bars(response_counts.values, n=total_responses)
+    bars = plt.bar(response_counts.index, response_counts.values, yerr=response_err, capsize=5,
                    color='steelblue', edgecolor='black', linewidth=1.2)
+    plt.ylim(0, (response_counts.values + response_err[1]).max() * 1.15)
     
     # Add value labels on top of each bar with count and percentage
-    total_responses = df[col].notna().sum()
-    for bar in bars:
+    for bar, err in zip(bars, response_err[1]):
         height = bar.get_height()
         percentage = (height / total_responses) * 100
-        plt.text(bar.get_x() + bar.get_width()/2., height,
+        plt.text(bar.get_x() + bar.get_width()/2., height + err,
                 f'{int(height)}\n({percentage:.1f}%)',
                 ha='center', va='bottom', fontsize=10, fontweight='bold')
     
@@ -46,7 +60,7 @@ for i, col in enumerate(df.columns):
     plt.xlabel('Response Scale (1=Strongly Disagree, 5=Strongly Agree)', 
               fontsize=12, fontweight='bold', labelpad=10)
     plt.ylabel('Number of Respondents', fontsize=12, fontweight='bold', labelpad=10)
-    plt.title(f'{questions[i]}\n(n={df[col].notna().sum()} respondents)', 
+    plt.title(f'{questions[i]}\n(n={total_responses} respondents, error bars: 95% Wilson CI)', 
              fontsize=13, fontweight='bold', pad=20)
     
     # Set x-axis to show all possible responses (1-5)
@@ -61,23 +75,40 @@ for i, col in enumerate(df.columns):
     
     # Save the figure
     filename = f'question_{i+1}_analysis.png'
-    plt.savefig(filename, dpi=300, bbox_inches='tight')
+    plt.savefig(filename, dpi=300, bbox_inches='tight',
+                metadata=chart_meta(f'Q{i+1}', n=total_responses, title=col))
     print(f"\nSaved: {filename}")
     
     # Display statistics for this question
     print(f"\nQuestion {i+1} Statistics:")
-    print(f"Valid responses: {df[col].notna().sum()}")
-    print(f"Mean: {df[col].mean():.2f}")
-    print(f"Median: {df[col].median():.2f}")
-    print(f"Mode: {df[col].mode().values[0] if len(df[col].mode()) > 0 else 'N/A'}")
+    stats = summary.loc[col]
+    print(f"Valid responses: {total_responses}")
+    print(f"Mean: {stats['mean']:.2f}")
+    print(f"Median: {stats['median']:.2f}")
+    print(f"Mode: {stats['mode'] if total_responses > 0 else 'N/A'}")
+    print(f"Agree (4-5): {stats['top_box_pct']:.1f}% | Disagree (1-2): {stats['bottom_box_pct']:.1f}%")
     print(f"Response distribution:")
-    for value, count in response_counts.items():
-        percentage = (count / df[col].notna().sum()) * 100
-        print(f"  {int(value)}: {int(count)} ({percentage:.1f}%)")
+    low, high = proportion_intervals(response_counts.values, n=total_responses)
+    for (value, count), lo, hi in zip(response_counts.items(), low, high):
+        percentage = (count / total_responses) * 100
+        print(f"  {int(value)}: {int(count)} ({format_ci(percentage, lo, hi)})")
     
     # Close the figure to free memory
     plt.close()
 
+# Diverging stacked bars comparing all items, plus the summary table
+plot_diverging_likert(
+    summary, 'likert_diverging.png',
+    item_labels=[q.replace('\n', ' ') for q in questions],
+    level_labels=['1 Strongly Disagree', '2', '3', '4', '5 Strongly Agree'],
+    title=f'Section E: Agreement with each statement (Total respondents: {len(df)})',
+    metadata=chart_meta('Q1-Q5', n=len(df), title='Section E response distribution')
+)
+print("\nSaved: likert_diverging.png")
+
+summary.to_csv('likert_summary.csv')
+print("Saved: likert_summary.csv")
+
 print("\n" + "="*50)
 print("All graphs have been created successfully!")
 print("="*50)
@@ -1,9 +1,18 @@
 import pandas as pd
 import matplotlib.pyplot as plt
 import numpy as np
+import os
+import sys
+from functools import partial
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from survey_tools.chart_metadata import chart_metadata
+from survey_tools.intervals import error_bars, format_ci, proportion_intervals
+from survey_tools.likert import level_counts, likert_summary, plot_diverging_likert
 
 # Read the CSV file
 df = pd.read_csv('DataF.csv')
+chart_meta = partial(chart_metadata, 'DataF.csv', script=__file__)
 
 # Define question labels for better readability
 questions = {
@@ -23,14 +32,17 @@ response_labels = {
 # Column names from CSV
 columns = df.columns.tolist()
 
+# Distribution and statistics for all items at once (3-point scale)
+summary = likert_summary(df, levels=[1, 2, 3], box=1)
+
 # Create 4 separate bar graphs
 for idx, col in enumerate(columns, 1):
-    # Remove missing values and count responses
-    data = df[col].dropna()
-    value_counts = data.value_counts().sort_index()
+    # Count responses (missing values excluded)
+    value_counts = level_counts(summary, col)
+    value_counts = value_counts[value_counts > 0]
     
     # Calculate total valid responses
-    total = len(data)
+    total = int(summary.at[col, 'n_valid'])
     
     # Calculate percentages
     percentages = (value_counts / total * 100).round(1)
@@ -40,8 +52,11 @@ for idx, col in enumerate(columns, 1):
     
     # Create bars
     x_pos = np.arange(len(value_counts))
+    value_err = error_bars(value_counts.values, n=total)
     bars = ax.bar(x_pos, value_counts.values, color=['#4472C4', '#ED7D31', '#A5A5A5'][:len(value_counts)], 
+                   yerr=value_err, capsize=5,
                    edgecolor='black', linewidth=1.2, alpha=0.85)
+    ax.set_ylim(0, (value_counts.values + value_err[1]).max() * 1.15)
     
     # Customize the plot
     ax.set_xlabel('Response Options', fontsize=12, fontweight='bold')
@@ -56,7 +71,7 @@ for idx, col in enumerate(columns, 1):
     for i, (bar, count, pct) in enumerate(zip(bars, value_counts.values, percentages.values)):
         height = bar.get_height()
         # Add count
-        ax.text(bar.get_x() + bar.get_width()/2., height + 1,
+        ax.text(bar.get_x() + bar.get_width()/2., height + value_err[1, i] + 1,
                 f'{int(count)}',
                 ha='center', va='bottom', fontsize=11, fontweight='bold')
         # Add percentage
@@ -69,7 +84,7 @@ for idx, col in enumerate(columns, 1):
     ax.set_axisbelow(True)
     
     # Add total respondents information
-    ax.text(0.98, 0.98, f'Total Valid Responses: {total}',
+    ax.text(0.98, 0.98, f'Total Valid Responses: {total}\nError bars: 95% Wilson CI',
             transform=ax.transAxes, fontsize=10,
             verticalalignment='top', horizontalalignment='right',
             bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.5))
@@ -78,21 +93,39 @@ for idx, col in enumerate(columns, 1):
     plt.tight_layout()
     
     # Save the figure
-    plt.savefig(f'question_{idx}_analysis.png', dpi=300, bbox_inches='tight')
+    plt.savefig(f'question_{idx}_analysis.png', dpi=300, bbox_inches='tight',
+                metadata=chart_meta(f'Q{idx}', n=total, title=col))
     print(f'Saved: question_{idx}_analysis.png')
     
     # Close the figure to free memory
     plt.close()
 
+# Diverging stacked bars comparing all questions, plus the summary table
+plot_diverging_likert(
+    summary, 'likert_diverging.png',
+    item_labels=[f'Q{idx}' for idx in range(1, len(columns) + 1)],
+    level_labels=[response_labels[level] for level in summary.attrs['levels']],
+    title=f'Section F: Response distribution (Total respondents: {len(df)})',
+    metadata=chart_meta('Q1-Q4', n=len(df), title='Section F response distribution')
+)
+print('Saved: likert_diverging.png')
+
+summary.to_csv('likert_summary.csv')
+print('Saved: likert_summary.csv')
+
 print('\n=== Analysis Complete ===')
 print(f'Total respondents in dataset: {len(df)}')
 print('\nSummary for each question:')
 for idx, col in enumerate(columns, 1):
-    data = df[col].dropna()
+    stats = summary.loc[col]
     print(f'\nQuestion {idx}:')
-    print(f'  Valid responses: {len(data)}')
-    print(f'  Missing responses: {df[col].isna().sum()}')
-    value_counts = data.value_counts().sort_index()
-    for val, count in value_counts.items():
-        pct = (count / len(data) * 100)
-        print(f'  Option {int(val)}: {int(count)} ({pct:.1f}%)')
+    print(f'  Valid responses: {int(stats["n_valid"])}')
+    print(f'  Missing responses: {int(stats["missing"])}')
+    print(f'  Mean: {stats["mean"]:.2f} | Median: {stats["median"]:.1f} | Mode: {stats["mode"]:.0f}')
+    counts = level_counts(summary, col)
+    low, high = proportion_intervals(counts.values, n=stats['n_valid'])
+    for (val, count), lo, hi in zip(counts.items(), low, high):
+        if count == 0:
+            continue
+        pct = (count / stats['n_valid'] * 100)
+        print(f'  Option {int(val)}: {int(count)} ({format_ci(pct, lo, hi)})')
@@ -0,0 +1,406 @@
+#!/usr/bin/env python3
+"""
+Chart Catalog (SQLite)
+
+This module:
+1. Stores the chart index in a SQLite database (chart_index.db)
+2. Keeps tables for folders, files, content hashes and duplicate filenames
+3. Maintains an FTS5 full-text index over filenames and folder names
+4. Stores chart metadata read from PNG text chunks (dataset, question, n)
+5. Provides a small query API and CLI for searching the catalog
+
+Usage:
+    python chart_catalog.py search "marriages close"
+    python chart_catalog.py search "consanguinity" --dataset A/DATA.csv
+    python chart_catalog.py filter --question Q4
+    python chart_catalog.py duplicates
+    python chart_catalog.py stats
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+from pathlib import Path
+
+from png_metadata import read_png_text
+
+DEFAULT_DB = 'chart_index.db'
+
+# PNG text keywords written by survey_tools/chart_metadata.py
+METADATA_KEYS = {
+    'Title': 'title',
+    'Dataset': 'dataset',
+    'Dataset SHA-256': 'dataset_hash',
+    'Question': 'question',
+    'Valid N': 'valid_n',
+    'Script': 'script',
+    'Render Profile': 'render_profile',
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS folders (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL
+);
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    folder_id INTEGER NOT NULL REFERENCES folders(id),
+    filename TEXT NOT NULL,
+    path TEXT UNIQUE NOT NULL,
+    size INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    hash TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS files_folder ON files(folder_id);
+CREATE INDEX IF NOT EXISTS files_hash ON files(hash);
+CREATE INDEX IF NOT EXISTS files_filename ON files(filename);
+CREATE TABLE IF NOT EXISTS hashes (
+    hash TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    file_count INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS duplicates (
+    filename TEXT NOT NULL,
+    file_id INTEGER NOT NULL REFERENCES files(id),
+    PRIMARY KEY (filename, file_id)
+);
+CREATE TABLE IF NOT EXISTS chart_metadata (
+    file_id INTEGER PRIMARY KEY REFERENCES files(id),
+    title TEXT,
+    dataset TEXT,
+    dataset_hash TEXT,
+    question TEXT,
+    valid_n INTEGER,
+    script TEXT,
+    render_profile TEXT,
+    raw TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS chart_metadata_dataset ON chart_metadata(dataset);
+CREATE INDEX IF NOT EXISTS chart_metadata_question ON chart_metadata(question);
+CREATE VIRTUAL TABLE IF NOT EXISTS chart_search USING fts5(
+    filename, folder, title,
+    tokenize = 'unicode61'
+);
+"""
+
+
+def connect(db_path=DEFAULT_DB):
+    """Open the catalog database, creating the schema if needed."""
+    conn = sqlite3.connect(str(db_path))
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA foreign_keys = ON")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def hash_file(path, chunk_size=1 << 20):
+    """Return the SHA-256 content hash of a file."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def chart_title(filename):
+    """Turn a chart filename into searchable words (underscores → spaces)."""
+    return ' '.join(Path(filename).stem.replace('_', ' ').split())
+
+
+def store_metadata(conn, file_id, filename, png_path):
+    """Read a chart's PNG text chunks and store them for filtering and search."""
+    raw = read_png_text(png_path)
+    columns = {col: raw.get(key) for key, col in METADATA_KEYS.items()}
+    try:
+        columns['valid_n'] = int(columns['valid_n']) if columns['valid_n'] else None
+    except ValueError:
+        columns['valid_n'] = None
+
+    conn.execute(
+        "INSERT OR REPLACE INTO chart_metadata(file_id, title, dataset, dataset_hash, question, "
+        "valid_n, script, render_profile, raw) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        (file_id, columns['title'], columns['dataset'], columns['dataset_hash'],
+         columns['question'], columns['valid_n'], columns['script'],
+         columns['render_profile'], json.dumps(raw)))
+
+    title = chart_title(filename)
+    if columns['title']:
+        title = f"{title} {columns['title']}"
+    conn.execute("UPDATE chart_search SET title = ? WHERE rowid = ?", (title, file_id))
+
+
+def _folder_id(conn, folder):
+    """Return the id of a folder row, inserting it if missing."""
+    conn.execute("INSERT OR IGNORE INTO folders(path) VALUES (?)", (folder,))
+    return conn.execute("SELECT id FROM folders WHERE path = ?", (folder,)).fetchone()[0]
+
+
+def sync_catalog(conn, folder_index, root_dir):
+    """
+    Bring the catalog in line with a folder index.
+
+    Files whose size and mtime are unchanged keep their stored hash, so only
+    new or modified charts are read from disk. Files no longer present in
+    the index are removed.
+
+    Args:
+        conn: Open catalog connection
+        folder_index: Dictionary of folders and their PNG files
+        root_dir: Root directory the relative paths are resolved against
+
+    Returns:
+        Dictionary with counts of added, updated, unchanged and removed files
+    """
+    root_path = Path(root_dir)
+    stats = {'added': 0, 'updated': 0, 'unchanged': 0, 'removed': 0}
+
+    known = {row['path']: row for row in
+             conn.execute("SELECT f.id, f.path, f.size, f.mtime, f.hash, "
+                          "m.file_id IS NOT NULL AS has_metadata "
+                          "FROM files f LEFT JOIN chart_metadata m ON m.file_id = f.id")}
+    seen = set()
+
+    with conn:
+        for folder, files in folder_index.items():
+            folder_id = _folder_id(conn, folder)
+            for file_info in files:
+                rel_path = file_info['full_path']
+                seen.add(rel_path)
+                st = os.stat(root_path / rel_path)
+                row = known.get(rel_path)
+
+                if row is not None and row['size'] == st.st_size and row['mtime'] == st.st_mtime:
+                    if not row['has_metadata']:
+                        store_metadata(conn, row['id'], file_info['filename'], root_path / rel_path)
+                    stats['unchanged'] += 1
+                    continue
+
+                content_hash = hash_file(root_path / rel_path)
+                if row is None:
+                    cur = conn.execute(
+                        "INSERT INTO files(folder_id, filename, path, size, mtime, hash) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        (folder_id, file_info['filename'], rel_path,
+                         st.st_size, st.st_mtime, content_hash))
+                    conn.execute(
+                        "INSERT INTO chart_search(rowid, filename, folder, title) VALUES (?, ?, ?, ?)",
+                        (cur.lastrowid, file_info['filename'], folder,
+                         chart_title(file_info['filename'])))
+                    store_metadata(conn, cur.lastrowid, file_info['filename'], root_path / rel_path)
+                    stats['added'] += 1
+                else:
+                    conn.execute(
+                        "UPDATE files SET size = ?, mtime = ?, hash = ? WHERE id = ?",
+                        (st.st_size, st.st_mtime, content_hash, row['id']))
+                    store_metadata(conn, row['id'], file_info['filename'], root_path / rel_path)
+                    stats['updated'] += 1
+
+        for rel_path, row in known.items():
+            if rel_path not in seen:
+                remove_file(conn, row['id'])
+                stats['removed'] += 1
+
+        _refresh_derived_tables(conn)
+
+    return stats
+
+
+def remove_file(conn, file_id):
+    """Delete a file row and its search entry."""
+    conn.execute("DELETE FROM duplicates WHERE file_id = ?", (file_id,))
+    conn.execute("DELETE FROM chart_metadata WHERE file_id = ?", (file_id,))
+    conn.execute("DELETE FROM chart_search WHERE rowid = ?", (file_id,))
+    conn.execute("DELETE FROM files WHERE id = ?", (file_id,))
+
+
+def _refresh_derived_tables(conn):
+    """Recompute the hashes and duplicates tables from the files table."""
+    conn.execute("DELETE FROM hashes")
+    conn.execute(
+        "INSERT INTO hashes(hash, size, file_count) "
+        "SELECT hash, MAX(size), COUNT(*) FROM files GROUP BY hash")
+
+    conn.execute("DELETE FROM duplicates")
+    conn.execute(
+        "INSERT INTO duplicates(filename, file_id) "
+        "SELECT filename, id FROM files WHERE filename IN "
+        "(SELECT filename FROM files GROUP BY filename HAVING COUNT(*) > 1)")
+
+    conn.execute("DELETE FROM folders WHERE id NOT IN (SELECT DISTINCT folder_id FROM files)")
+
+
+def _fts_query(text):
+    """Build an FTS5 prefix query from free text, quoting each term."""
+    terms = [t for t in ''.join(c if c.isalnum() else ' ' for c in text).split() if t]
+    return ' '.join(f'"{t}"*' for t in terms)
+
+
+_RESULT_COLUMNS = ("SELECT f.filename, d.path AS folder, f.path, f.hash, "
+                   "m.title, m.dataset, m.question, m.valid_n, m.script ")
+
+
+def _metadata_filters(dataset, question):
+    """Build SQL conditions for the optional metadata filters."""
+    sql, params = '', []
+    if dataset is not None:
+        sql += " AND m.dataset = ?"
+        params.append(dataset)
+    if question is not None:
+        sql += " AND m.question = ?"
+        params.append(question)
+    return sql, params
+
+
+def search(conn, text, folder=None, dataset=None, question=None, limit=50):
+    """
+    Search the catalog by filename / folder name / chart title.
+
+    Args:
+        conn: Open catalog connection
+        text: Free-text query, e.g. "marriages close"
+        folder: Optional folder path to restrict results to
+        dataset: Optional source dataset (as recorded in the PNG metadata)
+        question: Optional question id (as recorded in the PNG metadata)
+        limit: Maximum number of results
+
+    Returns:
+        List of dictionaries with filename, folder, path, hash and metadata
+    """
+    query = _fts_query(text)
+    if not query:
+        return filter_charts(conn, folder=folder, dataset=dataset, question=question, limit=limit)
+
+    sql = (_RESULT_COLUMNS +
+           "FROM chart_search s "
+           "JOIN files f ON f.id = s.rowid "
+           "JOIN folders d ON d.id = f.folder_id "
+           "LEFT JOIN chart_metadata m ON m.file_id = f.id "
+           "WHERE chart_search MATCH ?")
+    params = [query]
+    if folder is not None:
+        sql += " AND d.path = ?"
+        params.append(folder)
+    extra_sql, extra_params = _metadata_filters(dataset, question)
+    sql += extra_sql + " ORDER BY bm25(chart_search) LIMIT ?"
+    params += extra_params + [limit]
+
+    return [dict(row) for row in conn.execute(sql, params)]
+
+
+def filter_charts(conn, folder=None, dataset=None, question=None, limit=None):
+    """List charts matching folder / dataset / question filters (no text query)."""
+    sql = (_RESULT_COLUMNS +
+           "FROM files f "
+           "JOIN folders d ON d.id = f.folder_id "
+           "LEFT JOIN chart_metadata m ON m.file_id = f.id "
+           "WHERE 1 = 1")
+    params = []
+    if folder is not None:
+        sql += " AND d.path = ?"
+        params.append(folder)
+    extra_sql, extra_params = _metadata_filters(dataset, question)
+    sql += extra_sql + " ORDER BY f.path"
+    params += extra_params
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(limit)
+
+    return [dict(row) for row in conn.execute(sql, params)]
+
+
+def duplicate_filenames(conn):
+    """Return {filename: [paths]} for filenames found in more than one folder."""
+    result = {}
+    for row in conn.execute(
+            "SELECT d.filename, f.path FROM duplicates d "
+            "JOIN files f ON f.id = d.file_id ORDER BY d.filename, f.path"):
+        result.setdefault(row['filename'], []).append(row['path'])
+    return result
+
+
+def duplicate_contents(conn):
+    """Return {hash: [paths]} for charts whose bytes are identical."""
+    result = {}
+    for row in conn.execute(
+            "SELECT f.hash, f.path FROM files f JOIN hashes h ON h.hash = f.hash "
+            "WHERE h.file_count > 1 ORDER BY f.hash, f.path"):
+        result.setdefault(row['hash'], []).append(row['path'])
+    return result
+
+
+def hashes_by_path(conn):
+    """Return {chart_path: content_hash} for every catalogued chart."""
+    return {row['path']: row['hash'] for row in conn.execute("SELECT path, hash FROM files")}
+
+
+def catalog_stats(conn):
+    """Return summary counts for the catalog."""
+    one = lambda sql: conn.execute(sql).fetchone()[0]
+    return {
+        'total_files': one("SELECT COUNT(*) FROM files"),
+        'total_folders': one("SELECT COUNT(*) FROM folders"),
+        'duplicate_count': one("SELECT COUNT(DISTINCT filename) FROM duplicates"),
+        'identical_content_groups': one("SELECT COUNT(*) FROM hashes WHERE file_count > 1"),
+        'charts_with_metadata': one("SELECT COUNT(*) FROM chart_metadata WHERE dataset IS NOT NULL"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Query the SQLite chart catalog.')
+    parser.add_argument('--db', default=DEFAULT_DB, help='Catalog database path')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    search_parser = sub.add_parser('search', help='Full-text search over filenames and folders')
+    search_parser.add_argument('query')
+    search_parser.add_argument('--folder', help='Restrict results to one folder')
+    search_parser.add_argument('--dataset', help='Restrict results to one source dataset')
+    search_parser.add_argument('--question', help='Restrict results to one question id')
+    search_parser.add_argument('--limit', type=int, default=50)
+
+    filter_parser = sub.add_parser('filter', help='List charts by folder, dataset or question')
+    filter_parser.add_argument('--folder')
+    filter_parser.add_argument('--dataset')
+    filter_parser.add_argument('--question')
+
+    sub.add_parser('duplicates', help='List duplicate filenames and identical files')
+    sub.add_parser('stats', help='Show catalog summary')
+
+    args = parser.parse_args()
+    if not Path(args.db).exists():
+        parser.error(f"{args.db} not found - run index_and_rename_charts.py first")
+    conn = connect(args.db)
+
+    if args.command in ('search', 'filter'):
+        if args.command == 'search':
+            results = search(conn, args.query, folder=args.folder, dataset=args.dataset,
+                             question=args.question, limit=args.limit)
+            print(f"🔍 {len(results)} result(s) for '{args.query}'\n")
+        else:
+            results = filter_charts(conn, folder=args.folder, dataset=args.dataset,
+                                    question=args.question)
+            print(f"🔍 {len(results)} chart(s)\n")
+        for r in results:
+            details = ', '.join(f"{k}={r[k]}" for k in ('dataset', 'question', 'valid_n') if r[k])
+            print(f"  • {r['path']}" + (f"  [{details}]" if details else ''))
+    elif args.command == 'duplicates':
+        print("⚠️  DUPLICATE FILENAMES")
+        for filename, paths in duplicate_filenames(conn).items():
+            print(f"\n📄 {filename}")
+            for p in paths:
+                print(f"  • {p}")
+        print("\n🧬 IDENTICAL CONTENT")
+        for content_hash, paths in duplicate_contents(conn).items():
+            print(f"\n  {content_hash[:12]}")
+            for p in paths:
+                print(f"  • {p}")
+    else:
+        for key, value in catalog_stats(conn).items():
+            print(f"  {key}: {value}")
+
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Contact Sheets and Sprite Atlases
+
+This module:
+1. Composes every chart in a folder into one sprite atlas (WebP) plus a
+   JSON coordinate map, so the viewer needs one request per folder
+2. Builds a captioned contact sheet per folder for reviewers
+3. Tiles the images with NumPy (pad to a uniform cell, then one
+   reshape/transpose) instead of pasting them one by one
+4. Caches both by the content hashes of the folder's charts
+
+Outputs go to .thumbnails/sheets/ next to the thumbnail pyramid.
+"""
+
+import hashlib
+import json
+import math
+from pathlib import Path
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from chart_thumbnails import THUMB_DIR
+
+SHEET_DIR = 'sheets'
+CELL_SIZE = 256
+CAPTION_HEIGHT = 28
+BACKGROUND = (255, 255, 255, 255)
+
+
+def _folder_slug(folder):
+    """Turn a folder path into a safe file stem."""
+    slug = ''.join(c if c.isalnum() or c in '-_' else '_' for c in folder)
+    return slug or 'root'
+
+
+def load_cell(path, cell=CELL_SIZE):
+    """
+    Load one chart as an RGBA array padded (centered) to cell x cell.
+
+    Images larger than the cell are downsampled first, keeping the aspect ratio.
+    """
+    with Image.open(path) as img:
+        img = img.convert('RGBA')
+        if max(img.size) > cell:
+            img.thumbnail((cell, cell), Image.LANCZOS)
+        pixels = np.asarray(img)
+
+    out = np.empty((cell, cell, 4), dtype=np.uint8)
+    out[...] = BACKGROUND
+    h, w = pixels.shape[:2]
+    top, left = (cell - h) // 2, (cell - w) // 2
+    out[top:top + h, left:left + w] = pixels
+    return out
+
+
+def tile_cells(cells, columns):
+    """
+    Tile a (n, h, w, c) stack into one (rows*h, columns*w, c) image.
+
+    The stack is padded with blank cells to fill the last row, then laid out
+    with a single reshape/transpose (no per-image copies).
+    """
+    n, h, w, c = cells.shape
+    rows = math.ceil(n / columns)
+    padded = np.empty((rows * columns, h, w, c), dtype=cells.dtype)
+    padded[...] = BACKGROUND[:c]
+    padded[:n] = cells
+    return (padded.reshape(rows, columns, h, w, c)
+                  .transpose(0, 2, 1, 3, 4)
+                  .reshape(rows * h, columns * w, c))
+
+
+def _caption_strips(labels, width, height=CAPTION_HEIGHT):
+    """Render one caption strip per label as a (n, height, width, 4) array."""
+    strips = np.empty((len(labels), height, width, 4), dtype=np.uint8)
+    for i, label in enumerate(labels):
+        strip = Image.new('RGBA', (width, height), BACKGROUND)
+        draw = ImageDraw.Draw(strip)
+        text = label if len(label) <= 40 else label[:37] + '...'
+        draw.text((4, height // 4), text, fill=(0, 0, 0, 255))
+        strips[i] = np.asarray(strip)
+    return strips
+
+
+def build_folder_sheets(folder, files, root_dir, thumbnails=None, cell=CELL_SIZE, columns=None,
+                        hashes=None):
+    """
+    Build the sprite atlas, coordinate map and contact sheet for one folder.
+
+    Args:
+        folder: Folder path as used in the index (e.g. 'D')
+        files: List of file dicts from organize_by_folder
+        root_dir: Root directory the chart paths are relative to
+        thumbnails: {chart_path: {size: thumb_path}} from chart_thumbnails
+        cell: Cell size in pixels
+        columns: Grid width (defaults to a roughly square grid)
+        hashes: {chart_path: content_hash} used for cache keys
+
+    Returns:
+        Dictionary with the atlas/sheet/map paths and tile coordinates
+    """
+    root_path = Path(root_dir)
+    thumbnails = thumbnails or {}
+    hashes = hashes or {}
+    files = sorted(files, key=lambda f: f['filename'])
+    columns = columns or max(1, math.ceil(math.sqrt(len(files))))
+
+    # Cache key: the folder's charts (paths + content) and the layout
+    key = hashlib.sha256(json.dumps(
+        [cell, columns] + [(f['full_path'], hashes.get(f['full_path'], '')) for f in files]
+    ).encode('utf-8')).hexdigest()[:16]
+
+    out_dir = root_path / THUMB_DIR / SHEET_DIR
+    stem = f"{_folder_slug(folder)}.{key}"
+    atlas_path = out_dir / f"{stem}.atlas.webp"
+    sheet_path = out_dir / f"{stem}.sheet.jpg"
+    map_path = out_dir / f"{stem}.atlas.json"
+
+    if atlas_path.exists() and sheet_path.exists() and map_path.exists():
+        return json.loads(map_path.read_text(encoding='utf-8'))
+
+    sources = []
+    for f in files:
+        thumb = thumbnails.get(f['full_path'], {}).get(str(cell))
+        sources.append(root_path / thumb if thumb and (root_path / thumb).exists()
+                       else root_path / f['full_path'])
+
+    cells = np.stack([load_cell(src, cell) for src in sources])
+
+    # Sprite atlas: plain grid of cells
+    atlas = tile_cells(cells, columns)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    Image.fromarray(atlas, 'RGBA').save(atlas_path, format='WEBP', quality=85, method=4)
+
+    # Contact sheet: the same cells with a caption strip underneath each one
+    labels = [f['filename'] for f in files]
+    captioned = np.concatenate([cells, _caption_strips(labels, cell)], axis=1)
+    sheet = tile_cells(captioned, columns)
+    Image.fromarray(sheet, 'RGBA').convert('RGB').save(sheet_path, format='JPEG', quality=88)
+
+    idx = np.arange(len(files))
+    xs, ys = (idx % columns) * cell, (idx // columns) * cell
+    atlas_map = {
+        'folder': folder,
+        'image': atlas_path.relative_to(root_path).as_posix(),
+        'sheet': sheet_path.relative_to(root_path).as_posix(),
+        'map': map_path.relative_to(root_path).as_posix(),
+        'cell': cell,
+        'columns': columns,
+        'width': int(atlas.shape[1]),
+        'height': int(atlas.shape[0]),
+        'tiles': {
+            f['full_path']: [int(x), int(y), cell, cell]
+            for f, x, y in zip(files, xs, ys)
+        },
+    }
+    map_path.write_text(json.dumps(atlas_map, indent=2), encoding='utf-8')
+
+    # Drop sheets built for an older state of this folder
+    for old in out_dir.glob(f"{_folder_slug(folder)}.*"):
+        if not old.name.startswith(stem + '.'):
+            old.unlink()
+
+    return atlas_map
+
+
+def build_contact_sheets(folder_index, root_dir, thumbnails=None, hashes=None, cell=CELL_SIZE):
+    """
+    Build atlases and contact sheets for every folder in the index.
+
+    Returns:
+        {folder: atlas_map} as produced by build_folder_sheets
+    """
+    atlases = {}
+    for folder, files in folder_index.items():
+        if not files:
+            continue
+        try:
+            atlases[folder] = build_folder_sheets(folder, files, root_dir, thumbnails,
+                                                  cell=cell, hashes=hashes)
+        except Exception as e:
+            print(f"  ✗ Contact sheet failed for {folder}: {e}")
+    return atlases
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Chart Thumbnail Pyramid
+
+This module:
+1. Generates multi-resolution thumbnails (256 px and 1024 px by default)
+2. Caches them by content hash so unchanged charts are never reprocessed
+3. Runs the resizing in a process pool
+4. Records the thumbnail paths in the SQLite catalog
+
+Thumbnails are written as WebP under .thumbnails/<size>/<hash>.webp, so
+the indexer's *.png scan never picks them up.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from PIL import Image
+
+THUMB_DIR = '.thumbnails'
+THUMB_SIZES = (1024, 256)
+THUMB_FORMAT = 'webp'
+
+THUMB_SCHEMA = """
+CREATE TABLE IF NOT EXISTS thumbnails (
+    hash TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    path TEXT NOT NULL,
+    width INTEGER NOT NULL,
+    height INTEGER NOT NULL,
+    PRIMARY KEY (hash, size)
+);
+"""
+
+
+def thumbnail_path(content_hash, size, thumb_dir=THUMB_DIR):
+    """Return the relative cache path for one thumbnail level."""
+    return Path(thumb_dir) / str(size) / f"{content_hash}.{THUMB_FORMAT}"
+
+
+def render_pyramid(source, content_hash, root_dir, sizes=THUMB_SIZES, thumb_dir=THUMB_DIR):
+    """
+    Render every missing pyramid level for one chart.
+
+    Levels are produced from largest to smallest, each one downsampled from
+    the previous level rather than from the full-resolution image.
+
+    Returns:
+        List of (size, relative_path, width, height) tuples
+    """
+    root_path = Path(root_dir)
+    levels = []
+    img = None
+
+    for size in sorted(sizes, reverse=True):
+        rel_path = thumbnail_path(content_hash, size, thumb_dir)
+        out_path = root_path / rel_path
+
+        if out_path.exists():
+            img = Image.open(out_path)
+            img.load()
+            levels.append((size, rel_path.as_posix(), *img.size))
+            continue
+
+        if img is None:
+            img = Image.open(root_path / source)
+            img.load()
+            if img.mode not in ('RGB', 'RGBA'):
+                img = img.convert('RGBA')
+
+        img = img.copy()
+        img.thumbnail((size, size), Image.LANCZOS)
+
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = out_path.with_suffix('.tmp')
+        img.save(tmp_path, format=THUMB_FORMAT.upper(), quality=85, method=4)
+        os.replace(tmp_path, out_path)
+        levels.append((size, rel_path.as_posix(), *img.size))
+
+    return levels
+
+
+def _render_job(args):
+    """Process-pool entry point."""
+    source, content_hash, root_dir, sizes, thumb_dir = args
+    try:
+        return content_hash, render_pyramid(source, content_hash, root_dir, sizes, thumb_dir), None
+    except Exception as e:
+        return content_hash, [], str(e)
+
+
+def _pending_hashes(conn, sizes):
+    """Return (hash, path) rows for charts missing at least one pyramid level."""
+    placeholders = ','.join('?' * len(sizes))
+    return conn.execute(
+        f"SELECT f.hash, MIN(f.path) AS path FROM files f "
+        f"LEFT JOIN thumbnails t ON t.hash = f.hash AND t.size IN ({placeholders}) "
+        f"GROUP BY f.hash HAVING COUNT(DISTINCT t.size) < ?",
+        (*sizes, len(sizes))).fetchall()
+
+
+def generate_thumbnails(conn, root_dir, sizes=THUMB_SIZES, thumb_dir=THUMB_DIR, workers=None):
+    """
+    Make sure every catalogued chart has a full thumbnail pyramid.
+
+    Only content hashes without a complete set of thumbnail rows are sent to
+    the worker pool; identical charts in different folders share one set.
+
+    Args:
+        conn: Open catalog connection (see chart_catalog.connect)
+        root_dir: Root directory the catalog paths are relative to
+        sizes: Longest-edge sizes of the pyramid levels
+        thumb_dir: Cache directory, relative to root_dir
+        workers: Process pool size (defaults to the CPU count)
+
+    Returns:
+        Dictionary with counts of generated, cached and failed charts
+    """
+    conn.executescript(THUMB_SCHEMA)
+    sizes = tuple(sorted(set(sizes), reverse=True))
+    root_path = Path(root_dir)
+
+    # Rows can outlive a deleted cache directory; drop those so they get rebuilt.
+    stale = [(row['hash'], row['size']) for row in conn.execute("SELECT hash, size, path FROM thumbnails")
+             if not (root_path / row['path']).exists()]
+    if stale:
+        with conn:
+            conn.executemany("DELETE FROM thumbnails WHERE hash = ? AND size = ?", stale)
+
+    pending = _pending_hashes(conn, sizes)
+    total = conn.execute("SELECT COUNT(DISTINCT hash) FROM files").fetchone()[0]
+    stats = {'generated': 0, 'cached': total - len(pending), 'failed': 0}
+    if not pending:
+        return stats
+
+    jobs = [(row['path'], row['hash'], str(root_dir), sizes, thumb_dir) for row in pending]
+    if len(jobs) == 1 or workers == 1:
+        results = list(map(_render_job, jobs))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_render_job, jobs, chunksize=max(1, len(jobs) // 32)))
+
+    with conn:
+        for content_hash, levels, error in results:
+            if error:
+                stats['failed'] += 1
+                print(f"  ✗ Thumbnail failed for {content_hash[:12]}: {error}")
+                continue
+            conn.executemany(
+                "INSERT OR REPLACE INTO thumbnails(hash, size, path, width, height) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(content_hash, *level) for level in levels])
+            stats['generated'] += 1
+
+    return stats
+
+
+def prune_thumbnails(conn, root_dir):
+    """Delete cached thumbnails whose content hash is no longer catalogued."""
+    conn.executescript(THUMB_SCHEMA)
+    orphans = conn.execute(
+        "SELECT hash, size, path FROM thumbnails "
+        "WHERE hash NOT IN (SELECT hash FROM files)").fetchall()
+    with conn:
+        for row in orphans:
+            path = Path(root_dir) / row['path']
+            if path.exists():
+                path.unlink()
+            conn.execute("DELETE FROM thumbnails WHERE hash = ? AND size = ?",
+                         (row['hash'], row['size']))
+    return len(orphans)
+
+
+def thumbnails_by_path(conn):
+    """Return {chart_path: {size: thumbnail_path}} for every catalogued chart."""
+    conn.executescript(THUMB_SCHEMA)
+    result = {}
+    for row in conn.execute(
+            "SELECT f.path AS chart, t.size, t.path FROM files f "
+            "JOIN thumbnails t ON t.hash = f.hash"):
+        result.setdefault(row['chart'], {})[str(row['size'])] = row['path']
+    return result
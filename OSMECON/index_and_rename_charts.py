@@ -7,20 +7,45 @@ This script:
 2. Creates an index organized by folder
 3. Detects duplicate filenames and renumbers them
 4. Generates both a text index and JSON index
+5. Updates the SQLite catalog (chart_index.db) with full-text search
+6. Generates cached 256/1024 px thumbnails for the viewer
+7. Optionally watches the chart folders and keeps everything up to date
+8. Optionally builds a contact sheet and sprite atlas per folder
+
+Usage:
+    python index_and_rename_charts.py                     # one-off index (asks before renaming)
+    python index_and_rename_charts.py --watch             # keep the index live while charts change
+    python index_and_rename_charts.py --contact-sheets    # also build per-folder sheets/atlases
 """
 
 import os
+import re
 import json
+import time
+import argparse
 from pathlib import Path
 from collections import defaultdict
 import shutil
 
+from chart_catalog import connect as connect_catalog, hashes_by_path, sync_catalog
+from chart_contact_sheets import build_contact_sheets
+from chart_thumbnails import THUMB_DIR, generate_thumbnails, prune_thumbnails, thumbnails_by_path
+
+def is_png(name):
+    """True for PNG file names, whatever the extension's case ('Chart.PNG')."""
+    return name.lower().endswith('.png')
+
 def find_all_png_files(root_dir):
     """Find all PNG files in the directory tree."""
     png_files = []
     root_path = Path(root_dir)
     
-    for png_file in root_path.rglob("*.png"):
+    for png_file in root_path.rglob("*"):
+        if not is_png(png_file.name):
+            continue
+        # Skip anything inside the thumbnail cache
+        if THUMB_DIR in png_file.relative_to(root_path).parts:
+            continue
         if png_file.is_file():
             png_files.append(png_file)
     
@@ -159,8 +184,16 @@ def create_index_report(folder_index, duplicates, output_file='chart_index.txt')
     
     return output_file
 
-def create_json_index(folder_index, duplicates, rename_operations, output_file='chart_index.json'):
-    """Create a machine-readable JSON index."""
+def build_index_data(folder_index, duplicates, rename_operations, thumbnails=None, atlases=None):
+    """Build the index structure shared by the JSON index and the HTML viewer."""
+    thumbnails = thumbnails or {}
+
+    def file_entry(f):
+        entry = {'filename': f['filename'], 'path': f['full_path']}
+        if f['full_path'] in thumbnails:
+            entry['thumbnails'] = thumbnails[f['full_path']]
+        return entry
+
     index_data = {
         'summary': {
             'total_files': sum(len(files) for files in folder_index.values()),
@@ -173,40 +206,31 @@ def create_json_index(folder_index, duplicates, rename_operations, output_file='
             for filename, locations in duplicates.items()
         },
         'folders': {
-            folder: [{'filename': f['filename'], 'path': f['full_path']} 
-                    for f in files]
+            folder: [file_entry(f) for f in files]
             for folder, files in folder_index.items()
         },
         'rename_operations': rename_operations
     }
+    if atlases:
+        index_data['atlases'] = atlases
+    return index_data
+
+def create_json_index(folder_index, duplicates, rename_operations, output_file='chart_index.json',
+                      thumbnails=None, atlases=None):
+    """Create a machine-readable JSON index."""
+    index_data = build_index_data(folder_index, duplicates, rename_operations, thumbnails, atlases)
     
     with open(output_file, 'w', encoding='utf-8') as f:
         json.dump(index_data, f, indent=2)
     
     return output_file
 
-def create_html_viewer(folder_index, duplicates, rename_operations, output_file='chart_viewer.html'):
+def create_html_viewer(folder_index, duplicates, rename_operations, output_file='chart_viewer.html',
+                       thumbnails=None, atlases=None):
     """Create an HTML viewer with embedded JSON data (no CORS issues)."""
     
     # Prepare the data structure
-    index_data = {
-        'summary': {
-            'total_files': sum(len(files) for files in folder_index.values()),
-            'total_folders': len(folder_index),
-            'duplicate_count': len(duplicates)
-        },
-        'duplicates': {
-            filename: [{'folder': loc['folder'], 'path': loc['full_path']} 
-                      for loc in locations]
-            for filename, locations in duplicates.items()
-        },
-        'folders': {
-            folder: [{'filename': f['filename'], 'path': f['full_path']} 
-                    for f in files]
-            for folder, files in folder_index.items()
-        },
-        'rename_operations': rename_operations
-    }
+    index_data = build_index_data(folder_index, duplicates, rename_operations, thumbnails, atlases)
     
     # Read the HTML template
     html_template = Path('chart_viewer.html').read_text()
@@ -220,16 +244,164 @@ def create_html_viewer(folder_index, duplicates, rename_operations, output_file=
         f'        // Load JSON data\n        async function loadChartData() {{\n            try {{\n                // Embedded JSON data (no CORS issues)\n                chartData = {json_data};'
     )
     
+    # The viewer may already carry data from a previous run; swap it for the new index
+    modified_html = re.sub(
+        r'(// Embedded JSON data \(no CORS issues\)\n\s*chartData = )\{\n.*?\n\}',
+        lambda m: m.group(1) + json_data,
+        modified_html, count=1, flags=re.DOTALL
+    )
+    
     # Write the modified HTML
     with open(output_file, 'w', encoding='utf-8') as f:
         f.write(modified_html)
     
     return output_file
 
+def update_index_outputs(folder_index, duplicates, rename_operations, root_dir, quiet=False,
+                         contact_sheets=False):
+    """
+    Bring the SQLite catalog, thumbnails and text/JSON/HTML indexes up to date.
+
+    The catalog only re-hashes files whose size or mtime changed and
+    thumbnails are cached by content hash, so calling this repeatedly is cheap.
+    """
+    log = (lambda *a, **k: None) if quiet else print
+    
+    # Step 4: Update SQLite catalog
+    log("Step 4: Updating SQLite catalog...")
+    conn = connect_catalog('chart_index.db')
+    stats = sync_catalog(conn, folder_index, root_dir)
+    log(f"  ✓ Catalog: chart_index.db "
+        f"({stats['added']} added, {stats['updated']} updated, "
+        f"{stats['unchanged']} unchanged, {stats['removed']} removed)\n")
+    
+    # Step 5: Generate thumbnails
+    log("Step 5: Generating thumbnails...")
+    thumb_stats = generate_thumbnails(conn, root_dir)
+    thumb_stats['pruned'] = prune_thumbnails(conn, root_dir)
+    thumbnails = thumbnails_by_path(conn)
+    hashes = hashes_by_path(conn)
+    conn.close()
+    log(f"  ✓ Thumbnails: {thumb_stats['generated']} generated, "
+        f"{thumb_stats['cached']} cached, {thumb_stats['failed']} failed\n")
+    
+    atlases = None
+    if contact_sheets:
+        log("Step 5b: Building contact sheets and sprite atlases...")
+        atlases = build_contact_sheets(folder_index, root_dir, thumbnails, hashes)
+        log(f"  ✓ {len(atlases)} folder atlases\n")
+    
+    # Step 6: Create index reports
+    log("Step 6: Creating index reports...")
+    txt_file = create_index_report(folder_index, duplicates, 'chart_index.txt')
+    json_file = create_json_index(folder_index, duplicates, rename_operations, 'chart_index.json',
+                                  thumbnails=thumbnails, atlases=atlases)
+    html_file = create_html_viewer(folder_index, duplicates, rename_operations, 'chart_viewer.html',
+                                   thumbnails=thumbnails, atlases=atlases)
+    
+    log(f"  ✓ Text index: {txt_file}")
+    log(f"  ✓ JSON index: {json_file}")
+    log(f"  ✓ HTML viewer: {html_file}\n")
+    
+    return {'catalog': stats, 'thumbnails': thumb_stats,
+            'files': (txt_file, json_file, html_file)}
+
+def snapshot_png_files(root_dir):
+    """Return {relative_path: (size, mtime)} for every PNG under root_dir."""
+    root_path = Path(root_dir)
+    snapshot = {}
+    for dirpath, dirnames, filenames in os.walk(root_path):
+        # Don't descend into the thumbnail cache
+        dirnames[:] = [d for d in dirnames if d != THUMB_DIR]
+        for name in filenames:
+            if not is_png(name):
+                continue
+            full_path = os.path.join(dirpath, name)
+            try:
+                st = os.stat(full_path)
+            except FileNotFoundError:
+                continue  # removed between listdir and stat
+            snapshot[os.path.relpath(full_path, root_path)] = (st.st_size, st.st_mtime)
+    return snapshot
+
+def watch_charts(root_dir, interval=2.0, debounce=5.0, max_cycles=None, contact_sheets=False):
+    """
+    Poll the chart folders and update the index whenever charts change.
+
+    A burst of writes (a section script saving a dozen charts) is collapsed
+    into one update: after the first change is seen, the index is only
+    rebuilt once the tree has been quiet for `debounce` seconds. Duplicate
+    filenames are reported but never renamed in watch mode.
+
+    Args:
+        root_dir: Root directory to watch
+        interval: Seconds between polls
+        debounce: Quiet period required before updating
+        max_cycles: Stop after this many updates (None = run until Ctrl+C)
+        contact_sheets: Also rebuild per-folder contact sheets and atlases
+    """
+    print(f"👀 Watching {root_dir} (poll every {interval}s, debounce {debounce}s) - Ctrl+C to stop\n")
+    
+    last_snapshot = None
+    pending_since = None
+    cycles = 0
+    
+    try:
+        while max_cycles is None or cycles < max_cycles:
+            snapshot = snapshot_png_files(root_dir)
+            
+            if snapshot != last_snapshot:
+                if last_snapshot is not None:
+                    added = snapshot.keys() - last_snapshot.keys()
+                    removed = last_snapshot.keys() - snapshot.keys()
+                    changed = {p for p in snapshot.keys() & last_snapshot.keys()
+                               if snapshot[p] != last_snapshot[p]}
+                    print(f"  … {len(added)} added, {len(changed)} changed, {len(removed)} removed")
+                last_snapshot = snapshot
+                pending_since = time.monotonic()
+            
+            if pending_since is not None and time.monotonic() - pending_since >= debounce:
+                png_files = [Path(root_dir) / p for p in sorted(snapshot)]
+                folder_index = organize_by_folder(png_files, root_dir)
+                duplicates, _ = detect_and_handle_duplicates(folder_index, rename_mode='dry_run',
+                                                             root_dir=root_dir)
+                result = update_index_outputs(folder_index, duplicates, [], root_dir, quiet=True,
+                                              contact_sheets=contact_sheets)
+                
+                stats = result['catalog']
+                thumb_stats = result['thumbnails']
+                print(f"🔄 {time.strftime('%H:%M:%S')} index updated: "
+                      f"{stats['added']} added, {stats['updated']} updated, {stats['removed']} removed; "
+                      f"{thumb_stats['generated']} thumbnails generated"
+                      + (f" (⚠️  {len(duplicates)} duplicate filenames)" if duplicates else ''))
+                pending_since = None
+                cycles += 1
+                continue
+            
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        print("\n👋 Stopped watching")
+
 def main():
+    parser = argparse.ArgumentParser(description='Index chart images and rename duplicates.')
+    parser.add_argument('--watch', action='store_true',
+                        help='Keep running and update the index whenever charts change')
+    parser.add_argument('--interval', type=float, default=2.0,
+                        help='Watch mode: seconds between polls (default: 2)')
+    parser.add_argument('--debounce', type=float, default=5.0,
+                        help='Watch mode: quiet seconds before updating (default: 5)')
+    parser.add_argument('--contact-sheets', action='store_true',
+                        help='Build a contact sheet and sprite atlas for every folder')
+    args = parser.parse_args()
+    
     # Get the workspace root (current directory or parent)
     workspace_root = Path.cwd()
     
+    if args.watch:
+        watch_charts(workspace_root, interval=args.interval, debounce=args.debounce,
+                     contact_sheets=args.contact_sheets)
+        return
+    
     print("=" * 80)
     print("📊 CHART IMAGE INDEXER AND DUPLICATE RENAMER")
     print("=" * 80)
@@ -270,25 +442,18 @@ def main():
     else:
         print("  ✓ No duplicate filenames found\n")
         rename_operations = []
-        print("  ✓ No duplicate filenames found\n")
-        rename_operations = []
-    
-    # Step 4: Create index reports
-    print("Step 4: Creating index reports...")
-    txt_file = create_index_report(folder_index, duplicates, 'chart_index.txt')
-    json_file = create_json_index(folder_index, duplicates, rename_operations, 'chart_index.json')
-    html_file = create_html_viewer(folder_index, duplicates, rename_operations, 'chart_viewer.html')
     
-    print(f"  ✓ Text index: {txt_file}")
-    print(f"  ✓ JSON index: {json_file}")
-    print(f"  ✓ HTML viewer: {html_file}\n")
+    result = update_index_outputs(folder_index, duplicates, rename_operations, workspace_root,
+                                  contact_sheets=args.contact_sheets)
+    txt_file, json_file, html_file = result['files']
     
     print("=" * 80)
     print("✅ COMPLETE!")
     print("=" * 80)
     print(f"\n📄 View the index: {txt_file}")
     print(f"📄 JSON data: {json_file}")
-    print(f"🌐 Open in browser: {html_file}\n")
+    print(f"🌐 Open in browser: {html_file}")
+    print(f"🗄️  Search the catalog: python chart_catalog.py search \"<terms>\"\n")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+PNG Text Chunk Reader
+
+Reads tEXt, zTXt and iTXt chunks from a PNG file without decoding any
+pixel data. Only the chunks before the first IDAT are parsed; everything
+else is skipped with a seek, so reading a 300-dpi chart costs a few hundred
+bytes of I/O.
+
+Usage:
+    python png_metadata.py D/Q4_4__Are_you_aware_that_marriages_between_close_rela.png
+"""
+
+import struct
+import sys
+import zlib
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+TEXT_CHUNKS = {b'tEXt', b'zTXt', b'iTXt'}
+
+
+def _decode_text(chunk_type, data):
+    """Decode one text chunk into (keyword, value)."""
+    keyword, _, rest = data.partition(b'\x00')
+    keyword = keyword.decode('latin-1')
+
+    if chunk_type == b'tEXt':
+        return keyword, rest.decode('latin-1')
+
+    if chunk_type == b'zTXt':
+        # compression method byte, then zlib stream
+        return keyword, zlib.decompress(rest[1:]).decode('latin-1')
+
+    # iTXt: compression flag, method, language tag\0, translated keyword\0, text
+    compressed = rest[0]
+    rest = rest[2:]
+    _, _, rest = rest.partition(b'\x00')
+    _, _, text = rest.partition(b'\x00')
+    if compressed:
+        text = zlib.decompress(text)
+    return keyword, text.decode('utf-8')
+
+
+def read_png_text(path):
+    """
+    Return the text metadata stored in a PNG as a dict.
+
+    Stops at the first IDAT chunk. Returns an empty dict for files that are
+    not PNGs or are truncated.
+    """
+    meta = {}
+    with open(path, 'rb') as f:
+        if f.read(8) != PNG_SIGNATURE:
+            return meta
+
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                break
+            length, chunk_type = struct.unpack('>I4s', header)
+
+            if chunk_type in (b'IDAT', b'IEND'):
+                break
+
+            if chunk_type in TEXT_CHUNKS:
+                data = f.read(length)
+                if len(data) < length:
+                    break
+                try:
+                    keyword, value = _decode_text(chunk_type, data)
+                    meta[keyword] = value
+                except (zlib.error, UnicodeDecodeError, IndexError):
+                    pass
+                f.seek(4, 1)  # CRC
+            else:
+                f.seek(length + 4, 1)
+
+    return meta
+
+
+def main():
+    for path in sys.argv[1:]:
+        print(f"📄 {path}")
+        meta = read_png_text(path)
+        if not meta:
+            print("  (no text metadata)")
+        for key, value in meta.items():
+            print(f"  {key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,6 @@
+"""
+Shared helpers for the section analysis scripts (A, D, E, F).
+
+The section scripts are run from their own folders, so each one puts the
+repository root on sys.path before importing from this package.
+"""
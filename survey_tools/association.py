@@ -0,0 +1,286 @@
+"""
+Association test battery over categorical column pairs.
+
+Every categorical column is factorized once into integer codes; the
+contingency table of any pair is then a single bincount over
+code_a * n_levels_b + code_b instead of a pd.crosstab call. For each pair
+the battery reports Pearson chi-square, the G (likelihood-ratio) test,
+Cramér's V, Fisher's exact p for 2 × 2 tables and a permutation p-value.
+
+Permutation tests are batched: a block of shuffles of one column is turned
+into a stack of tables with one bincount, and the chi-square statistics of
+the whole stack are computed at once. Blocks are spread over a process pool
+when the work is large enough to pay for it.
+
+Scripts that run with workers > 1 on platforms that spawn processes
+(Windows, macOS) must call the battery under `if __name__ == "__main__":`.
+
+Usage:
+    results = association_battery(df, permutations=2000)
+    association_matrix(results, 'cramers_v')
+
+    python survey_tools/association.py A/DATA.csv --sort p_perm
+"""
+
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+# Numeric columns with at most this many distinct values count as categorical
+MAX_LEVELS = 20
+
+# Below this many (permutations × respondents) the pool costs more than it saves
+PARALLEL_MIN_WORK = 5_000_000
+
+# Shuffles per batched bincount, capped so one block stays around 160 MB
+PERMUTATION_BLOCK = 500
+MAX_BLOCK_CELLS = 20_000_000
+
+
+def categorical_columns(df, max_levels=MAX_LEVELS):
+    """Text columns plus numeric columns with few distinct values."""
+    columns = []
+    for col in df.columns:
+        series = df[col]
+        if pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series) \
+                or isinstance(series.dtype, pd.CategoricalDtype):
+            columns.append(col)
+        elif series.nunique(dropna=True) <= max_levels:
+            columns.append(col)
+    return columns
+
+
+def encode_columns(df, columns):
+    """
+    Factorize columns into integer codes.
+
+    Returns:
+        (codes, levels): codes is an (n_rows, n_columns) int64 array with -1
+        for missing values; levels is a list of level arrays per column
+    """
+    codes = np.empty((len(df), len(columns)), dtype=np.int64)
+    levels = []
+    for j, col in enumerate(columns):
+        codes[:, j], uniques = pd.factorize(df[col], sort=True, use_na_sentinel=True)
+        levels.append(np.asarray(uniques))
+    return codes, levels
+
+
+def contingency_table(a, b, ka, kb):
+    """Count table of two code arrays (pairs with a missing code are skipped)."""
+    valid = (a >= 0) & (b >= 0)
+    flat = a[valid] * kb + b[valid]
+    return np.bincount(flat, minlength=ka * kb).reshape(ka, kb)
+
+
+def _drop_empty(table):
+    """Remove all-zero rows and columns (levels unused by this pair)."""
+    return table[table.sum(axis=1) > 0][:, table.sum(axis=0) > 0]
+
+
+def chi_square_statistics(tables):
+    """
+    Pearson chi-square for a stack of tables (..., r, c) sharing margins layout.
+
+    Cells with zero expected count contribute nothing.
+    """
+    tables = np.asarray(tables, dtype=float)
+    n = tables.sum(axis=(-2, -1), keepdims=True)
+    expected = tables.sum(axis=-1, keepdims=True) * tables.sum(axis=-2, keepdims=True) / n
+    with np.errstate(divide='ignore', invalid='ignore'):
+        terms = np.where(expected > 0, (tables - expected) ** 2 / expected, 0.0)
+    return terms.sum(axis=(-2, -1))
+
+
+def table_statistics(table):
+    """
+    Asymptotic statistics for one r × c table.
+
+    Returns:
+        Dict with n, rows, cols, chi2, dof, p_chi2, g, p_g, cramers_v,
+        min_expected, sparse_cells_pct (expected < 5) and p_exact (2 × 2 only)
+    """
+    table = _drop_empty(np.asarray(table))
+    n = table.sum()
+    r, c = table.shape
+    out = {'n': int(n), 'rows': r, 'cols': c}
+    if r < 2 or c < 2:
+        out.update(chi2=np.nan, dof=0, p_chi2=np.nan, g=np.nan, p_g=np.nan, cramers_v=np.nan,
+                   min_expected=np.nan, sparse_cells_pct=np.nan, p_exact=np.nan)
+        return out
+
+    expected = table.sum(axis=1, keepdims=True) * table.sum(axis=0, keepdims=True) / n
+    chi2 = float(((table - expected) ** 2 / expected).sum())
+    with np.errstate(divide='ignore', invalid='ignore'):
+        g = float(2 * np.where(table > 0, table * np.log(table / expected), 0.0).sum())
+    dof = (r - 1) * (c - 1)
+
+    out.update(
+        chi2=chi2,
+        dof=dof,
+        p_chi2=float(stats.chi2.sf(chi2, dof)),
+        g=g,
+        p_g=float(stats.chi2.sf(g, dof)),
+        cramers_v=float(np.sqrt(chi2 / (n * (min(r, c) - 1)))),
+        min_expected=float(expected.min()),
+        sparse_cells_pct=float((expected < 5).mean() * 100),
+        p_exact=float(stats.fisher_exact(table)[1]) if (r, c) == (2, 2) else np.nan,
+    )
+    return out
+
+
+def _permutation_block(args):
+    """
+    Count shuffles whose chi-square reaches the observed value.
+
+    Runs in a worker process; shuffles b against fixed a in one batched
+    bincount per block.
+    """
+    a, b, ka, kb, observed, permutations, seed = args
+    rng = np.random.default_rng(seed)
+    block = max(1, min(PERMUTATION_BLOCK, MAX_BLOCK_CELLS // max(len(b), 1)))
+    hits = 0
+    done = 0
+    while done < permutations:
+        size = min(block, permutations - done)
+        shuffled = rng.permuted(np.broadcast_to(b, (size, len(b))), axis=1)
+        offsets = (np.arange(size) * ka * kb)[:, None]
+        flat = (offsets + a[None, :] * kb + shuffled).ravel()
+        tables = np.bincount(flat, minlength=size * ka * kb).reshape(size, ka, kb)
+        # Same tolerance as the observed value so ties count as extreme
+        hits += int((chi_square_statistics(tables) >= observed - 1e-9).sum())
+        done += size
+    return hits
+
+
+def _pair_codes(codes, i, j):
+    """Pairwise-complete codes of two columns, re-coded to the levels present."""
+    a, b = codes[:, i], codes[:, j]
+    valid = (a >= 0) & (b >= 0)
+    a = np.unique(a[valid], return_inverse=True)[1]
+    b = np.unique(b[valid], return_inverse=True)[1]
+    return a, b, int(a.max(initial=-1)) + 1, int(b.max(initial=-1)) + 1
+
+
+def association_battery(df, columns=None, permutations=2000, workers=None, seed=0,
+                        max_levels=MAX_LEVELS):
+    """
+    Test every pair of categorical columns.
+
+    Args:
+        df: DataFrame
+        columns: Columns to test (defaults to categorical_columns(df))
+        permutations: Shuffles per pair for p_perm (0 disables the test)
+        workers: Process count for the permutation tests; None picks
+            os.cpu_count() when the work is large and 1 otherwise
+        seed: Base random seed (each pair/block gets its own stream)
+
+    Returns:
+        DataFrame with one row per pair, sorted by Cramér's V (descending):
+        var_a, var_b, n, rows, cols, chi2, dof, p_chi2, g, p_g, cramers_v,
+        min_expected, sparse_cells_pct, p_exact, p_perm
+    """
+    columns = list(columns) if columns is not None else categorical_columns(df, max_levels)
+    codes, _ = encode_columns(df, columns)
+
+    rows, jobs = [], []
+    seeds = np.random.SeedSequence(seed)
+    for pair_index, (i, j) in enumerate(combinations(range(len(columns)), 2)):
+        a, b, ka, kb = _pair_codes(codes, i, j)
+        table = contingency_table(a, b, ka, kb)
+        row = {'var_a': columns[i], 'var_b': columns[j], **table_statistics(table)}
+        row['p_perm'] = np.nan
+        rows.append(row)
+
+        if permutations and np.isfinite(row['chi2']):
+            # Split each pair's shuffles into blocks so the pool stays busy
+            n_blocks = max(1, permutations // (PERMUTATION_BLOCK * 4))
+            per_block = np.full(n_blocks, permutations // n_blocks)
+            per_block[:permutations % n_blocks] += 1
+            for count, child in zip(per_block, seeds.spawn(n_blocks)):
+                jobs.append((pair_index, (a, b, ka, kb, row['chi2'], int(count), child)))
+
+    if jobs:
+        work = permutations * len(df) * len(rows)
+        if workers is None:
+            workers = (os.cpu_count() or 1) if work >= PARALLEL_MIN_WORK else 1
+
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                hits = list(pool.map(_permutation_block, [args for _, args in jobs]))
+        else:
+            hits = [_permutation_block(args) for _, args in jobs]
+
+        totals = np.zeros(len(rows))
+        for (pair_index, _), h in zip(jobs, hits):
+            totals[pair_index] += h
+        for pair_index, row in enumerate(rows):
+            if np.isfinite(row['chi2']):
+                # Add-one estimate: never reports an exact zero
+                row['p_perm'] = (totals[pair_index] + 1) / (permutations + 1)
+
+    results = pd.DataFrame(rows)
+    if not results.empty:
+        results = results.sort_values('cramers_v', ascending=False,
+                                      na_position='last').reset_index(drop=True)
+    results.attrs['columns'] = columns
+    return results
+
+
+def association_matrix(results, value='cramers_v'):
+    """
+    Square variable × variable matrix of one battery column.
+
+    The diagonal is NaN; the matrix is symmetric. Variables keep the
+    column order the battery was run with.
+    """
+    names = results.attrs.get('columns') or \
+        list(dict.fromkeys(list(results['var_a']) + list(results['var_b'])))
+    matrix = pd.DataFrame(np.nan, index=names, columns=names)
+    for _, row in results.iterrows():
+        matrix.at[row['var_a'], row['var_b']] = row[value]
+        matrix.at[row['var_b'], row['var_a']] = row[value]
+    return matrix
+
+
+def print_battery(results, top=None):
+    """Print the ranked battery as a compact table."""
+    shown = results if top is None else results.head(top)
+    print(f"{'Variable A':<28} {'Variable B':<28} {'n':>5} {'V':>6} {'chi2 p':>9} {'G p':>9} {'perm p':>9}")
+    print("-" * 100)
+    for _, row in shown.iterrows():
+        print(f"{str(row['var_a'])[:28]:<28} {str(row['var_b'])[:28]:<28} {row['n']:>5} "
+              f"{row['cramers_v']:>6.3f} {row['p_chi2']:>9.4f} {row['p_g']:>9.4f} {row['p_perm']:>9.4f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Association tests for every pair of categorical columns')
+    parser.add_argument('csv', help='Survey CSV file')
+    parser.add_argument('--columns', nargs='+', help='Columns to test (default: all categorical)')
+    parser.add_argument('--permutations', type=int, default=2000, help='Shuffles per pair (default: 2000)')
+    parser.add_argument('--workers', type=int, help='Worker processes (default: automatic)')
+    parser.add_argument('--sort', default='cramers_v', help='Column to sort by (default: cramers_v)')
+    parser.add_argument('--output', help='Write the full battery to this CSV file')
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.csv)
+    df.columns = df.columns.str.strip().str.replace('\n', ' ')
+    results = association_battery(df, columns=args.columns, permutations=args.permutations,
+                                  workers=args.workers)
+    ascending = args.sort.startswith('p_') or args.sort in ('var_a', 'var_b')
+    results = results.sort_values(args.sort, ascending=ascending).reset_index(drop=True)
+
+    print(f"📊 {len(results)} column pairs in {args.csv}\n")
+    print_battery(results)
+    if args.output:
+        results.to_csv(args.output, index=False)
+        print(f"\n✓ Saved: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
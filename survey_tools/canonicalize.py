@@ -0,0 +1,313 @@
+"""
+Fuzzy answer canonicalization.
+
+Free-typed answers drift ('Make', 'Female=', 'Sickle trait', 'β Thal
+Intermediate'). Instead of a replace dict in every script, each field has a
+canonical vocabulary and an approved mapping table stored in
+canonical_values.json. Distinct values are matched against the vocabulary
+with a BK-tree over edit distance, and the result is broadcast back through
+the factorized codes, so only the few dozen distinct answers are ever
+compared.
+
+Lookup order for one distinct value (after strip / newline removal):
+    1. approved mapping entry
+    2. exact vocabulary match on the comparison key (case, punctuation and
+       spacing ignored)
+    3. nearest vocabulary entry within the edit budget (auto mode only)
+Anything else is left as cleaned.
+
+Usage:
+    df = canonicalize_frame(df, columns=['Sex', 'Type_Of_Disease'])
+
+    python survey_tools/canonicalize.py A/DATA.csv "Type Of Disease" --field Type_Of_Disease
+    python survey_tools/canonicalize.py A/DATA.csv "Type Of Disease" --field Type_Of_Disease --approve
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from survey_tools.normalize import clean_unique_values, map_unique_values
+
+DEFAULT_TABLE = Path(__file__).resolve().parent / 'canonical_values.json'
+
+# Allowed edits as a share of the key length (at least one edit is always allowed)
+MAX_EDIT_RATIO = 0.2
+
+_NON_WORD = re.compile(r'[\W_]+')
+
+
+def comparison_key(value):
+    """Case-, punctuation- and spacing-insensitive key ('Sickle-Thal' → 'sickle thal')."""
+    return _NON_WORD.sub(' ', value.casefold()).strip()
+
+
+def edit_budget(key, ratio=MAX_EDIT_RATIO):
+    """Maximum edit distance accepted for a key of this length."""
+    return max(1, int(len(key) * ratio))
+
+
+def levenshtein(a, b):
+    """Edit distance between two strings (two-row dynamic programming)."""
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1,
+                               current[j - 1] + 1,
+                               previous[j - 1] + (ca != cb)))
+        previous = current
+    return previous[-1]
+
+
+class BKTree:
+    """
+    Burkhard-Keller tree over an integer metric.
+
+    A query only descends into children whose edge distance lies within
+    [d - radius, d + radius], so most of the vocabulary is never compared.
+    """
+
+    def __init__(self, items=(), distance=levenshtein):
+        self.distance = distance
+        self.root = None
+        for item in items:
+            self.add(item)
+
+    def add(self, item):
+        if self.root is None:
+            self.root = (item, {})
+            return
+        node = self.root
+        while True:
+            word, children = node
+            d = self.distance(item, word)
+            if d == 0:
+                return
+            if d not in children:
+                children[d] = (item, {})
+                return
+            node = children[d]
+
+    def search(self, query, radius):
+        """Return [(distance, item)] within radius, closest first."""
+        if self.root is None:
+            return []
+        found = []
+        stack = [self.root]
+        while stack:
+            word, children = stack.pop()
+            d = self.distance(query, word)
+            if d <= radius:
+                found.append((d, word))
+            for edge, child in children.items():
+                if d - radius <= edge <= d + radius:
+                    stack.append(child)
+        return sorted(found)
+
+
+class CanonicalTable:
+    """
+    Canonical vocabularies and approved mappings, keyed by field name.
+
+    JSON layout:
+        {"Sex": {"aliases": ["..."], "vocabulary": ["Male", "Female"],
+                 "mapping": {"Make": "Male"}}}
+    """
+
+    def __init__(self, fields=None, path=None):
+        self.fields = fields or {}
+        self.path = Path(path) if path else None
+        self._trees = {}
+        self._aliases = {}
+        for field, entry in self.fields.items():
+            for name in [field] + entry.get('aliases', []):
+                self._aliases[name] = field
+
+    @classmethod
+    def load(cls, path=DEFAULT_TABLE):
+        path = Path(path)
+        fields = json.loads(path.read_text(encoding='utf-8')) if path.exists() else {}
+        return cls(fields, path)
+
+    def save(self, path=None):
+        path = Path(path or self.path or DEFAULT_TABLE)
+        path.write_text(json.dumps(self.fields, indent=2, ensure_ascii=False) + '\n',
+                        encoding='utf-8')
+
+    def field_for(self, column):
+        """Field name for a DataFrame column (field name or one of its aliases)."""
+        return self._aliases.get(column)
+
+    def _index(self, field):
+        """(key → canonical, BK-tree over keys) for one field, built once."""
+        if field not in self._trees:
+            vocabulary = self.fields[field].get('vocabulary', [])
+            by_key = {comparison_key(v): v for v in vocabulary}
+            self._trees[field] = (by_key, BKTree(by_key))
+        return self._trees[field]
+
+    def resolve(self, field, value, auto=True):
+        """
+        Canonical spelling for one cleaned value.
+
+        Returns (canonical, distance); distance is None when nothing matched.
+        """
+        mapping = self.fields[field].get('mapping', {})
+        if value in mapping:
+            return mapping[value], 0
+
+        by_key, tree = self._index(field)
+        key = comparison_key(value)
+        if key in by_key:
+            return by_key[key], 0
+        if not auto:
+            return value, None
+
+        matches = tree.search(key, edit_budget(key))
+        # Only accept an unambiguous nearest match
+        if matches and (len(matches) == 1 or matches[0][0] < matches[1][0]):
+            return by_key[matches[0][1]], matches[0][0]
+        return value, None
+
+    def propose(self, field, values):
+        """
+        Split distinct values into proposed mappings and unmatched values.
+
+        Returns:
+            ({raw: (canonical, distance)}, [unmatched values])
+        """
+        approved = self.fields[field].get('mapping', {})
+        proposals, unmatched = {}, []
+        for value in values:
+            if not isinstance(value, str) or not value or value in approved:
+                continue
+            canonical, distance = self.resolve(field, value)
+            if distance is None:
+                unmatched.append(value)
+            elif canonical != value:
+                proposals[value] = (canonical, distance)
+        return proposals, unmatched
+
+    def approve(self, field, mapping):
+        """Add {raw: canonical} entries to a field's approved mapping."""
+        entry = self.fields.setdefault(field, {})
+        entry.setdefault('mapping', {}).update(mapping)
+
+
+_default_table = None
+
+
+def default_table():
+    """The repository's canonical table (loaded once)."""
+    global _default_table
+    if _default_table is None:
+        _default_table = CanonicalTable.load()
+    return _default_table
+
+
+def canonicalize_series(series, field, table=None, auto=True, empty_as_nan=False,
+                        categorical=False):
+    """
+    Clean a column and map its distinct values onto the field's vocabulary.
+
+    Args:
+        series: Column to canonicalize
+        field: Field name in the canonical table
+        table: CanonicalTable (defaults to canonical_values.json)
+        auto: Also apply fuzzy matches that are not yet approved
+        empty_as_nan: Turn values that end up empty into NaN
+        categorical: Return a Categorical-backed Series
+
+    Returns:
+        Canonicalized Series with the same index and name
+    """
+    table = table or default_table()
+
+    def canonical(uniques, counts):
+        cleaned = clean_unique_values(uniques, empty_as_nan=empty_as_nan)
+        out = np.empty(len(cleaned), dtype=object)
+        for i, value in enumerate(cleaned):
+            out[i] = table.resolve(field, value, auto)[0] if isinstance(value, str) and value else value
+        return out
+
+    return map_unique_values(series, canonical, categorical=categorical)
+
+
+def canonicalize_frame(df, columns=None, table=None, **options):
+    """
+    Canonicalize several columns of a DataFrame.
+
+    Args:
+        df: DataFrame to clean (not modified)
+        columns: List of column names known to the table, or a dict
+            {column: field} for columns with other names (defaults to every
+            column the table knows)
+        table: CanonicalTable (defaults to canonical_values.json)
+        options: Passed to canonicalize_series (auto, empty_as_nan, categorical)
+
+    Returns:
+        Cleaned copy of df
+    """
+    table = table or default_table()
+    if columns is None:
+        columns = [col for col in df.columns if table.field_for(col)]
+    if not isinstance(columns, dict):
+        columns = {col: table.field_for(col) or col for col in columns}
+
+    out = df.copy()
+    for col, field in columns.items():
+        if field not in table.fields:
+            raise KeyError(f"No canonical vocabulary for field {field!r} (column {col!r})")
+        out[col] = canonicalize_series(df[col], field, table, **options)
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Review fuzzy canonical mappings for a CSV column')
+    parser.add_argument('csv', help='Survey CSV file')
+    parser.add_argument('column', help='Column header in the CSV (surrounding whitespace ignored)')
+    parser.add_argument('--field', help='Field name in the canonical table (defaults to the column)')
+    parser.add_argument('--approve', action='store_true',
+                        help='Write the proposed mappings to the table')
+    parser.add_argument('--table', default=DEFAULT_TABLE, help='Canonical table JSON')
+    args = parser.parse_args()
+
+    table = CanonicalTable.load(args.table)
+    df = pd.read_csv(args.csv)
+    df.columns = df.columns.str.strip()
+    column = args.column.strip()
+    field = args.field or table.field_for(column) or column
+    if field not in table.fields:
+        print(f"✗ No canonical vocabulary for {field!r}")
+        sys.exit(1)
+
+    counts = df[column].value_counts()
+    cleaned = clean_unique_values(np.asarray(counts.index, dtype=object))
+    proposals, unmatched = table.propose(field, dict.fromkeys(cleaned))
+
+    approved = table.fields[field].get('mapping', {})
+    print(f"📋 {field}: {len(counts)} distinct values, "
+          f"{sum(v in approved for v in dict.fromkeys(cleaned))} already approved")
+    for raw, (canonical, distance) in proposals.items():
+        print(f"  {raw!r} → {canonical!r} (distance {distance})")
+    for value in unmatched:
+        print(f"  ? {value!r} has no match in the vocabulary")
+
+    if args.approve and proposals:
+        table.approve(field, {raw: canonical for raw, (canonical, _) in proposals.items()})
+        table.save()
+        print(f"✓ Approved {len(proposals)} mappings in {table.path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Chart metadata written into PNG text chunks.
+
+Every chart saved by a section script carries a few tEXt/iTXt entries
+describing where it came from, so the OSMECON indexer can catalog charts by
+dataset or question without opening any image data.
+
+Usage:
+    chart_meta = partial(chart_metadata, 'DATA.csv', script=__file__)
+    plt.savefig('sex_distribution_piechart.png', dpi=300, bbox_inches='tight',
+                metadata=chart_meta('Sex', n=len(sex_data)))
+"""
+
+import hashlib
+import os
+from functools import lru_cache
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# Default render settings used across the section scripts
+RENDER_PROFILE = 'png-300dpi-tight'
+
+# PNG text keywords (kept in sync with OSMECON/chart_catalog.py)
+KEY_TITLE = 'Title'
+KEY_DATASET = 'Dataset'
+KEY_DATASET_HASH = 'Dataset SHA-256'
+KEY_QUESTION = 'Question'
+KEY_VALID_N = 'Valid N'
+KEY_SCRIPT = 'Script'
+KEY_PROFILE = 'Render Profile'
+
+
+@lru_cache(maxsize=None)
+def dataset_hash(csv_path):
+    """Return the SHA-256 of a source CSV (computed once per run)."""
+    digest = hashlib.sha256()
+    with open(csv_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _repo_relative(path):
+    """Express a path relative to the repository root when possible."""
+    full = Path(path).resolve()
+    try:
+        return full.relative_to(REPO_ROOT).as_posix()
+    except ValueError:
+        return full.name
+
+
+def chart_metadata(dataset, question=None, n=None, title=None, script=None, profile=RENDER_PROFILE):
+    """
+    Build the metadata dict passed to plt.savefig(..., metadata=...).
+
+    Args:
+        dataset: Path of the source CSV the chart was drawn from
+        question: Question id or column(s) the chart shows, e.g. 'Q4' or 'Sex x Religion'
+        n: Number of valid responses behind the chart
+        title: Human-readable chart title
+        script: Generating script, usually __file__
+        profile: Render profile label
+
+    Returns:
+        Dictionary of PNG text keywords to string values
+    """
+    meta = {
+        KEY_DATASET: _repo_relative(dataset),
+        KEY_PROFILE: profile,
+    }
+    if os.path.exists(dataset):
+        meta[KEY_DATASET_HASH] = dataset_hash(str(Path(dataset).resolve()))
+    if question is not None:
+        meta[KEY_QUESTION] = str(question)
+    if n is not None:
+        meta[KEY_VALID_N] = str(int(n))
+    if title:
+        meta[KEY_TITLE] = ' '.join(str(title).split())
+    if script:
+        meta[KEY_SCRIPT] = _repo_relative(script)
+    return meta
@@ -0,0 +1,157 @@
+"""
+Option co-occurrence for multi-select questions.
+
+Given the sparse respondent × option indicator matrix X from
+survey_tools.multiselect, the full option × option count matrix is one
+sparse product, C = X.T @ X: the diagonal holds how many respondents picked
+each option and C[i, j] how many picked both i and j. Every pairwise
+association measure below is derived from C and the number of answering
+respondents n with array arithmetic, so the cost is one pass over the
+non-zeros of X regardless of how many pairs there are.
+
+For a pair (i, j) with a = C[i, i], b = C[j, j], both = C[i, j]:
+    lift    = both * n / (a * b)          (> 1: chosen together more than chance)
+    jaccard = both / (a + b - both)
+    phi     = (n * both - a * b) / sqrt(a * b * (n - a) * (n - b))
+
+Usage:
+    selections = parse_multiselect(df[question], options=BARRIER_OPTIONS)
+    pairs = option_pairs(selections)
+    plot_cooccurrence_heatmap(selections, 'barriers_cooccurrence.png', metric='lift')
+"""
+
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+
+METRICS = ('count', 'lift', 'jaccard', 'phi')
+
+
+def cooccurrence_counts(selections):
+    """
+    Option × option co-selection counts (X.T @ X).
+
+    Returns:
+        DataFrame indexed and labelled by option; the diagonal holds the
+        per-option totals
+    """
+    # Widen before the product so large counts cannot overflow int8
+    x = selections.matrix.astype(np.int64)
+    counts = (x.T @ x).toarray()
+    return pd.DataFrame(counts, index=selections.options, columns=selections.options)
+
+
+def association_matrices(selections):
+    """
+    All pairwise measures as option × option matrices.
+
+    Returns:
+        {metric: DataFrame} for every name in METRICS. The diagonal, and
+        pairs involving an option nobody (or everybody) picked, are NaN
+        where the measure is undefined.
+    """
+    counts = cooccurrence_counts(selections)
+    c = counts.to_numpy(dtype=float)
+    n = float(selections.n_answered)
+    totals = np.diag(c)
+    a, b = totals[:, None], totals[None, :]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        lift = c * n / (a * b)
+        jaccard = c / (a + b - c)
+        phi = (n * c - a * b) / np.sqrt(a * b * (n - a) * (n - b))
+
+    # An option paired with itself says nothing; only counts keep the diagonal
+    for values in (lift, jaccard, phi):
+        np.fill_diagonal(values, np.nan)
+
+    frame = lambda values: pd.DataFrame(values, index=counts.index, columns=counts.columns)
+    return {
+        'count': counts,
+        'lift': frame(lift),
+        'jaccard': frame(jaccard),
+        'phi': frame(phi),
+    }
+
+
+def option_pairs(selections, sort_by='both'):
+    """
+    Tidy table with one row per unordered option pair.
+
+    Columns: option_a, option_b, count_a, count_b, both, lift, jaccard, phi
+    """
+    matrices = association_matrices(selections)
+    counts = matrices['count'].to_numpy()
+    i, j = np.triu_indices(len(selections.options), k=1)
+    options = np.asarray(selections.options, dtype=object)
+
+    pairs = pd.DataFrame({
+        'option_a': options[i],
+        'option_b': options[j],
+        'count_a': counts[i, i],
+        'count_b': counts[j, j],
+        'both': counts[i, j],
+        'lift': matrices['lift'].to_numpy()[i, j],
+        'jaccard': matrices['jaccard'].to_numpy()[i, j],
+        'phi': matrices['phi'].to_numpy()[i, j],
+    })
+    return pairs.sort_values(sort_by, ascending=False, kind='stable').reset_index(drop=True)
+
+
+def plot_cooccurrence_heatmap(selections, filename=None, metric='count', title=None,
+                              metadata=None):
+    """
+    Annotated option × option heatmap.
+
+    Args:
+        selections: MultiSelect from parse_multiselect
+        filename: Save the chart here (300 dpi); None leaves the figure open
+        metric: One of METRICS ('count' shows per-option totals on the diagonal)
+        title: Chart title
+        metadata: PNG text metadata passed to savefig
+
+    Returns:
+        The matplotlib Figure
+    """
+    if metric not in METRICS:
+        raise ValueError(f"metric must be one of {METRICS}, got {metric!r}")
+
+    values = association_matrices(selections)[metric].to_numpy(dtype=float)
+    labels = [opt if len(opt) <= 30 else opt[:27] + '...' for opt in selections.options]
+    size = max(6, 0.9 * len(labels) + 3)
+
+    fig, ax = plt.subplots(figsize=(size + 2, size))
+    cmap = 'RdBu_r' if metric == 'phi' else 'YlOrRd'
+    limit = np.nanmax(np.abs(values)) if np.isfinite(values).any() else 1
+    vmin = -limit if metric == 'phi' else 0
+    image = ax.imshow(np.ma.masked_invalid(values), cmap=cmap, vmin=vmin, vmax=limit)
+    fig.colorbar(image, ax=ax, fraction=0.046, pad=0.04, label=metric.capitalize())
+
+    ax.set_xticks(range(len(labels)))
+    ax.set_yticks(range(len(labels)))
+    ax.set_xticklabels(labels, rotation=45, ha='right', fontsize=10)
+    ax.set_yticklabels(labels, fontsize=10)
+
+    # Annotate every cell; dark cells get white text
+    for (row, col), value in np.ndenumerate(values):
+        if np.isnan(value):
+            text = '–'
+        elif metric == 'count':
+            text = f'{int(value)}'
+        else:
+            text = f'{value:.2f}'
+        if metric == 'phi':
+            dark = abs(value) > 0.6 * limit
+        else:
+            dark = value - vmin > 0.6 * (limit - vmin)
+        ax.text(col, row, text, ha='center', va='center', fontsize=9, fontweight='bold',
+                color='white' if dark else 'black')
+
+    ax.set_title(title or f'Option co-occurrence ({metric})', fontsize=12, fontweight='bold', pad=20)
+    ax.set_xlabel(f'Total respondents: {selections.n_answered}', fontsize=11, fontweight='bold')
+    plt.tight_layout()
+
+    if filename:
+        fig.savefig(filename, dpi=300, bbox_inches='tight', metadata=metadata)
+        plt.close(fig)
+    return fig
@@ -0,0 +1,201 @@
+"""
+Correspondence analysis of two-way and stacked multi-way crosstabs.
+
+The table N (rows × columns) is turned into the matrix of standardized
+residuals
+
+    S = D_r^-1/2 (P - r c') D_c^-1/2,   P = N / n
+
+whose squared singular values split the total inertia (chi-square / n)
+into dimensions. Row and column principal coordinates are
+D_r^-1/2 U Σ and D_c^-1/2 V Σ, so rows (or columns) that sit close
+together on the map have similar profiles.
+
+Only the first few dimensions are ever plotted, so the SVD is truncated.
+Small tables use numpy's full SVD; large ones (many stacked rows) use a
+randomized range finder with a few power iterations, which touches S
+with a handful of matrix products instead of a full decomposition.
+
+Multi-way tables are analysed by stacking: the crosstabs of several row
+variables against one column variable are placed one under another
+(stacked_crosstab), or their level combinations become the rows
+(interactive=True).
+
+Usage:
+    table = stacked_crosstab(df, ['Education_Level', 'Location_Type'], 'Socioeconomic_Class')
+    result = correspondence_analysis(table)
+    plot_ca_biplot(result, 'ca_biplot.png')
+    coordinate_table(result).to_csv('ca_coordinates.csv', index=False)
+"""
+
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+
+# Use the randomized SVD once the smaller side of S exceeds this
+RANDOMIZED_MIN_DIM = 200
+
+# Randomized SVD accuracy settings (extra sketch columns, power iterations)
+OVERSAMPLE = 20
+POWER_ITERATIONS = 6
+
+
+def stacked_crosstab(df, row_vars, col_var, interactive=False):
+    """
+    Crosstab of several row variables against one column variable.
+
+    Args:
+        df: DataFrame
+        row_vars: Row variable(s)
+        col_var: Column variable
+        interactive: If True, rows are level combinations ('R / Graduate');
+            otherwise each variable's crosstab is stacked with rows
+            labelled 'variable: level'
+
+    Returns:
+        Count DataFrame
+    """
+    row_vars = [row_vars] if isinstance(row_vars, str) else list(row_vars)
+    if interactive:
+        data = df.dropna(subset=row_vars + [col_var])
+        rows = data[row_vars].astype(str).agg(' / '.join, axis=1)
+        return pd.crosstab(rows, data[col_var])
+
+    blocks = []
+    for var in row_vars:
+        block = pd.crosstab(df[var], df[col_var])
+        block.index = [f'{var}: {level}' for level in block.index]
+        blocks.append(block)
+    return pd.concat(blocks).fillna(0).astype(np.int64)
+
+
+def randomized_svd(matrix, k, oversample=OVERSAMPLE, power_iterations=POWER_ITERATIONS, seed=0):
+    """
+    Leading k singular triplets by a randomized range finder (Halko et al.).
+
+    Returns:
+        (U, s, Vt) with k columns / values / rows
+    """
+    rng = np.random.default_rng(seed)
+    m, n = matrix.shape
+    sketch = min(n, k + oversample)
+    Q = np.linalg.qr(matrix @ rng.standard_normal((n, sketch)))[0]
+    for _ in range(power_iterations):
+        # Re-orthonormalize each pass so small singular values are not lost
+        Q = np.linalg.qr(matrix.T @ Q)[0]
+        Q = np.linalg.qr(matrix @ Q)[0]
+    U_small, s, Vt = np.linalg.svd(Q.T @ matrix, full_matrices=False)
+    return (Q @ U_small)[:, :k], s[:k], Vt[:k]
+
+
+def correspondence_analysis(table, n_components=2, method='auto', seed=0):
+    """
+    Correspondence analysis of a count table.
+
+    Args:
+        table: Count DataFrame (rows × columns); empty rows and columns are
+            dropped
+        n_components: Dimensions to keep
+        method: 'full', 'randomized' or 'auto' (randomized when the smaller
+            side exceeds RANDOMIZED_MIN_DIM)
+        seed: Seed of the randomized SVD
+
+    Returns:
+        Dict with singular_values, total_inertia, explained (share of
+        inertia per kept dimension), row_coords and col_coords (principal
+        coordinates, DataFrames), row_mass, col_mass, row_contrib and
+        col_contrib (share of each dimension's inertia), method
+    """
+    table = pd.DataFrame(table)
+    table = table.loc[table.sum(axis=1) > 0, table.sum(axis=0) > 0]
+    N = table.to_numpy(dtype=float)
+    P = N / N.sum()
+    r, c = P.sum(axis=1), P.sum(axis=0)
+    S = (P - np.outer(r, c)) / np.sqrt(np.outer(r, c))
+
+    k = max(1, min(n_components, min(S.shape) - 1))
+    if method == 'auto':
+        method = 'randomized' if min(S.shape) > RANDOMIZED_MIN_DIM else 'full'
+    if method == 'randomized':
+        U, s, Vt = randomized_svd(S, k, seed=seed)
+    elif method == 'full':
+        U, s, Vt = np.linalg.svd(S, full_matrices=False)
+        U, s, Vt = U[:, :k], s[:k], Vt[:k]
+    else:
+        raise ValueError(f"method must be 'auto', 'full' or 'randomized', got {method!r}")
+
+    total = float((S ** 2).sum())
+    dims = [f'dim{j + 1}' for j in range(k)]
+    row_coords = U * s / np.sqrt(r)[:, None]
+    col_coords = Vt.T * s / np.sqrt(c)[:, None]
+    return {
+        'singular_values': s,
+        'total_inertia': total,
+        'explained': s ** 2 / total if total > 0 else np.full(k, np.nan),
+        'row_coords': pd.DataFrame(row_coords, index=table.index, columns=dims),
+        'col_coords': pd.DataFrame(col_coords, index=table.columns, columns=dims),
+        'row_mass': pd.Series(r, index=table.index),
+        'col_mass': pd.Series(c, index=table.columns),
+        'row_contrib': pd.DataFrame(U ** 2, index=table.index, columns=dims),
+        'col_contrib': pd.DataFrame(Vt.T ** 2, index=table.columns, columns=dims),
+        'method': method,
+    }
+
+
+def coordinate_table(result):
+    """
+    Tidy table of every row and column point.
+
+    Columns: kind ('row' / 'column'), label, mass, dim1.., ctr_dim1..
+    """
+    frames = []
+    for kind, key in (('row', 'row'), ('column', 'col')):
+        coords = result[f'{key}_coords']
+        frame = pd.DataFrame({'kind': kind, 'label': coords.index.astype(str),
+                              'mass': result[f'{key}_mass'].to_numpy()})
+        for dim in coords.columns:
+            frame[dim] = coords[dim].to_numpy()
+        for dim in coords.columns:
+            frame[f'ctr_{dim}'] = result[f'{key}_contrib'][dim].to_numpy()
+        frames.append(frame)
+    return pd.concat(frames, ignore_index=True)
+
+
+def plot_ca_biplot(result, filename=None, title='Correspondence analysis', row_label='Rows',
+                   col_label='Columns', metadata=None):
+    """
+    Symmetric map of the first two dimensions (rows and columns in
+    principal coordinates).
+
+    Returns:
+        The matplotlib Figure
+    """
+    rows, cols = result['row_coords'], result['col_coords']
+    second = 'dim2' if 'dim2' in rows else 'dim1'
+
+    fig, ax = plt.subplots(figsize=(12, 10))
+    ax.scatter(rows['dim1'], rows[second], s=60 + 2000 * result['row_mass'], c='#3498db',
+               edgecolor='black', alpha=0.8, label=row_label, zorder=3)
+    ax.scatter(cols['dim1'], cols[second], s=60 + 2000 * result['col_mass'], c='#e74c3c',
+               marker='^', edgecolor='black', alpha=0.8, label=col_label, zorder=3)
+    for coords, color in ((rows, '#1f4e79'), (cols, '#922b21')):
+        for label, point in coords.iterrows():
+            ax.annotate(str(label), (point['dim1'], point[second]), xytext=(6, 6),
+                        textcoords='offset points', fontsize=9, fontweight='bold', color=color)
+
+    ax.axhline(0, color='grey', linewidth=0.8, linestyle='--')
+    ax.axvline(0, color='grey', linewidth=0.8, linestyle='--')
+    explained = result['explained'] * 100
+    ax.set_xlabel(f'Dimension 1 ({explained[0]:.1f}% of inertia)', fontsize=12, fontweight='bold')
+    if second == 'dim2':
+        ax.set_ylabel(f'Dimension 2 ({explained[1]:.1f}% of inertia)', fontsize=12, fontweight='bold')
+    ax.set_title(title, fontsize=14, fontweight='bold', pad=20)
+    ax.legend(loc='best', fontsize=10, markerscale=0.6)
+    ax.grid(True, linestyle='--', alpha=0.3)
+    ax.set_axisbelow(True)
+    plt.tight_layout()
+
+    if filename:
+        fig.savefig(filename, dpi=300, bbox_inches='tight', metadata=metadata)
+        plt.close(fig)
+    return fig
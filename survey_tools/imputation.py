@@ -0,0 +1,215 @@
+"""
+Hot-deck and multiple imputation of categorical survey answers.
+
+A missing answer is replaced by the answer of a randomly drawn donor, a
+respondent who answered that question and falls in the same stratum
+(same location, same consanguinity answer, ...). Recipients whose
+stratum has no donors, or whose stratum value is itself missing, draw
+from every donor of the column. The draw is vectorized: donors are sorted
+by stratum code once, bincount gives each stratum's offset and size,
+and every recipient picks
+
+    donor = sorted_donors[start[stratum] + floor(u * size[stratum])]
+
+so a column is imputed with one sort and a few array passes.
+
+Multiple imputation repeats this m times with the approximate Bayesian
+bootstrap (each stratum's donor pool is first resampled with replacement,
+so the imputations also carry the uncertainty of the donor distribution).
+Each imputation and its analysis runs in a worker process with its own
+random stream, and the m results are combined by Rubin's rules:
+
+    Q = mean(q_i),  W = mean(se_i²),  B = var(q_i),  T = W + (1 + 1/m) B
+
+Usage:
+    df_filled = hot_deck(df, strata=['Location_Type'])
+    pct, se, fmi = pooled_crosstab(df, 'Education_Level', 'Consanguineous_Marriage',
+                                   strata=['Education_Level', 'Consanguineous_Marriage', 'Location_Type'])
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import numpy as np
+import pandas as pd
+
+from survey_tools.variance import crosstab_se
+
+DEFAULT_IMPUTATIONS = 20
+
+# Use a process pool once respondents × imputations reaches this
+PARALLEL_MIN_WORK = 2_000_000
+
+
+def _stratum_codes(df, strata):
+    """Integer stratum of each row (-1 where a stratum value is missing)."""
+    if not strata:
+        return np.zeros(len(df), dtype=np.int64)
+    return df.groupby(list(strata), sort=False).ngroup().fillna(-1).to_numpy(dtype=np.int64)
+
+
+def draw_donors(donor_strata, recipient_strata, rng, bootstrap=False):
+    """
+    Donor drawn for each recipient, within its stratum.
+
+    Args:
+        donor_strata: Stratum code of each donor
+        recipient_strata: Stratum code of each recipient (-1: unknown)
+        rng: numpy Generator
+        bootstrap: Resample each stratum's donors with replacement first
+            (approximate Bayesian bootstrap)
+
+    Returns:
+        Position into the donor arrays for each recipient
+    """
+    n_donors = len(donor_strata)
+    k = int(max(donor_strata.max(initial=-1), recipient_strata.max(initial=-1))) + 1
+    # Donors of unknown stratum only serve the whole-column fallback
+    donor_strata = np.where(donor_strata >= 0, donor_strata, k)
+    order = np.argsort(donor_strata, kind='stable')
+    sizes = np.bincount(donor_strata, minlength=k + 1)
+    starts = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+    if bootstrap:
+        sorted_strata = donor_strata[order]
+        offsets = (rng.random(n_donors) * sizes[sorted_strata]).astype(np.int64)
+        order = order[starts[sorted_strata] + offsets]
+
+    picks = np.empty(len(recipient_strata), dtype=np.int64)
+    known = recipient_strata >= 0
+    known[known] = sizes[recipient_strata[known]] > 0
+    strata = recipient_strata[known]
+    picks[known] = order[starts[strata] + (rng.random(len(strata)) * sizes[strata]).astype(np.int64)]
+    # No donor in the stratum: draw from the whole column (bootstrapped pool if asked)
+    picks[~known] = order[rng.integers(0, n_donors, (~known).sum())]
+    return picks
+
+
+def hot_deck(df, columns=None, strata=None, seed=0, bootstrap=False):
+    """
+    Fill missing answers from random donors in the same stratum.
+
+    Args:
+        df: DataFrame (not modified)
+        columns: Columns to impute (defaults to every column with missing
+            values)
+        strata: Columns defining the donor cells; a column is never used
+            as its own stratum
+        seed: Random seed or numpy SeedSequence
+        bootstrap: Approximate Bayesian bootstrap (for multiple imputation)
+
+    Returns:
+        Imputed copy of df (columns without any answer are left as they are)
+    """
+    rng = np.random.default_rng(seed)
+    strata = list(strata or [])
+    columns = [col for col in df.columns if df[col].isna().any()] if columns is None else list(columns)
+    out = df.copy()
+    for col in columns:
+        missing = df[col].isna().to_numpy()
+        if not missing.any() or missing.all():
+            continue
+        codes = _stratum_codes(df, [s for s in strata if s != col])
+        values = df[col].to_numpy(copy=True)
+        donors = np.flatnonzero(~missing)
+        picks = draw_donors(codes[donors], codes[missing], rng, bootstrap)
+        values[missing] = values[donors[picks]]
+        out[col] = pd.Series(values, index=df.index, dtype=df[col].dtype)
+    return out
+
+
+def pool_rubin(estimates, standard_errors):
+    """
+    Combine m completed-data results by Rubin's rules.
+
+    Args:
+        estimates: Array (m, ...) of point estimates
+        standard_errors: Array (m, ...) of their standard errors
+
+    Returns:
+        Dict with estimate, se, within, between, df (degrees of freedom)
+        and fmi (fraction of missing information), each shaped like one
+        estimate
+    """
+    q = np.asarray(estimates, dtype=float)
+    m = q.shape[0]
+    within = np.mean(np.asarray(standard_errors, dtype=float) ** 2, axis=0)
+    between = np.var(q, axis=0, ddof=1) if m > 1 else np.zeros_like(within)
+    total = within + (1 + 1 / m) * between
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = (1 + 1 / m) * between / within
+        dof = np.where(between > 0, (m - 1) * (1 + 1 / ratio) ** 2, np.inf)
+        fmi = np.where(total > 0, (ratio + 2 / (dof + 3)) / (ratio + 1), 0.0)
+    return {'estimate': q.mean(axis=0), 'se': np.sqrt(total), 'within': within,
+            'between': between, 'df': dof, 'fmi': fmi}
+
+
+def _impute_and_analyze(args):
+    """One imputation and its analysis (runs in a worker process)."""
+    df, columns, strata, seed, analysis = args
+    return analysis(hot_deck(df, columns, strata, seed, bootstrap=True))
+
+
+def analyze_imputations(df, analysis, m=DEFAULT_IMPUTATIONS, columns=None, strata=None,
+                        seed=0, workers=None):
+    """
+    Run an analysis on m imputed datasets and pool the results.
+
+    Args:
+        df: DataFrame with missing answers
+        analysis: Picklable function(df) -> (estimate, se), arrays or
+            DataFrames of a fixed shape (module-level function or partial)
+        m: Number of imputations
+        columns, strata: Passed to hot_deck
+        seed: Random seed (each imputation gets its own stream)
+        workers: Process count; None picks os.cpu_count() when the work is
+            large and 1 otherwise
+
+    Returns:
+        pool_rubin dict; DataFrame-valued analyses give DataFrame entries
+    """
+    if workers is None:
+        workers = (os.cpu_count() or 1) if len(df) * m >= PARALLEL_MIN_WORK else 1
+    seeds = np.random.SeedSequence(seed).spawn(m)
+    jobs = [(df, columns, strata, child, analysis) for child in seeds]
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_impute_and_analyze, jobs))
+    else:
+        results = [_impute_and_analyze(job) for job in jobs]
+
+    template = results[0][0]
+    pooled = pool_rubin([np.asarray(est, dtype=float) for est, _ in results],
+                        [np.asarray(se, dtype=float) for _, se in results])
+    if isinstance(template, pd.DataFrame):
+        pooled = {key: pd.DataFrame(value, index=template.index, columns=template.columns)
+                  for key, value in pooled.items()}
+    return pooled
+
+
+def _crosstab_analysis(df, index, columns, index_levels, column_levels, percent_of):
+    """crosstab_se on fixed levels, so every imputation has the same shape."""
+    pct, se = crosstab_se(df[index], df[columns], percent_of=percent_of)
+    return (pct.reindex(index=index_levels, columns=column_levels),
+            se.reindex(index=index_levels, columns=column_levels))
+
+
+def pooled_crosstab(df, index, columns, m=DEFAULT_IMPUTATIONS, strata=None, percent_of='row',
+                    seed=0, workers=None):
+    """
+    Crosstab percentages pooled over m hot-deck imputations of both variables.
+
+    The imputation model must contain both crosstab variables: list index
+    and columns in strata (hot_deck never uses a column as its own
+    stratum). Donors drawn without conditioning on the other variable
+    carry no association with it, which pulls every row toward the
+    marginal rate.
+
+    Returns:
+        (pct, se, fmi) DataFrames shaped like pd.crosstab, in percent
+    """
+    analysis = partial(_crosstab_analysis, index=index, columns=columns,
+                       index_levels=sorted(df[index].dropna().unique()),
+                       column_levels=sorted(df[columns].dropna().unique()), percent_of=percent_of)
+    pooled = analyze_imputations(df, analysis, m, [index, columns], strata, seed, workers)
+    return pooled['estimate'], pooled['se'], pooled['fmi']
@@ -0,0 +1,189 @@
+"""
+Confidence intervals for reported percentages.
+
+Every count-and-percentage label in the section scripts can carry an
+interval:
+
+    wilson_interval          closed form, good default for a single share
+    clopper_pearson_interval exact (conservative) binomial interval
+    bootstrap_intervals      percentile bootstrap over a whole table
+
+The bootstrap never resamples rows. A table of cell counts is a multinomial
+sample, so each replicate is one multinomial draw with the observed cell
+shares; all replicates for all groups come from a single batched
+Generator.multinomial call of shape (replicates, groups, cells). A cell
+with no counts, or with its whole group, has no bootstrap spread at all,
+so those cells get the Wilson interval instead.
+
+Usage:
+    low, high = proportion_intervals(counts, method='wilson')
+    print(f"{label}: {count} ({format_ci(pct, low, high)})")
+    ax.bar(x, counts, yerr=error_bars(counts, n))
+"""
+
+import numpy as np
+from scipy import stats
+
+DEFAULT_CONFIDENCE = 0.95
+DEFAULT_REPLICATES = 2000
+METHODS = ('wilson', 'clopper-pearson', 'bootstrap')
+
+
+def _z(confidence):
+    return stats.norm.ppf(0.5 + confidence / 2)
+
+
+def wilson_interval(k, n, confidence=DEFAULT_CONFIDENCE):
+    """
+    Wilson score interval for k successes out of n (arrays broadcast).
+
+    Returns:
+        (low, high) as proportions in [0, 1]; NaN where n is 0
+    """
+    k = np.asarray(k, dtype=float)
+    n = np.asarray(n, dtype=float)
+    z = _z(confidence)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        p = k / n
+        denom = 1 + z ** 2 / n
+        centre = (p + z ** 2 / (2 * n)) / denom
+        half = z * np.sqrt(p * (1 - p) / n + z ** 2 / (4 * n ** 2)) / denom
+    return np.clip(centre - half, 0, 1), np.clip(centre + half, 0, 1)
+
+
+def clopper_pearson_interval(k, n, confidence=DEFAULT_CONFIDENCE):
+    """
+    Exact Clopper-Pearson interval from beta quantiles (arrays broadcast).
+
+    Returns:
+        (low, high) as proportions in [0, 1]; NaN where n is 0
+    """
+    k = np.asarray(k, dtype=float)
+    n = np.asarray(n, dtype=float)
+    alpha = 1 - confidence
+    with np.errstate(divide='ignore', invalid='ignore'):
+        low = np.where(k > 0, stats.beta.ppf(alpha / 2, k, n - k + 1), 0.0)
+        high = np.where(k < n, stats.beta.ppf(1 - alpha / 2, k + 1, n - k), 1.0)
+    empty = n <= 0
+    return np.where(empty, np.nan, low), np.where(empty, np.nan, high)
+
+
+def bootstrap_intervals(counts, axis=None, replicates=DEFAULT_REPLICATES,
+                        confidence=DEFAULT_CONFIDENCE, seed=0):
+    """
+    Percentile bootstrap intervals for the shares of a count table.
+
+    Args:
+        counts: Cell counts of any shape (a value_counts, a crosstab, ...)
+        axis: Axis along which shares sum to 1 (e.g. 1 for row percentages of
+            a 2-D crosstab); None treats the whole table as one sample
+        replicates: Number of bootstrap replicates
+        confidence: Interval coverage
+        seed: Random seed (fixed so reruns give the same labels)
+
+    Returns:
+        (low, high) arrays shaped like counts, as proportions in [0, 1];
+        cells at 0 or at their group total fall back to Wilson
+    """
+    counts = np.asarray(counts, dtype=np.int64)
+    shape = counts.shape
+    if axis is None:
+        groups = counts.reshape(1, -1)
+    else:
+        groups = np.moveaxis(counts, axis, -1)
+        moved_shape = groups.shape
+        groups = groups.reshape(-1, shape[axis])
+
+    totals = groups.sum(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        shares = np.where(totals[:, None] > 0, groups / np.maximum(totals, 1)[:, None], 0.0)
+
+    # One batched draw: (replicates, groups, cells)
+    rng = np.random.default_rng(seed)
+    draws = rng.multinomial(totals, shares, size=(replicates, len(totals)))
+    boot = draws / np.maximum(totals, 1)[None, :, None]
+
+    alpha = 1 - confidence
+    low, high = np.quantile(boot, [alpha / 2, 1 - alpha / 2], axis=0)
+    # Percentile intervals collapse to a point on 0 and n cells
+    degenerate = (groups == 0) | (groups == totals[:, None])
+    wilson_low, wilson_high = wilson_interval(groups, totals[:, None], confidence)
+    low, high = np.where(degenerate, wilson_low, low), np.where(degenerate, wilson_high, high)
+    empty = totals[:, None] == 0
+    low, high = np.where(empty, np.nan, low), np.where(empty, np.nan, high)
+
+    if axis is None:
+        return low.reshape(shape), high.reshape(shape)
+    restore = lambda a: np.moveaxis(a.reshape(moved_shape), -1, axis)
+    return restore(low), restore(high)
+
+
+def proportion_intervals(counts, n=None, method='wilson', axis=None,
+                         confidence=DEFAULT_CONFIDENCE, **bootstrap_options):
+    """
+    Intervals for the percentages of a count table, in percent.
+
+    Args:
+        counts: Cell counts (array, Series or DataFrame)
+        n: Denominator per cell; defaults to the table total (or the totals
+            along axis). Pass it for multi-select shares, whose cells do
+            not sum to n.
+        method: 'wilson', 'clopper-pearson' or 'bootstrap'
+        axis: Axis along which percentages are computed (see bootstrap_intervals)
+        confidence: Interval coverage
+
+    Returns:
+        (low, high) arrays shaped like counts, in percent (0-100)
+    """
+    if method not in METHODS:
+        raise ValueError(f"method must be one of {METHODS}, got {method!r}")
+    counts = np.asarray(counts, dtype=np.int64)
+
+    if method == 'bootstrap':
+        if n is not None:
+            # Independent shares (e.g. multi-select): each cell is its own
+            # two-cell table of selected / not selected
+            n = np.broadcast_to(np.asarray(n, dtype=np.int64), counts.shape)
+            pairs = np.stack([counts, n - counts], axis=-1)
+            low, high = bootstrap_intervals(pairs, axis=-1, confidence=confidence,
+                                            **bootstrap_options)
+            low, high = low[..., 0], high[..., 0]
+        else:
+            low, high = bootstrap_intervals(counts, axis=axis, confidence=confidence,
+                                            **bootstrap_options)
+        return low * 100, high * 100
+
+    if n is None:
+        n = counts.sum() if axis is None else counts.sum(axis=axis, keepdims=True)
+    interval = wilson_interval if method == 'wilson' else clopper_pearson_interval
+    low, high = interval(counts, n, confidence)
+    return low * 100, high * 100
+
+
+def error_bars(counts, n=None, method='wilson', scale='count', **options):
+    """
+    Asymmetric yerr for matplotlib bars drawn from counts.
+
+    Args:
+        counts: Bar heights as counts
+        n: Denominator (defaults to the sum of counts)
+        method: Interval method (see proportion_intervals)
+        scale: 'count' if the bars show counts, 'percent' if they show percentages
+
+    Returns:
+        2 × len(counts) array of (below, above) distances
+    """
+    counts = np.asarray(counts, dtype=float)
+    total = counts.sum() if n is None else n
+    low, high = proportion_intervals(counts, n=total if n is not None else None,
+                                     method=method, **options)
+    pct = counts / np.asarray(total, dtype=float) * 100
+    factor = np.asarray(total, dtype=float) / 100 if scale == 'count' else 1.0
+    return np.vstack([(pct - low) * factor, (high - pct) * factor])
+
+
+def format_ci(pct, low, high, digits=1):
+    """'37.5% [30.9–44.6]' for a percentage and its interval."""
+    if np.isnan(low) or np.isnan(high):
+        return f'{pct:.{digits}f}%'
+    return f'{pct:.{digits}f}% [{low:.{digits}f}–{high:.{digits}f}]'
@@ -0,0 +1,143 @@
+"""
+Kinship-coefficient risk scoring for spouse-relation answers.
+
+The spouse relation degree is turned into the inbreeding coefficient F of
+the couple's children through a lookup table: relatives of degree d share
+(1/2)^d of their genes, so F = (1/2)^(d + 1) — 1/4 for first-degree,
+1/8 for second-degree (uncle-niece) and 1/16 for third-degree (first
+cousin) unions, 0 for unrelated spouses.
+
+For a recessive disease with allele frequency q the chance that a child is
+affected is
+
+    risk = q² + F q (1 - q)
+
+i.e. the outbred baseline q² plus the excess due to inbreeding. The lookup
+runs over the distinct answers only and is broadcast back through the
+factorized codes, so scoring every respondent is one array pass; stratum
+totals (expected affected, mean F, observed affected) are weighted
+bincounts over the stratum codes.
+
+Usage:
+    scores = score_respondents(df, 'Spouse_Relation', 'Consanguineous_Marriage')
+    risk_by_stratum(df, 'Education_Level', 'Spouse_Relation', 'Consanguineous_Marriage')
+"""
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+# Inbreeding coefficient of the children, by spouse relation (canonical spellings)
+INBREEDING_COEFFICIENTS = {
+    'First degree': 1 / 4,
+    'Second degree': 1 / 8,
+    'Third degree': 1 / 16,
+    'None': 0.0,
+}
+
+# β-thalassaemia trait is carried by roughly 3-4% of the Indian population,
+# i.e. an allele frequency of about 0.02
+DEFAULT_ALLELE_FREQUENCY = 0.02
+
+
+def inbreeding_coefficients(relation, consanguineous=None, table=None, negative='No'):
+    """
+    Inbreeding coefficient per respondent.
+
+    Args:
+        relation: Spouse relation answers
+        consanguineous: Optional consanguinity answers; respondents answering
+            negative get F = 0 whatever their relation answer
+        table: {relation: F} lookup (defaults to INBREEDING_COEFFICIENTS)
+        negative: Consanguinity answer meaning "not related"
+
+    Returns:
+        float array; NaN where the relation is missing or not in the table
+    """
+    table = INBREEDING_COEFFICIENTS if table is None else table
+    codes, uniques = pd.factorize(relation, use_na_sentinel=True)
+    lookup = np.array([table.get(str(value).strip(), np.nan) for value in uniques] + [np.nan])
+    coefficients = lookup[codes]
+    if consanguineous is not None:
+        coefficients[np.asarray(consanguineous == negative, dtype=bool)] = 0.0
+    return coefficients
+
+
+def recessive_risk(coefficients, allele_frequency=DEFAULT_ALLELE_FREQUENCY):
+    """Probability that a child is affected: q² + F q (1 - q) (arrays broadcast)."""
+    q = allele_frequency
+    return q ** 2 + np.asarray(coefficients, dtype=float) * q * (1 - q)
+
+
+def score_respondents(df, relation_col, consanguinity_col=None,
+                      allele_frequency=DEFAULT_ALLELE_FREQUENCY, table=None):
+    """
+    Per-respondent inbreeding coefficient and expected recessive risk.
+
+    Returns:
+        DataFrame aligned with df: inbreeding_coefficient, expected_risk and
+        excess_risk (expected_risk minus the outbred baseline q²)
+    """
+    consanguineous = df[consanguinity_col] if consanguinity_col else None
+    coefficients = inbreeding_coefficients(df[relation_col], consanguineous, table)
+    risk = recessive_risk(coefficients, allele_frequency)
+    return pd.DataFrame({
+        'inbreeding_coefficient': coefficients,
+        'expected_risk': risk,
+        'excess_risk': risk - allele_frequency ** 2,
+    }, index=df.index)
+
+
+def risk_by_stratum(df, strata, relation_col, consanguinity_col=None, affected=None,
+                    allele_frequency=DEFAULT_ALLELE_FREQUENCY, table=None, confidence=0.95):
+    """
+    Expected (and, when known, observed) affected counts per stratum.
+
+    Respondents without a usable relation answer or stratum are left out.
+
+    Args:
+        df: Respondent DataFrame
+        strata: Stratum column (education, location, class, ...)
+        relation_col: Spouse relation column
+        consanguinity_col: Optional consanguinity column (answers 'No' mean F = 0)
+        affected: Optional boolean column name (or array) marking respondents
+            with an affected child; adds observed, oe_ratio and its exact
+            Poisson interval
+        allele_frequency: Recessive allele frequency q
+
+    Returns:
+        DataFrame indexed by stratum level: n_scored, consanguineous,
+        mean_inbreeding, expected_affected, baseline_affected (n q²),
+        excess_affected, risk_per_1000 and optionally observed, oe_ratio,
+        oe_low, oe_high
+    """
+    scores = score_respondents(df, relation_col, consanguinity_col, allele_frequency, table)
+    codes, levels = pd.factorize(df[strata], sort=True, use_na_sentinel=True)
+    coefficients = scores['inbreeding_coefficient'].to_numpy()
+    valid = (codes >= 0) & ~np.isnan(coefficients)
+    codes, k = codes[valid], len(levels)
+
+    count = lambda weights=None: np.bincount(codes, weights=weights, minlength=k)
+    n = count()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        result = pd.DataFrame({
+            'n_scored': n,
+            'consanguineous': count(coefficients[valid] > 0).astype(np.int64),
+            'mean_inbreeding': count(coefficients[valid]) / n,
+            'expected_affected': count(scores['expected_risk'].to_numpy()[valid]),
+            'baseline_affected': n * allele_frequency ** 2,
+        }, index=pd.Index(levels, name=strata))
+        result['excess_affected'] = result['expected_affected'] - result['baseline_affected']
+        result['risk_per_1000'] = result['expected_affected'] / n * 1000
+
+        if affected is not None:
+            flags = df[affected] if isinstance(affected, str) else affected
+            observed = count(np.asarray(flags, dtype=float)[valid])
+            alpha = 1 - confidence
+            expected = result['expected_affected'].to_numpy()
+            result['observed'] = observed.astype(np.int64)
+            result['oe_ratio'] = observed / expected
+            # Exact Poisson interval for the observed count, scaled by expected
+            result['oe_low'] = np.where(observed > 0, stats.chi2.ppf(alpha / 2, 2 * observed) / 2, 0.0) / expected
+            result['oe_high'] = stats.chi2.ppf(1 - alpha / 2, 2 * observed + 2) / 2 / expected
+    return result
@@ -0,0 +1,201 @@
+"""
+Likert item summaries.
+
+All items of a section are summarised together from one 2-D response array
+(respondents × items): a single bincount over item * n_levels + level gives
+the full items × levels count table, and every statistic (mean, median,
+mode, top/bottom box share, missing count) is read off that table. The
+responses are touched once regardless of how many items there are.
+
+Usage:
+    summary = likert_summary(df, levels=[1, 2, 3, 4, 5])
+    plot_diverging_likert(summary, 'likert_diverging.png', item_labels=questions)
+"""
+
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+
+# Diverging palette from disagree (red) through neutral (grey) to agree (blue)
+DIVERGING_COLORS = {
+    3: ['#D7191C', '#BDBDBD', '#2C7BB6'],
+    5: ['#D7191C', '#FDAE61', '#BDBDBD', '#ABD9E9', '#2C7BB6'],
+}
+
+
+def likert_counts(responses, levels):
+    """
+    Count responses per item and level.
+
+    Args:
+        responses: 2-D array (respondents × items); NaN marks a missing answer,
+            values outside levels are treated as missing
+        levels: Ordered scale values, e.g. [1, 2, 3, 4, 5]
+
+    Returns:
+        (counts, missing): int64 arrays of shape (items, levels) and (items,)
+    """
+    responses = np.asarray(responses, dtype=float)
+    if responses.ndim == 1:
+        responses = responses[:, None]
+    levels = np.asarray(levels, dtype=float)
+    n_items, n_levels = responses.shape[1], len(levels)
+
+    # Map each response onto its level position (-1 for missing / off-scale)
+    pos = np.searchsorted(levels, responses)
+    pos = np.minimum(pos, n_levels - 1)
+    valid = levels[pos] == responses
+
+    flat = (np.arange(n_items) * n_levels + pos)[valid]
+    counts = np.bincount(flat, minlength=n_items * n_levels).reshape(n_items, n_levels)
+    missing = responses.shape[0] - counts.sum(axis=1)
+    return counts, missing
+
+
+def _ranked_level(cumulative, rank, levels):
+    """Level at a 0-based rank for every item (rank per item)."""
+    return levels[(cumulative > rank[:, None]).argmax(axis=1)]
+
+
+def summarize_counts(counts, missing, levels, box=2):
+    """
+    Per-item statistics from a count table.
+
+    Args:
+        counts: (items, levels) counts from likert_counts
+        missing: (items,) missing counts
+        levels: Ordered scale values
+        box: Number of levels in the top / bottom box (2 for a 5-point scale)
+
+    Returns:
+        Dict of per-item arrays: n_valid, missing, mean, median, mode,
+        bottom_box_pct, top_box_pct, pct (items × levels)
+    """
+    levels = np.asarray(levels, dtype=float)
+    n_valid = counts.sum(axis=1)
+    has_data = n_valid > 0
+    safe_n = np.where(has_data, n_valid, 1)
+
+    mean = counts @ levels / safe_n
+
+    # Median: average of the two middle order statistics, read off the cumulative counts
+    cumulative = counts.cumsum(axis=1)
+    lower = _ranked_level(cumulative, (safe_n - 1) // 2, levels)
+    upper = _ranked_level(cumulative, safe_n // 2, levels)
+    median = (lower + upper) / 2
+
+    # Mode: most frequent level (the lowest one on ties, like Series.mode()[0])
+    mode = levels[counts.argmax(axis=1)]
+
+    pct = counts / safe_n[:, None] * 100
+    nan = np.where(has_data, 1.0, np.nan)
+    return {
+        'n_valid': n_valid,
+        'missing': missing,
+        'mean': mean * nan,
+        'median': median * nan,
+        'mode': mode * nan,
+        'bottom_box_pct': pct[:, :box].sum(axis=1) * nan,
+        'top_box_pct': pct[:, -box:].sum(axis=1) * nan,
+        'pct': pct * nan[:, None],
+    }
+
+
+def likert_summary(df, levels, items=None, box=2):
+    """
+    One tidy row per item with its distribution and summary statistics.
+
+    Args:
+        df: DataFrame with one numeric column per item
+        levels: Ordered scale values, e.g. [1, 2, 3, 4, 5]
+        items: Columns to summarise (defaults to all)
+        box: Levels in the top / bottom box
+
+    Returns:
+        DataFrame indexed by item with columns n_valid, missing, mean,
+        median, mode, bottom_box_pct, top_box_pct, count_<level> and
+        pct_<level>
+    """
+    items = list(df.columns if items is None else items)
+    responses = df[items].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=float)
+    counts, missing = likert_counts(responses, levels)
+    stats = summarize_counts(counts, missing, levels, box=box)
+
+    summary = pd.DataFrame({key: value for key, value in stats.items() if key != 'pct'},
+                           index=pd.Index(items, name='item'))
+    for j, level in enumerate(levels):
+        summary[f'count_{level}'] = counts[:, j]
+    for j, level in enumerate(levels):
+        summary[f'pct_{level}'] = stats['pct'][:, j]
+    summary.attrs['levels'] = list(levels)
+    summary.attrs['box'] = box
+    return summary
+
+
+def level_counts(summary, item):
+    """Series of counts per level for one item of a likert_summary table."""
+    levels = summary.attrs['levels']
+    return pd.Series([summary.at[item, f'count_{level}'] for level in levels],
+                     index=levels, name=item)
+
+
+def plot_diverging_likert(summary, filename=None, item_labels=None, level_labels=None,
+                          title='Response distribution', metadata=None):
+    """
+    Diverging stacked bars: disagreement to the left of zero, agreement to the
+    right, and the neutral level (odd scales) split across the centre line.
+
+    Args:
+        summary: Table from likert_summary
+        filename: Save the chart here (300 dpi); None leaves the figure open
+        item_labels: Display label per item (defaults to the item names)
+        level_labels: Legend label per level (defaults to the level values)
+        title: Chart title
+        metadata: PNG text metadata passed to savefig
+
+    Returns:
+        The matplotlib Figure
+    """
+    levels = summary.attrs['levels']
+    n_levels = len(levels)
+    pct = summary[[f'pct_{level}' for level in levels]].to_numpy(dtype=float)
+    pct = np.nan_to_num(pct)
+    labels = list(item_labels) if item_labels is not None else list(summary.index)
+    level_labels = level_labels or [str(level) for level in levels]
+    colors = DIVERGING_COLORS.get(n_levels) or plt.cm.RdBu(np.linspace(0.1, 0.9, n_levels))
+
+    half = n_levels // 2
+    neutral = pct[:, half] if n_levels % 2 else np.zeros(len(pct))
+    # Left edge of each segment: start from minus (disagreement + half of neutral)
+    left_start = -(pct[:, :half].sum(axis=1) + neutral / 2)
+    lefts = left_start[:, None] + np.hstack([np.zeros((len(pct), 1)), pct.cumsum(axis=1)[:, :-1]])
+
+    fig, ax = plt.subplots(figsize=(12, max(4, 0.8 * len(labels) + 2)))
+    y = np.arange(len(labels))
+    for j in range(n_levels):
+        bars = ax.barh(y, pct[:, j], left=lefts[:, j], color=colors[j], edgecolor='white',
+                       height=0.6, label=level_labels[j])
+        for bar, value in zip(bars, pct[:, j]):
+            if value >= 5:
+                ax.text(bar.get_x() + bar.get_width() / 2, bar.get_y() + bar.get_height() / 2,
+                        f'{value:.0f}%', ha='center', va='center', fontsize=9, fontweight='bold')
+
+    ax.axvline(0, color='black', linewidth=1)
+    ax.set_yticks(y)
+    ax.set_yticklabels(labels, fontsize=10)
+    ax.invert_yaxis()
+    limit = np.ceil(np.abs(np.hstack([lefts[:, 0], lefts[:, -1] + pct[:, -1]])).max() / 10) * 10
+    ax.set_xlim(-limit, limit)
+    ax.set_xticks(ax.get_xticks())
+    ax.set_xticklabels([f'{abs(t):.0f}%' for t in ax.get_xticks()])
+    ax.set_xlabel('Share of valid responses', fontsize=12, fontweight='bold')
+    ax.set_title(title, fontsize=13, fontweight='bold', pad=20)
+    ax.legend(loc='upper center', bbox_to_anchor=(0.5, -0.12), ncol=n_levels, frameon=False)
+    ax.xaxis.grid(True, linestyle='--', alpha=0.3)
+    ax.set_axisbelow(True)
+    plt.tight_layout()
+
+    if filename:
+        fig.savefig(filename, dpi=300, bbox_inches='tight', metadata=metadata)
+        plt.close(fig)
+    return fig
@@ -0,0 +1,341 @@
+"""
+Batched logistic regression over strata.
+
+Survey predictors are categorical, so respondents collapse into a handful
+of covariate patterns per stratum. Each model is fitted on those cells
+(successes out of trials, i.e. frequency weights) instead of raw rows,
+and the models of all strata are fitted together: the cell design
+matrices are stacked into one (strata, cells, parameters) array, padded
+with zero-weight cells, and every IRLS step is a batched einsum plus one
+batched np.linalg.solve. Hundreds of stratum models cost about as much as
+one.
+
+Predictors use treatment coding against a reference level (the most
+frequent level unless given, so odds ratios are not measured against a
+level with a handful of respondents). Levels absent from a stratum are not
+estimable there and are reported as NaN. A tiny ridge keeps the solve
+well-posed.
+
+Separation is handled before and after the fit. A level whose respondents
+all have the same outcome (one Sikh respondent, married consanguineously)
+has an infinite coefficient, and the other coefficients' estimates are
+those of the model without its respondents: those cells are dropped, the
+level is reported as NaN, and the check repeats until no level is
+separated. Coefficients that still diverge (separation by a combination
+of levels) are reported as NaN and not converged.
+
+Usage:
+    coefs = logistic_by_stratum(df, 'Consanguineous_Marriage',
+                                ['Socioeconomic_Class', 'Education_Level'],
+                                strata='Location_Type')
+    plot_forest(coefs, 'consanguinity_forest.png')
+"""
+
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+from scipy import stats
+from scipy.special import expit
+
+from survey_tools.association import encode_columns
+
+IRLS_MAX_ITER = 50
+IRLS_TOLERANCE = 1e-8
+
+# Added to the diagonal of X'WX so absent levels do not make it singular
+RIDGE = 1e-8
+
+# A coefficient still moving by more than this after IRLS_MAX_ITER diverges
+DIVERGENCE_STEP = 1e-4
+
+INTERCEPT = '(Intercept)'
+
+
+def aggregate_cells(df, outcome, predictors, strata=None, positive='Yes'):
+    """
+    Collapse respondents into (stratum, covariate pattern) cells.
+
+    Rows with a missing outcome, predictor or stratum are left out.
+
+    Returns:
+        (cells, levels): cells is a DataFrame with one code column per
+        predictor, 'stratum' (code), 'trials' and 'successes'; levels maps
+        each predictor and 'stratum' to its level labels
+    """
+    strata_cols = [strata] if isinstance(strata, str) else list(strata or [])
+    columns = list(predictors) + strata_cols
+    codes, levels = encode_columns(df, columns)
+
+    y = df[outcome]
+    complete = (codes >= 0).all(axis=1) & y.notna().to_numpy()
+    codes = codes[complete]
+    success = (y[complete] == positive).to_numpy()
+
+    k = len(predictors)
+    if strata_cols:
+        # Combined strata: one code per observed combination
+        stratum_keys, stratum_codes = np.unique(codes[:, k:], axis=0, return_inverse=True)
+        stratum_codes = stratum_codes.ravel()
+        stratum_levels = [' / '.join(str(levels[k + j][c]) for j, c in enumerate(key))
+                          for key in stratum_keys]
+    else:
+        stratum_codes = np.zeros(len(codes), dtype=np.int64)
+        stratum_levels = ['All']
+
+    keys = np.column_stack([stratum_codes, codes[:, :k]])
+    patterns, cell_of = np.unique(keys, axis=0, return_inverse=True)
+    cell_of = cell_of.ravel()
+    cells = pd.DataFrame(patterns[:, 1:], columns=list(predictors))
+    cells['stratum'] = patterns[:, 0]
+    cells['trials'] = np.bincount(cell_of, minlength=len(patterns))
+    cells['successes'] = np.bincount(cell_of, weights=success, minlength=len(patterns)).astype(np.int64)
+
+    level_map = {col: levels[j] for j, col in enumerate(predictors)}
+    level_map['stratum'] = np.asarray(stratum_levels, dtype=object)
+    return cells, level_map
+
+
+def design_matrix(cells, predictors, levels, reference=None):
+    """
+    Treatment-coded design matrix of the cells.
+
+    Args:
+        reference: {predictor: reference level}; defaults to the level with
+            the most respondents
+
+    Returns:
+        (X, terms): float array (cells × parameters) and the term labels
+    """
+    reference = reference or {}
+    blocks, terms = [np.ones((len(cells), 1))], [INTERCEPT]
+    for col in predictors:
+        labels = list(levels[col])
+        if col in reference:
+            ref = labels.index(reference[col])
+        else:
+            ref = int(np.bincount(cells[col], weights=cells['trials'], minlength=len(labels)).argmax())
+        others = [j for j in range(len(labels)) if j != ref]
+        blocks.append((cells[col].to_numpy()[:, None] == np.asarray(others)[None, :]).astype(float))
+        terms.extend(f'{col}[{labels[j]}]' for j in others)
+    return np.hstack(blocks), terms
+
+
+def stack_strata(X, cells):
+    """
+    Stack the cell rows of every stratum into padded 3-D arrays.
+
+    Returns:
+        (Xs, successes, trials): (strata, max_cells, parameters) and
+        (strata, max_cells) arrays; padding cells have zero trials
+    """
+    stratum = cells['stratum'].to_numpy()
+    n_strata = int(stratum.max()) + 1 if len(stratum) else 0
+    order = np.argsort(stratum, kind='stable')
+    sizes = np.bincount(stratum, minlength=n_strata)
+    slot = np.arange(len(order)) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+    width = int(sizes.max(initial=0))
+
+    Xs = np.zeros((n_strata, width, X.shape[1]))
+    successes = np.zeros((n_strata, width))
+    trials = np.zeros((n_strata, width))
+    Xs[stratum[order], slot] = X[order]
+    successes[stratum[order], slot] = cells['successes'].to_numpy()[order]
+    trials[stratum[order], slot] = cells['trials'].to_numpy()[order]
+    return Xs, successes, trials
+
+
+def drop_separated(X, successes, trials):
+    """
+    Drop the cells of levels whose respondents all share one outcome.
+
+    A column of X (a level dummy, or the intercept for a whole stratum)
+    is separated when its cells have trials but no events or only
+    events. Its cells get zero trials, and the check repeats, since
+    dropping cells can separate another level.
+
+    Returns:
+        (successes, trials, separated): copies with the dropped cells
+        zeroed, and a (strata × parameters) mask of the separated columns
+    """
+    successes = np.array(successes, dtype=float)
+    trials = np.array(trials, dtype=float)
+    separated = np.zeros(X.shape[::2], dtype=bool)
+    while True:
+        level_trials = np.einsum('scp,sc->sp', X, trials)
+        level_events = np.einsum('scp,sc->sp', X, successes)
+        found = (level_trials > 0) & ((level_events == 0) | (level_events == level_trials))
+        if not found.any():
+            return successes, trials, separated
+        separated |= found
+        drop = np.einsum('scp,sp->sc', X, found.astype(float)) > 0
+        successes[drop] = 0
+        trials[drop] = 0
+
+
+def fit_logistic_batch(X, successes, trials, max_iter=IRLS_MAX_ITER, tol=IRLS_TOLERANCE,
+                       ridge=RIDGE):
+    """
+    Fit one binomial logistic model per stratum with batched IRLS.
+
+    Args:
+        X: (strata, cells, parameters) design arrays
+        successes: (strata, cells) positive outcomes per cell
+        trials: (strata, cells) respondents per cell (0 for padding)
+
+    Returns:
+        Dict of per-stratum arrays: coef and se (strata × parameters, NaN
+        where not estimable), estimable (parameters with data after
+        dropping separated levels), separated, converged (per parameter),
+        iterations, deviance, n and events (respondents fitted)
+    """
+    X = np.asarray(X, dtype=float)
+    successes, trials, separated = drop_separated(X, successes, trials)
+    n_strata, _, p = X.shape
+    eye = np.eye(p) * ridge
+    beta = np.zeros((n_strata, p))
+    last_step = np.zeros((n_strata, p))
+    estimable = np.einsum('scp,sc->sp', np.abs(X), trials) > 0
+    active = np.ones(n_strata, dtype=bool)
+    iterations = np.zeros(n_strata, dtype=int)
+
+    for _ in range(max_iter):
+        if not active.any():
+            break
+        eta = np.einsum('scp,sp->sc', X[active], beta[active])
+        mu = expit(eta)
+        weight = trials[active] * mu * (1 - mu)
+        score = np.einsum('scp,sc->sp', X[active], successes[active] - trials[active] * mu)
+        info = np.einsum('scp,sc,scq->spq', X[active], weight, X[active]) + eye
+        step = np.linalg.solve(info, score[..., None])[..., 0]
+        beta[active] += step
+        last_step[active] = step
+        iterations[active] += 1
+        done = np.abs(step).max(axis=1) < tol
+        active[np.flatnonzero(active)[done]] = False
+
+    eta = np.einsum('scp,sp->sc', X, beta)
+    mu = expit(eta)
+    weight = trials * mu * (1 - mu)
+    info = np.einsum('scp,sc,scq->spq', X, weight, X) + eye
+    se = np.sqrt(np.diagonal(np.linalg.inv(info), axis1=1, axis2=2))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        fitted = trials * mu
+        dev = 2 * (np.where(successes > 0, successes * np.log(successes / fitted), 0.0)
+                   + np.where(trials - successes > 0,
+                              (trials - successes) * np.log((trials - successes) / (trials - fitted)), 0.0))
+    # In a stratum that ran out of iterations, only the diverging terms are unusable
+    converged = ~active[:, None] | (np.abs(last_step) < DIVERGENCE_STEP)
+    usable = estimable & converged
+    return {
+        'coef': np.where(usable, beta, np.nan),
+        'se': np.where(usable, se, np.nan),
+        'estimable': estimable,
+        'separated': separated,
+        'converged': converged,
+        'iterations': iterations,
+        'deviance': dev.sum(axis=1),
+        'n': trials.sum(axis=1),
+        'events': successes.sum(axis=1),
+    }
+
+
+def logistic_by_stratum(df, outcome, predictors, strata=None, positive='Yes', reference=None,
+                        confidence=0.95, **fit_options):
+    """
+    Logistic regression of outcome == positive on categorical predictors,
+    fitted separately within every stratum in one batched call.
+
+    Args:
+        df: Respondent DataFrame
+        outcome: Binary outcome column
+        predictors: Categorical predictor columns
+        strata: Column (or list of columns) defining the strata; None fits
+            one pooled model labelled 'All'
+        positive: Outcome value counted as a success
+        reference: {predictor: reference level}
+        confidence: Coverage of the odds-ratio intervals
+
+    Returns:
+        Tidy coefficient table: stratum, term, coef, se, z, p_value,
+        odds_ratio, or_low, or_high, n, events, separated, converged;
+        separated and diverging terms have NaN estimates, and n counts
+        the respondents left after dropping separated levels
+    """
+    predictors = list(predictors)
+    cells, levels = aggregate_cells(df, outcome, predictors, strata, positive)
+    X, terms = design_matrix(cells, predictors, levels, reference)
+    Xs, successes, trials = stack_strata(X, cells)
+    fit = fit_logistic_batch(Xs, successes, trials, **fit_options)
+
+    z_crit = stats.norm.ppf(0.5 + confidence / 2)
+    n_strata = len(levels['stratum'])
+    coef, se = fit['coef'].ravel(), fit['se'].ravel()
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        z = coef / se
+        odds = np.exp(np.stack([coef, coef - z_crit * se, coef + z_crit * se]))
+    table = pd.DataFrame({
+        'stratum': np.repeat(levels['stratum'], len(terms)),
+        'term': np.tile(terms, n_strata),
+        'coef': coef,
+        'se': se,
+        'z': z,
+        'p_value': 2 * stats.norm.sf(np.abs(z)),
+        'odds_ratio': odds[0],
+        'or_low': odds[1],
+        'or_high': odds[2],
+        'n': np.repeat(fit['n'].astype(int), len(terms)),
+        'events': np.repeat(fit['events'].astype(int), len(terms)),
+        'separated': fit['separated'].ravel(),
+        'converged': fit['converged'].ravel(),
+    })
+    table.attrs['outcome'] = outcome
+    table.attrs['positive'] = positive
+    return table
+
+
+def plot_forest(coefs, filename=None, title=None, metadata=None, max_or=100):
+    """
+    Forest plot of odds ratios with confidence intervals (intercepts omitted).
+
+    Terms run down the y axis; each stratum gets its own colour and a small
+    vertical offset. Only converged, finite estimates are drawn, and any
+    with an interval beyond max_or are left out.
+
+    Returns:
+        The matplotlib Figure
+    """
+    shown = coefs[(coefs['term'] != INTERCEPT) & coefs['odds_ratio'].notna() & coefs['converged']]
+    shown = shown[(shown['or_high'] < max_or) & (shown['or_low'] > 1 / max_or)]
+    terms = list(dict.fromkeys(coefs.loc[coefs['term'] != INTERCEPT, 'term']))
+    strata = list(dict.fromkeys(coefs['stratum']))
+    colors = plt.cm.tab10(np.arange(len(strata)) % 10)
+    spread = 0.6 / max(len(strata), 1)
+
+    fig, ax = plt.subplots(figsize=(10, max(4, 0.5 * len(terms) * max(1, len(strata) / 3) + 2)))
+    for s, (stratum, color) in enumerate(zip(strata, colors)):
+        part = shown[shown['stratum'] == stratum]
+        y = np.array([terms.index(t) for t in part['term']]) + (s - (len(strata) - 1) / 2) * spread
+        ax.errorbar(part['odds_ratio'], y,
+                    xerr=[part['odds_ratio'] - part['or_low'], part['or_high'] - part['odds_ratio']],
+                    fmt='o', color=color, ecolor=color, capsize=3, markersize=6,
+                    label=f'{stratum} (n={int(coefs.loc[coefs["stratum"] == stratum, "n"].iloc[0])})')
+
+    ax.axvline(1, color='black', linewidth=1, linestyle='--')
+    ax.set_xscale('log')
+    ax.set_yticks(range(len(terms)))
+    ax.set_yticklabels(terms, fontsize=10)
+    ax.invert_yaxis()
+    ax.set_xlabel('Odds ratio (log scale)', fontsize=12, fontweight='bold')
+    outcome = coefs.attrs.get('outcome', 'outcome')
+    ax.set_title(title or f'Adjusted odds ratios for {outcome}', fontsize=13, fontweight='bold', pad=20)
+    if len(strata) > 1:
+        ax.legend(title='Stratum', fontsize=9, loc='best')
+    ax.xaxis.grid(True, linestyle='--', alpha=0.3)
+    ax.set_axisbelow(True)
+    plt.tight_layout()
+
+    if filename:
+        fig.savefig(filename, dpi=300, bbox_inches='tight', metadata=metadata)
+        plt.close(fig)
+    return fig
@@ -0,0 +1,266 @@
+"""
+Hierarchical log-linear models for multi-way contingency tables.
+
+A hierarchical model is given by its generators, the highest-order terms
+it contains: [(0, 1), (2,)] is "variables 0 and 1 associated, variable 2
+independent of both" ([AB][C]). The maximum-likelihood fit matches every
+generator margin of the observed table, and iterative proportional fitting
+finds it by rescaling the fitted table to one margin after another:
+
+    fitted *= observed_margin / fitted_margin
+
+Each step is one sum with keepdims plus one broadcast multiply over the
+whole N-dimensional table, so a cycle costs a few passes over all cells no
+matter how many variables there are.
+
+Models are compared by their deviance G² = 2 Σ observed log(observed /
+fitted); the difference in deviance between nested models is chi-square
+with the difference in degrees of freedom. Degrees of freedom are the
+number of cells minus the number of free parameters; they are not reduced
+for sampling zeros.
+
+Usage:
+    columns = ['Type_Of_Disease', 'Consanguinity', 'Sex']
+    table, levels = contingency_array(df, columns)
+    print(compare_models(table, order_hierarchy(3), columns))
+    print(term_tests(table, order_hierarchy(3)[1], columns))
+"""
+
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from survey_tools.association import encode_columns
+
+# IPF stops when every fitted margin is within this of the observed one
+IPF_TOLERANCE = 1e-6
+IPF_MAX_ITER = 500
+
+
+def contingency_array(df, columns):
+    """
+    Full N-way count table of several columns (rows with any missing value
+    are left out).
+
+    Returns:
+        (table, levels): int64 array with one axis per column, and the level
+        labels of each axis
+    """
+    codes, levels = encode_columns(df, columns)
+    complete = (codes >= 0).all(axis=1)
+    shape = tuple(len(lv) for lv in levels)
+    flat = np.ravel_multi_index(codes[complete].T, shape)
+    table = np.bincount(flat, minlength=int(np.prod(shape))).reshape(shape)
+    return table, levels
+
+
+def _normalize(generators):
+    """Sorted tuples with generators contained in another one removed."""
+    sets = {frozenset(g) for g in generators}
+    kept = [g for g in sets if not any(g < other for other in sets)]
+    return sorted((tuple(sorted(g)) for g in kept), key=lambda g: (-len(g), g))
+
+
+def model_terms(generators):
+    """All terms of a hierarchical model: every subset of every generator, including the intercept."""
+    terms = set()
+    for g in generators:
+        for size in range(len(g) + 1):
+            terms.update(frozenset(sub) for sub in combinations(g, size))
+    return terms
+
+
+def model_parameters(shape, generators):
+    """Number of free parameters: Σ over terms of Π (levels - 1)."""
+    return sum(int(np.prod([shape[axis] - 1 for axis in term])) for term in model_terms(generators))
+
+
+def is_nested(smaller, larger):
+    """True when every term of smaller is also a term of larger."""
+    return model_terms(smaller) <= model_terms(larger)
+
+
+def format_model(generators, names=None):
+    """'[A*B][C]' style label; names map axes to variable names."""
+    label = lambda axis: str(names[axis]) if names is not None else chr(ord('A') + axis)
+    return ''.join('[' + '*'.join(label(axis) for axis in g) + ']' for g in _normalize(generators))
+
+
+def fit_ipf(table, generators, tol=IPF_TOLERANCE, max_iter=IPF_MAX_ITER):
+    """
+    Maximum-likelihood fitted counts of a hierarchical model by IPF.
+
+    Args:
+        table: Observed counts, one axis per variable
+        generators: Highest-order terms as tuples of axes
+        tol: Largest allowed gap between fitted and observed margins
+        max_iter: Maximum number of full cycles over the generators
+
+    Returns:
+        (fitted, iterations): float array shaped like table, and the
+        number of cycles used
+    """
+    table = np.asarray(table, dtype=float)
+    all_axes = range(table.ndim)
+    margins = []
+    for g in _normalize(generators):
+        summed = tuple(axis for axis in all_axes if axis not in g)
+        margins.append((summed, table.sum(axis=summed, keepdims=True)))
+
+    fitted = np.ones_like(table)
+    if not margins:
+        return fitted * table.sum() / table.size, 0
+
+    for iteration in range(1, max_iter + 1):
+        for summed, target in margins:
+            current = fitted.sum(axis=summed, keepdims=True)
+            fitted *= np.divide(target, current, out=np.zeros_like(current), where=current > 0)
+        gap = max(np.abs(fitted.sum(axis=summed, keepdims=True) - target).max()
+                  for summed, target in margins)
+        if gap < tol:
+            break
+    return fitted, iteration
+
+
+def deviance(table, fitted):
+    """G² = 2 Σ observed log(observed / fitted) over cells with observations."""
+    table = np.asarray(table, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        terms = np.where(table > 0, table * np.log(table / fitted), 0.0)
+    return float(2 * terms.sum())
+
+
+def fit_loglinear(table, generators, **ipf_options):
+    """
+    Fit one hierarchical model.
+
+    Returns:
+        Dict with model (normalized generators), deviance, df, p_value,
+        parameters, aic (relative: deviance + 2 × parameters), iterations
+        and fitted
+    """
+    table = np.asarray(table)
+    generators = _normalize(generators)
+    fitted, iterations = fit_ipf(table, generators, **ipf_options)
+    g2 = deviance(table, fitted)
+    parameters = model_parameters(table.shape, generators)
+    dof = table.size - parameters
+    return {
+        'model': generators,
+        'deviance': g2,
+        'df': dof,
+        'p_value': float(stats.chi2.sf(g2, dof)) if dof > 0 else np.nan,
+        'parameters': parameters,
+        'aic': g2 + 2 * parameters,
+        'iterations': iterations,
+        'fitted': fitted,
+    }
+
+
+def order_hierarchy(n_vars):
+    """
+    Models with all terms up to each order: mutual independence, all
+    two-way associations, ..., saturated. Each model is nested in the next.
+    """
+    return [list(combinations(range(n_vars), order)) for order in range(1, n_vars + 1)]
+
+
+def drop_term(generators, term):
+    """Largest hierarchical submodel without the given generator."""
+    term = tuple(sorted(term))
+    rest = [g for g in _normalize(generators) if g != term]
+    return _normalize(rest + list(combinations(term, len(term) - 1)))
+
+
+def compare_models(table, models, names=None, **ipf_options):
+    """
+    Fit several models and test each against the previous one when nested.
+
+    Args:
+        table: Observed counts
+        models: List of generator lists, typically from simplest to richest
+        names: Variable name per axis (for the model labels)
+
+    Returns:
+        DataFrame with model, deviance, df, p_value, aic, iterations and,
+        for models nested with their predecessor, delta_deviance, delta_df
+        and p_delta
+    """
+    rows, previous = [], None
+    for generators in models:
+        fit = fit_loglinear(table, generators, **ipf_options)
+        row = {key: fit[key] for key in ('deviance', 'df', 'p_value', 'aic', 'iterations')}
+        row = {'model': format_model(fit['model'], names), **row,
+               'delta_deviance': np.nan, 'delta_df': np.nan, 'p_delta': np.nan}
+        if previous is not None:
+            small, large = sorted([previous, fit], key=lambda f: f['parameters'])
+            if is_nested(small['model'], large['model']) and small['df'] > large['df']:
+                delta = small['deviance'] - large['deviance']
+                delta_df = small['df'] - large['df']
+                row.update(delta_deviance=delta, delta_df=delta_df,
+                           p_delta=float(stats.chi2.sf(delta, delta_df)))
+        rows.append(row)
+        previous = fit
+    return pd.DataFrame(rows)
+
+
+def term_tests(table, generators, names=None, **ipf_options):
+    """
+    Test every generator of a model by dropping it (conditional G² test).
+
+    Returns:
+        DataFrame with term, deviance (of the reduced model), delta_deviance,
+        delta_df and p_value, sorted by p_value
+    """
+    full = fit_loglinear(table, generators, **ipf_options)
+    rows = []
+    for term in full['model']:
+        if len(term) < 2:
+            continue
+        reduced = fit_loglinear(table, drop_term(full['model'], term), **ipf_options)
+        delta = reduced['deviance'] - full['deviance']
+        delta_df = reduced['df'] - full['df']
+        rows.append({
+            'term': format_model([term], names)[1:-1],
+            'deviance': reduced['deviance'],
+            'delta_deviance': delta,
+            'delta_df': delta_df,
+            'p_value': float(stats.chi2.sf(delta, delta_df)) if delta_df > 0 else np.nan,
+        })
+    results = pd.DataFrame(rows, columns=['term', 'deviance', 'delta_deviance', 'delta_df', 'p_value'])
+    return results.sort_values('p_value', kind='stable').reset_index(drop=True)
+
+
+def loglinear_analysis(df, columns, **ipf_options):
+    """
+    Order hierarchy plus term tests of the all-two-way model for columns.
+
+    Returns:
+        (hierarchy, terms): the compare_models and term_tests tables
+    """
+    table, _ = contingency_array(df, columns)
+    models = order_hierarchy(len(columns))
+    hierarchy = compare_models(table, models, columns, **ipf_options)
+    terms = term_tests(table, models[min(1, len(models) - 1)], columns, **ipf_options)
+    return hierarchy, terms
+
+
+def print_loglinear(hierarchy, terms=None):
+    """Print a compare_models table (and optional term_tests) compactly."""
+    width = max([len('Model')] + [len(model) for model in hierarchy['model']])
+    print(f"{'Model':<{width}} {'G²':>9} {'df':>4} {'p':>8} {'ΔG²':>9} {'Δdf':>4} {'p(Δ)':>8}")
+    print("-" * (width + 48))
+    for _, row in hierarchy.iterrows():
+        delta = (f"{row['delta_deviance']:>9.2f} {int(row['delta_df']):>4} {row['p_delta']:>8.4f}"
+                 if np.isfinite(row['delta_deviance']) else f"{'':>9} {'':>4} {'':>8}")
+        # The saturated model (df = 0) fits exactly and has no test
+        p_value = f"{row['p_value']:>8.4f}" if row['df'] > 0 else f"{'–':>8}"
+        print(f"{row['model']:<{width}} {row['deviance']:>9.2f} {row['df']:>4} {p_value} {delta}")
+    if terms is not None and not terms.empty:
+        width = max([len('Dropped term')] + [len(term) for term in terms['term']])
+        print(f"\n{'Dropped term':<{width}} {'ΔG²':>9} {'Δdf':>4} {'p':>8}")
+        print("-" * (width + 24))
+        for _, row in terms.iterrows():
+            print(f"{row['term']:<{width}} {row['delta_deviance']:>9.2f} {row['delta_df']:>4} {row['p_value']:>8.4f}")
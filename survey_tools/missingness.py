@@ -0,0 +1,196 @@
+"""
+Missingness bitmasks and complete-case counts.
+
+Each respondent's answered/missing state over k columns is one row of a
+boolean validity matrix M (n × k). Its rows are packed into bitmasks
+(np.packbits, one bit per column) and collapsed to the distinct
+missingness patterns with their frequencies, which is where all the
+counting happens:
+
+    P  distinct patterns (p × k, boolean), c  their counts, p ≪ n
+
+    pairwise complete counts   M.T @ M             = P.T @ (c P)
+    triple-wise counts         Σ_r M_ri M_rj M_rl  = einsum over P and c
+    complete rows for a subset  c[P[:, subset].all(axis=1)].sum()
+
+so the k × k (and k × k × k) tables for every pair and triple cost a
+few small matrix products over the patterns, not one mask per pair. Row
+masks for a subset are a gather of a per-pattern flag through each
+respondent's pattern code, cached per subset.
+
+Usage:
+    missing = MissingnessIndex(df)
+    missing.valid_counts                     # per-column answered counts
+    missing.pairwise                         # k × k complete-case counts
+    df_pair = missing.complete('Type_Of_Disease', 'Religion')
+    print_patterns(missing)
+    plot_patterns(missing, 'missingness_patterns.png')
+"""
+
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+from matplotlib.colors import ListedColormap
+
+
+class MissingnessIndex:
+    """
+    Packed validity bits of a DataFrame's columns and the counts derived
+    from them.
+
+    The index describes the frame as it was when built; rebuild it after
+    changing which values are missing.
+    """
+
+    def __init__(self, df, columns=None):
+        self.df = df
+        self.columns = list(df.columns if columns is None else columns)
+        valid = df[self.columns].notna().to_numpy()
+        self.n = len(df)
+        self.bits = np.packbits(valid, axis=1)
+        if self.bits.shape[1] <= 8:
+            # Up to 64 columns: one uint64 key per row, so np.unique stays 1-D
+            keys = np.zeros((self.n, 8), dtype=np.uint8)
+            keys[:, :self.bits.shape[1]] = self.bits
+            unique_keys, self.pattern_codes, self.pattern_counts = np.unique(
+                keys.view(np.uint64).reshape(-1), return_inverse=True, return_counts=True)
+            unique_bits = unique_keys.view(np.uint8).reshape(-1, 8)[:, :self.bits.shape[1]]
+        else:
+            unique_bits, self.pattern_codes, self.pattern_counts = np.unique(
+                self.bits, axis=0, return_inverse=True, return_counts=True)
+        self.pattern_codes = self.pattern_codes.reshape(-1)
+        # Distinct patterns as booleans (p × k)
+        self.patterns_valid = np.unpackbits(unique_bits, axis=1, count=len(self.columns)).astype(bool)
+        self._masks = {}
+        self._pairwise = None
+        self._triplewise = None
+
+    def _positions(self, columns):
+        unknown = [col for col in columns if col not in self.columns]
+        if unknown:
+            raise KeyError(f"Not in the missingness index: {unknown}")
+        return [self.columns.index(col) for col in columns]
+
+    @property
+    def valid_counts(self):
+        """Answered respondents per column."""
+        counts = self.pattern_counts @ self.patterns_valid
+        return pd.Series(counts.astype(np.int64), index=self.columns, name='valid')
+
+    @property
+    def missing_counts(self):
+        """Missing respondents per column."""
+        return (self.n - self.valid_counts).rename('missing')
+
+    @property
+    def pairwise(self):
+        """k × k DataFrame of respondents answering both columns (diagonal: each column)."""
+        if self._pairwise is None:
+            P = self.patterns_valid.astype(np.int64)
+            counts = P.T @ (P * self.pattern_counts[:, None])
+            self._pairwise = pd.DataFrame(counts, index=self.columns, columns=self.columns)
+        return self._pairwise
+
+    @property
+    def triplewise(self):
+        """k × k × k array of respondents answering all three columns."""
+        if self._triplewise is None:
+            P = self.patterns_valid.astype(np.int64)
+            self._triplewise = np.einsum('pi,pj,pl,p->ijl', P, P, P, self.pattern_counts, optimize=True)
+        return self._triplewise
+
+    def complete_count(self, *columns):
+        """Respondents answering every given column."""
+        positions = self._positions(columns)
+        if len(positions) == 2:
+            return int(self.pairwise.iat[positions[0], positions[1]])
+        if len(positions) == 3:
+            return int(self.triplewise[tuple(positions)])
+        return int(self.pattern_counts[self.patterns_valid[:, positions].all(axis=1)].sum())
+
+    def complete_mask(self, *columns):
+        """Boolean row mask of respondents answering every given column (cached)."""
+        key = frozenset(columns)
+        if key not in self._masks:
+            positions = self._positions(columns)
+            self._masks[key] = self.patterns_valid[:, positions].all(axis=1)[self.pattern_codes]
+        return self._masks[key]
+
+    def complete(self, *columns):
+        """Rows of the indexed DataFrame answering every given column."""
+        return self.df[self.complete_mask(*columns)]
+
+    def patterns(self, top=None):
+        """
+        Distinct missingness patterns, most frequent first.
+
+        Returns:
+            DataFrame with one boolean column per variable (True: answered),
+            n_missing, count and pct
+        """
+        table = pd.DataFrame(self.patterns_valid, columns=self.columns)
+        table['n_missing'] = (~self.patterns_valid).sum(axis=1)
+        table['count'] = self.pattern_counts
+        table['pct'] = self.pattern_counts / self.n * 100 if self.n else np.nan
+        table = table.sort_values(['count', 'n_missing'], ascending=[False, True], ignore_index=True)
+        return table.head(top) if top else table
+
+
+def print_patterns(index, top=10):
+    """Compact table of the most frequent missingness patterns (✓ answered, · missing)."""
+    table = index.patterns(top)
+    width = max(len(col) for col in index.columns)
+    print(f"{'Pattern':<{width}}  " + '  '.join(f'#{i + 1:<3}' for i in range(len(table))))
+    for col in index.columns:
+        marks = '  '.join(f"{'✓' if answered else '·':<4}" for answered in table[col])
+        print(f"{col:<{width}}  {marks}")
+    print(f"{'Respondents':<{width}}  " + '  '.join(f'{count:<4}' for count in table['count']))
+    shown = table['count'].sum()
+    if shown < index.n:
+        print(f"({len(index.pattern_counts) - len(table)} rarer patterns cover {index.n - shown} respondents)")
+
+
+def plot_patterns(index, filename=None, title='Missingness patterns', top=15, metadata=None):
+    """
+    Pattern matrix (answered / missing per variable, most frequent patterns
+    first) next to the number of respondents with each pattern.
+
+    Returns:
+        The matplotlib Figure
+    """
+    table = index.patterns(top)
+    labels = [col.replace('_', ' ') for col in index.columns]
+    fig, (ax_matrix, ax_counts) = plt.subplots(
+        1, 2, figsize=(14, max(4, 0.45 * len(table) + 2)), sharey=True,
+        gridspec_kw={'width_ratios': [max(3, len(labels)), 4]})
+
+    ax_matrix.imshow(table[index.columns].to_numpy(dtype=int), aspect='auto',
+                     cmap=ListedColormap(['#e74c3c', '#2ecc71']), vmin=0, vmax=1)
+    ax_matrix.set_xticks(range(len(labels)))
+    ax_matrix.set_xticklabels(labels, rotation=35, ha='right', fontsize=10, fontweight='bold')
+    ax_matrix.set_yticks(range(len(table)))
+    ax_matrix.set_yticklabels([f'{n} missing' for n in table['n_missing']], fontsize=9)
+    ax_matrix.set_xticks(np.arange(-0.5, len(labels)), minor=True)
+    ax_matrix.set_yticks(np.arange(-0.5, len(table)), minor=True)
+    ax_matrix.grid(which='minor', color='white', linewidth=2)
+    ax_matrix.tick_params(which='minor', length=0)
+    ax_matrix.set_title('Answered (green) / missing (red)', fontsize=12, fontweight='bold')
+
+    bars = ax_counts.barh(range(len(table)), table['count'], color='#3498db', edgecolor='black')
+    for bar, count, pct in zip(bars, table['count'], table['pct']):
+        ax_counts.text(bar.get_width(), bar.get_y() + bar.get_height() / 2, f' {count} ({pct:.1f}%)',
+                       va='center', fontsize=9, fontweight='bold')
+    ax_counts.set_xlabel('Respondents', fontsize=11, fontweight='bold')
+    ax_counts.set_xlim(0, table['count'].max() * 1.3 if len(table) else 1)
+    ax_counts.spines['top'].set_visible(False)
+    ax_counts.spines['right'].set_visible(False)
+    ax_counts.grid(axis='x', alpha=0.3, linestyle='--')
+
+    fig.suptitle(f'{title}\n({len(index.pattern_counts)} distinct patterns, {index.n} respondents)',
+                 fontsize=14, fontweight='bold')
+    plt.tight_layout()
+
+    if filename:
+        fig.savefig(filename, dpi=300, bbox_inches='tight', metadata=metadata)
+        plt.close(fig)
+    return fig
@@ -0,0 +1,191 @@
+"""
+Multi-select answer parsing.
+
+"Can choose more than one" questions are exported as one comma-joined string
+per respondent ('Lack of awareness, High cost'). This module splits those
+strings against the known option list and stores the result as a sparse
+respondent × option indicator matrix, so option frequencies, the number of
+options each respondent picked and "exactly k options" filters are plain
+column / row sums.
+
+Options may themselves contain commas: each answer is matched greedily
+against the longest known option first, and only text that matches no
+option is split on the separator (and counted as a write-in).
+
+Each distinct answer string is parsed once; respondents are then gathered
+from the small unique-answer matrix through the factorized codes.
+
+Usage:
+    selections = parse_multiselect(df[question], options=BARRIER_OPTIONS)
+    selections.option_counts()        # pandas Series, one entry per option
+    selections.selection_histogram()  # respondents by number of options picked
+"""
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+DEFAULT_SEPARATOR = ','
+
+
+def _key(text):
+    """Case- and whitespace-insensitive form used for matching."""
+    return ' '.join(text.casefold().split())
+
+
+def split_answer(answer, options, sep=DEFAULT_SEPARATOR):
+    """
+    Split one answer string into known options and write-ins.
+
+    Args:
+        answer: Raw answer text
+        options: Known option labels
+        sep: Separator between selected options
+
+    Returns:
+        (list of option indices, list of write-in strings), both in the
+        order they appear in the answer
+    """
+    keys = sorted(((_key(opt), i) for i, opt in enumerate(options)),
+                  key=lambda item: -len(item[0]))
+    text = _key(answer)
+    picked, write_ins = [], []
+
+    while text:
+        for key, i in keys:
+            # An option must end at the end of the answer or at a separator
+            if key and text.startswith(key) and text[len(key):].lstrip()[:1] in ('', sep):
+                if i not in picked:
+                    picked.append(i)
+                text = text[len(key):].lstrip()
+                break
+        else:
+            token, _, _ = text.partition(sep)
+            if token.strip():
+                # Keep the original spelling of the write-in
+                start = _key(answer).find(token)
+                write_ins.append(' '.join(answer.split())[start:start + len(token)].strip())
+            text = text[len(token):]
+        text = text[1:].lstrip() if text.startswith(sep) else text
+
+    return picked, write_ins
+
+
+class MultiSelect:
+    """
+    Respondent × option indicator matrix for one multi-select question.
+
+    Attributes:
+        matrix: scipy.sparse CSR matrix (n_respondents × n_options) of 0/1 int8
+        options: Column labels (known options, then write-ins or 'Other')
+        index: Respondent index of the source Series
+        answered: Boolean array, True where the respondent gave any answer
+    """
+
+    def __init__(self, matrix, options, index, answered):
+        self.matrix = matrix
+        self.options = list(options)
+        self.index = index
+        self.answered = answered
+
+    @property
+    def n_answered(self):
+        return int(self.answered.sum())
+
+    def option_counts(self):
+        """Number of respondents selecting each option (column sums)."""
+        counts = np.asarray(self.matrix.sum(axis=0)).ravel()
+        return pd.Series(counts, index=self.options, name='count')
+
+    def prevalence(self):
+        """Share of answering respondents that selected each option (0-100)."""
+        total = self.n_answered
+        return self.option_counts() / total * 100 if total else self.option_counts() * 0.0
+
+    def selection_counts(self):
+        """Number of options each respondent selected (row sums)."""
+        return np.asarray(self.matrix.sum(axis=1)).ravel()
+
+    def selection_histogram(self):
+        """Answering respondents by number of options selected."""
+        counts = np.bincount(self.selection_counts()[self.answered])[1:]
+        return pd.Series(counts, index=np.arange(1, len(counts) + 1),
+                         name='respondents').rename_axis('options_selected')
+
+    def respondents_with(self, k):
+        """Boolean mask of respondents who selected exactly k options."""
+        return self.answered & (self.selection_counts() == k)
+
+    def to_frame(self):
+        """Dense 0/1 DataFrame (for small questions and exports)."""
+        return pd.DataFrame(self.matrix.toarray(), index=self.index, columns=self.options)
+
+
+def parse_multiselect(series, options=None, sep=DEFAULT_SEPARATOR, other='Other'):
+    """
+    Parse a multi-select column into a MultiSelect indicator matrix.
+
+    Args:
+        series: Raw answer strings (NaN / empty means not answered)
+        options: Known option labels; None discovers them from the data
+            (ordered by frequency)
+        sep: Separator between selected options
+        other: Column that collects write-ins; None keeps each write-in as
+            its own column
+
+    Returns:
+        MultiSelect
+    """
+    codes, uniques = pd.factorize(series, use_na_sentinel=True)
+    known = list(options or [])
+
+    # Parse each distinct answer once
+    parsed = [split_answer(str(answer), known, sep) for answer in uniques]
+
+    if options is None or other is None:
+        # Write-ins become their own columns, most frequent first
+        weights = np.bincount(codes[codes >= 0], minlength=len(uniques))
+        seen = {}
+        for (_, write_ins), weight in zip(parsed, weights):
+            for token in write_ins:
+                seen[token] = seen.get(token, 0) + weight
+        extra = sorted(seen, key=lambda token: -seen[token])
+        labels = known + extra
+        column_of = {token: len(known) + j for j, token in enumerate(extra)}
+    else:
+        labels = known + [other]
+        column_of = None
+
+    rows, cols = [], []
+    for u, (picked, write_ins) in enumerate(parsed):
+        columns = list(picked)
+        for token in write_ins:
+            col = column_of[token] if column_of is not None else len(known)
+            if col not in columns:
+                columns.append(col)
+        rows.extend([u] * len(columns))
+        cols.extend(columns)
+
+    unique_matrix = sparse.csr_matrix(
+        (np.ones(len(rows), dtype=np.int8), (rows, cols)),
+        shape=(len(uniques), len(labels))
+    )
+
+    # Gather respondents from the unique-answer rows; unanswered rows stay empty
+    answered = codes >= 0
+    if len(uniques):
+        answered &= np.asarray(unique_matrix.sum(axis=1)).ravel()[np.maximum(codes, 0)] > 0
+    gather = sparse.csr_matrix(
+        (np.ones(int(answered.sum()), dtype=np.int8),
+         (np.flatnonzero(answered), codes[answered])),
+        shape=(len(codes), len(uniques))
+    )
+    matrix = (gather @ unique_matrix).tocsr()
+
+    if options is None and labels:
+        # Discovered options: order columns by frequency
+        order = np.argsort(-np.asarray(matrix.sum(axis=0)).ravel(), kind='stable')
+        matrix = matrix[:, order]
+        labels = [labels[i] for i in order]
+
+    return MultiSelect(matrix, labels, series.index, answered)
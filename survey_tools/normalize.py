@@ -0,0 +1,165 @@
+"""
+Unique-value-first string normalization.
+
+Survey exports have a few dozen distinct answers repeated over many rows, so
+each column is factorized once, only the distinct values are cleaned (strip,
+newline removal, typo maps, case folding), and the cleaned values are
+broadcast back through the integer codes. Cleaning cost scales with the
+number of distinct answers, not the number of rows.
+
+Usage:
+    df = normalize_frame(df, replace={'Sex': {'Make': 'Male', 'Female=': 'Female'}},
+                         empty_as_nan=True)
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def is_text_column(series):
+    """True for object / string columns (the ones worth normalizing)."""
+    return pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series)
+
+
+def _merge_case_variants(cleaned, counts):
+    """
+    Collapse values that differ only by case onto their most frequent spelling.
+
+    'Secondary school' and 'Secondary School' both become whichever of the
+    two occurs more often (ties go to the first one seen).
+    """
+    # Sum counts per spelling first so a spelling split over several raw
+    # uniques (e.g. 'Male' and 'Male ') is weighed as a whole
+    totals = {}
+    for i, value in enumerate(cleaned):
+        if isinstance(value, str):
+            totals[value] = totals.get(value, 0) + counts[i]
+    by_key = {}
+    for value, total in totals.items():
+        key = value.casefold()
+        if key not in by_key or total > totals[by_key[key]]:
+            by_key[key] = value
+
+    merged = cleaned.copy()
+    for i, value in enumerate(cleaned):
+        if isinstance(value, str):
+            merged[i] = by_key[value.casefold()]
+    return merged
+
+
+def clean_unique_values(uniques, strip=True, remove_newlines=True, casefold=False,
+                        replace=None, empty_as_nan=False, counts=None):
+    """
+    Clean an array of distinct values.
+
+    Args:
+        uniques: Distinct values of a column (object array)
+        strip: Strip surrounding whitespace
+        remove_newlines: Drop embedded '\\n' characters
+        casefold: Merge values that differ only by case onto the most
+            frequent spelling (needs counts)
+        replace: Typo map applied after stripping, e.g. {'Make': 'Male'}
+        empty_as_nan: Turn values that end up empty into NaN
+        counts: Occurrences of each unique value (used by casefold)
+
+    Returns:
+        Object array of cleaned values, aligned with uniques
+    """
+    replace = replace or {}
+    cleaned = np.empty(len(uniques), dtype=object)
+
+    for i, value in enumerate(uniques):
+        if isinstance(value, str):
+            if remove_newlines:
+                value = value.replace('\n', '')
+            if strip:
+                value = value.strip()
+            value = replace.get(value, value)
+            if empty_as_nan and value == '':
+                value = np.nan
+        cleaned[i] = value
+
+    if casefold:
+        if counts is None:
+            counts = np.ones(len(uniques), dtype=np.int64)
+        cleaned = _merge_case_variants(cleaned, counts)
+
+    return cleaned
+
+
+def map_unique_values(series, func, categorical=False):
+    """
+    Apply func to the distinct values of a column and broadcast the result.
+
+    Args:
+        series: Column to transform
+        func: Called as func(uniques, counts) with the distinct non-missing
+            values (object array) and their occurrence counts; returns an
+            aligned array of replacement values
+        categorical: Return a pandas Categorical-backed Series instead of
+            object strings (cheaper for very long columns)
+
+    Returns:
+        Transformed Series with the same index and name
+    """
+    codes, uniques = pd.factorize(series, use_na_sentinel=True)
+    uniques = np.asarray(uniques, dtype=object)
+    counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+
+    cleaned = func(uniques, counts)
+
+    if categorical:
+        # Cleaning can merge uniques, so re-factorize the (small) cleaned array
+        new_codes, categories = pd.factorize(cleaned, use_na_sentinel=True)
+        lookup = np.append(new_codes, -1)
+        return pd.Series(pd.Categorical.from_codes(lookup[codes], categories=categories),
+                         index=series.index, name=series.name)
+
+    # Code -1 (missing) picks the trailing NaN; keep a string dtype if the input had one
+    lookup = np.append(cleaned, np.nan).astype(object)
+    dtype = series.dtype if pd.api.types.is_string_dtype(series) else object
+    return pd.Series(lookup[codes], index=series.index, name=series.name, dtype=dtype)
+
+
+def normalize_series(series, strip=True, remove_newlines=True, casefold=False, replace=None,
+                     empty_as_nan=False, categorical=False):
+    """
+    Normalize one text column via factorize → clean uniques → broadcast.
+
+    Args:
+        series: Column to clean
+        categorical: See map_unique_values
+        Other arguments as for clean_unique_values
+
+    Returns:
+        Cleaned Series with the same index and name
+    """
+    def clean(uniques, counts):
+        return clean_unique_values(uniques, strip=strip, remove_newlines=remove_newlines,
+                                   casefold=casefold, replace=replace,
+                                   empty_as_nan=empty_as_nan, counts=counts)
+
+    return map_unique_values(series, clean, categorical=categorical)
+
+
+def normalize_frame(df, columns=None, replace=None, **options):
+    """
+    Normalize several text columns of a DataFrame.
+
+    Args:
+        df: DataFrame to clean (not modified)
+        columns: Columns to clean (defaults to every object / string column)
+        replace: Per-column typo maps, e.g. {'Sex': {'Make': 'Male'}}
+        options: Passed to normalize_series (strip, remove_newlines, casefold, ...)
+
+    Returns:
+        Cleaned copy of df
+    """
+    replace = replace or {}
+    if columns is None:
+        columns = [col for col in df.columns if is_text_column(df[col])]
+
+    out = df.copy()
+    for col in columns:
+        out[col] = normalize_series(df[col], replace=replace.get(col), **options)
+    return out
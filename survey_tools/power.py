@@ -0,0 +1,288 @@
+"""
+Sample-size and power simulation for planned survey rounds.
+
+Effect sizes are taken from an existing survey: the share of respondents
+in each group of a predictor (religion, socioeconomic class, ...) and the
+rate of a yes/no outcome (consanguineous marriage) within each group. A
+synthetic survey of n respondents is then one multinomial draw of the
+group sizes and one binomial draw of the outcome count per group, so a
+whole batch of surveys is a (replicates × groups × 2) array of tables
+built by two vectorized Generator calls:
+
+    sizes = rng.multinomial(n, group_shares, size=replicates)
+    yes   = rng.binomial(sizes, group_rates)
+
+Each batch is tested at once (Pearson chi-square of independence and, for
+ordered groups, the Cochran-Armitage trend test), and power is the share
+of surveys with p < alpha. Sample sizes are spread over a process pool;
+every sample size has its own random stream, so results do not depend on
+the number of workers.
+
+Usage:
+    effects = estimate_effects(df, 'religion', 'marriage_consanguineous')
+    curves = power_curves(effects, sample_sizes=range(50, 2001, 50))
+    plot_power_curves(curves, 'power_curves.png')
+
+    python survey_tools/power.py A/DataA/Data2.csv "5) Religion:" \\
+        "2) Is your marriage consanguineous (i.e., with a blood relative)?"
+"""
+
+import argparse
+import os
+import sys
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+from scipy import stats
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from survey_tools.association import chi_square_statistics
+
+TESTS = ('chi2', 'trend')
+
+DEFAULT_REPLICATES = 2000
+DEFAULT_TARGET_POWER = 0.8
+
+# Surveys simulated per vectorized batch
+SIM_BATCH = 20_000
+
+# Use a process pool once replicates × sample sizes reaches this
+PARALLEL_MIN_WORK = 200_000
+
+# Groups smaller than this give a rate too noisy to plan a survey on
+SMALL_GROUP = 5
+
+
+def estimate_effects(df, predictor, outcome, positive='Yes', min_group=1, ordered=None):
+    """
+    Group shares and outcome rates observed in a survey.
+
+    Args:
+        df: Respondent DataFrame
+        predictor: Grouping column
+        outcome: Yes/no outcome column
+        positive: Outcome answer counted as an event
+        min_group: Groups with fewer respondents are dropped. A rate from
+            one or two respondents is 0% or 100% and alone can make a
+            difference look easy to detect, so a warning is issued for kept
+            groups smaller than SMALL_GROUP
+        ordered: Treat the groups as ordered (enables the trend test);
+            defaults to True for numeric predictors
+
+    Returns:
+        Dict with predictor, outcome, levels, shares, rates, scores (trend
+        scores: the level values if numeric, else 0, 1, ...), ordered and n
+    """
+    data = df[[predictor, outcome]].dropna()
+    counts = pd.crosstab(data[predictor], data[outcome] == positive)
+    counts = counts.reindex(columns=[False, True], fill_value=0)
+    counts = counts[counts.sum(axis=1) >= min_group]
+    sizes = counts.sum(axis=1).to_numpy(dtype=float)
+    small = counts.index[sizes < SMALL_GROUP]
+    if len(small):
+        warnings.warn(f"Groups with fewer than {SMALL_GROUP} respondents give unreliable rates: "
+                      f"{', '.join(map(str, small))} (raise min_group)", stacklevel=2)
+    numeric = pd.api.types.is_numeric_dtype(counts.index)
+    return {
+        'predictor': predictor,
+        'outcome': outcome,
+        'levels': list(counts.index),
+        'shares': sizes / sizes.sum(),
+        'rates': counts[True].to_numpy() / sizes,
+        'scores': counts.index.to_numpy(dtype=float) if numeric else np.arange(len(counts), dtype=float),
+        'ordered': numeric if ordered is None else ordered,
+        'n': int(sizes.sum()),
+    }
+
+
+def simulate_tables(effects, n, size, rng):
+    """
+    Synthetic surveys of n respondents.
+
+    Returns:
+        int array (size, groups, 2): columns are [events, non-events]
+    """
+    sizes = rng.multinomial(n, effects['shares'], size=size)
+    events = rng.binomial(sizes, effects['rates'])
+    return np.stack([events, sizes - events], axis=-1)
+
+
+def chi2_pvalues(tables):
+    """Pearson chi-square p-values for a stack of tables (unused levels dropped from df)."""
+    tables = np.asarray(tables, dtype=float)
+    rows = (tables.sum(axis=-1) > 0).sum(axis=-1)
+    cols = (tables.sum(axis=-2) > 0).sum(axis=-1)
+    dof = (rows - 1) * (cols - 1)
+    with np.errstate(invalid='ignore'):
+        return np.where(dof > 0, stats.chi2.sf(chi_square_statistics(tables), np.maximum(dof, 1)), 1.0)
+
+
+def trend_pvalues(tables, scores):
+    """Two-sided Cochran-Armitage trend test p-values for a stack of (groups × 2) tables."""
+    tables = np.asarray(tables, dtype=float)
+    events, sizes = tables[..., 0], tables.sum(axis=-1)
+    total = sizes.sum(axis=-1)
+    p = events.sum(axis=-1) / total
+    statistic = (events * scores).sum(axis=-1) - p * (sizes * scores).sum(axis=-1)
+    spread = (sizes * scores ** 2).sum(axis=-1) - (sizes * scores).sum(axis=-1) ** 2 / total
+    variance = p * (1 - p) * spread
+    with np.errstate(divide='ignore', invalid='ignore'):
+        z = statistic / np.sqrt(variance)
+    return np.where(variance > 0, 2 * stats.norm.sf(np.abs(z)), 1.0)
+
+
+def _power_block(args):
+    """
+    Power of each test at one sample size.
+
+    Runs in a worker process; simulates the replicates in vectorized batches.
+    """
+    effects, n, replicates, tests, alpha, seed = args
+    rng = np.random.default_rng(seed)
+    rejections = dict.fromkeys(tests, 0)
+    done = 0
+    while done < replicates:
+        size = min(SIM_BATCH, replicates - done)
+        tables = simulate_tables(effects, n, size, rng)
+        for test in tests:
+            p = chi2_pvalues(tables) if test == 'chi2' else trend_pvalues(tables, effects['scores'])
+            rejections[test] += int((p < alpha).sum())
+        done += size
+    return rejections
+
+
+def power_curves(effects, sample_sizes, replicates=DEFAULT_REPLICATES, tests=None, alpha=0.05,
+                 workers=None, seed=0):
+    """
+    Simulated power against total sample size.
+
+    Args:
+        effects: Output of estimate_effects
+        sample_sizes: Total respondents per simulated survey
+        replicates: Surveys simulated per sample size
+        tests: Subset of TESTS; defaults to chi2, plus trend when the groups
+            are ordered
+        alpha: Significance level
+        workers: Process count; None picks os.cpu_count() when the work is
+            large and 1 otherwise
+        seed: Random seed (each sample size gets its own stream)
+
+    Returns:
+        Tidy DataFrame: n, test, power, mc_error (binomial standard error
+        of the power estimate), replicates
+    """
+    if tests is None:
+        tests = ('chi2', 'trend') if effects['ordered'] else ('chi2',)
+    unknown = set(tests) - set(TESTS)
+    if unknown:
+        raise ValueError(f"tests must be drawn from {TESTS}, got {sorted(unknown)}")
+    sample_sizes = [int(n) for n in sample_sizes]
+    if workers is None:
+        workers = (os.cpu_count() or 1) if replicates * len(sample_sizes) >= PARALLEL_MIN_WORK else 1
+
+    seeds = np.random.SeedSequence(seed).spawn(len(sample_sizes))
+    jobs = [(effects, n, replicates, tuple(tests), alpha, child) for n, child in zip(sample_sizes, seeds)]
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_power_block, jobs))
+    else:
+        results = [_power_block(job) for job in jobs]
+
+    rows = []
+    for n, rejections in zip(sample_sizes, results):
+        for test in tests:
+            power = rejections[test] / replicates
+            rows.append({'n': n, 'test': test, 'power': power,
+                         'mc_error': np.sqrt(power * (1 - power) / replicates), 'replicates': replicates})
+    return pd.DataFrame(rows)
+
+
+def required_sample_size(curves, target=DEFAULT_TARGET_POWER):
+    """
+    Smallest simulated n reaching the target power, per test.
+
+    Returns:
+        {test: n or None if no simulated size reaches it}
+    """
+    out = {}
+    for test, curve in curves.groupby('test', sort=False):
+        reached = curve.loc[curve['power'] >= target, 'n']
+        out[test] = int(reached.min()) if len(reached) else None
+    return out
+
+
+def plot_power_curves(curves, filename=None, title='Power vs sample size', target=DEFAULT_TARGET_POWER,
+                      metadata=None):
+    """
+    Power curve per test (and per effect, if curves has a 'label' column)
+    with ±2 Monte Carlo error bands and the target power line.
+
+    Returns:
+        The matplotlib Figure
+    """
+    keys = ['label', 'test'] if 'label' in curves else ['test']
+    fig, ax = plt.subplots(figsize=(12, 7))
+    for key, curve in curves.groupby(keys, sort=False):
+        key = key if isinstance(key, tuple) else (key,)
+        line, = ax.plot(curve['n'], curve['power'], marker='o', markersize=4, linewidth=2,
+                        label=' – '.join(str(part) for part in key))
+        ax.fill_between(curve['n'], curve['power'] - 2 * curve['mc_error'],
+                        curve['power'] + 2 * curve['mc_error'], color=line.get_color(), alpha=0.15)
+
+    ax.axhline(target, color='grey', linestyle='--', linewidth=1.2)
+    ax.text(ax.get_xlim()[0], target, f' target {target:.0%}', va='bottom', fontsize=10, color='grey')
+    ax.set_ylim(0, 1.02)
+    ax.set_xlabel('Respondents per survey (n)', fontsize=12, fontweight='bold')
+    ax.set_ylabel('Power', fontsize=12, fontweight='bold')
+    ax.set_title(title, fontsize=14, fontweight='bold', pad=20)
+    ax.legend(loc='lower right', fontsize=10)
+    ax.grid(True, linestyle='--', alpha=0.3)
+    ax.set_axisbelow(True)
+    plt.tight_layout()
+
+    if filename:
+        fig.savefig(filename, dpi=300, bbox_inches='tight', metadata=metadata)
+        plt.close(fig)
+    return fig
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Simulated power to detect differences in a yes/no rate')
+    parser.add_argument('csv', help='Survey CSV the effect sizes are estimated from')
+    parser.add_argument('predictor', help='Grouping column')
+    parser.add_argument('outcome', help='Yes/no outcome column')
+    parser.add_argument('--positive', default='Yes', help='Outcome answer counted as an event (default: Yes)')
+    parser.add_argument('--min-group', type=int, default=1,
+                        help='Leave out groups with fewer respondents (default: 1)')
+    parser.add_argument('--sizes', default='50:2000:50', help='Sample sizes as start:stop:step (default: 50:2000:50)')
+    parser.add_argument('--replicates', type=int, default=DEFAULT_REPLICATES,
+                        help=f'Surveys per sample size (default: {DEFAULT_REPLICATES})')
+    parser.add_argument('--alpha', type=float, default=0.05, help='Significance level (default: 0.05)')
+    parser.add_argument('--workers', type=int, help='Worker processes (default: automatic)')
+    parser.add_argument('--plot', help='Save the power curves to this PNG')
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.csv)
+    df.columns = df.columns.str.strip()
+    df[args.outcome] = df[args.outcome].str.strip()
+    start, stop, step = (int(part) for part in args.sizes.split(':'))
+    effects = estimate_effects(df, args.predictor, args.outcome, positive=args.positive,
+                               min_group=args.min_group)
+    curves = power_curves(effects, range(start, stop + 1, step), replicates=args.replicates,
+                          alpha=args.alpha, workers=args.workers)
+
+    print(f"📊 {args.outcome} by {args.predictor} (estimated from n = {effects['n']})")
+    for level, share, rate in zip(effects['levels'], effects['shares'], effects['rates']):
+        print(f"   {str(level):<20} share {share:6.1%}   rate {rate:6.1%}")
+    print(curves.pivot(index='n', columns='test', values='power').round(3).to_string())
+    for test, n in required_sample_size(curves).items():
+        print(f"   n for {DEFAULT_TARGET_POWER:.0%} power ({test}): {n if n else 'not reached'}")
+    if args.plot:
+        plot_power_curves(curves, args.plot, title=f'Power: {args.outcome} by {args.predictor}')
+
+
+if __name__ == '__main__':
+    main()
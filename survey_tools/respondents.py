@@ -0,0 +1,253 @@
+"""
+Unified respondent-level store for the Section A questionnaire.
+
+A/DATA.csv, A/DataA/Data2.csv, A/EducationDataSectionA/DATA.csv and
+A/SectionAadress/Data.csv are column slices of the same response sheet:
+row i of every slice is respondent i, and the slices overlap on the
+consanguinity, religion and socioeconomic class columns (the education
+slice even repeats the kuppuswamy column). The store joins them once:
+
+    - every slice column is mapped to its short key through the question
+      registry (question_schema.json), answers are stripped and
+      canonicalized, the class is made numeric;
+    - a key present in several slices (or twice in one) is coalesced in
+      SLICES order, and disagreements between slices are counted in the
+      build report;
+    - trailing rows with no answers are dropped; respondent_id is the row
+      number in the response sheet.
+
+The result is written as one columnar file (an uncompressed .npz: one
+array per column, categorical columns as integer codes plus their level
+array). np.load reads members lazily, so a projection only touches the
+columns it asks for, and the store is rebuilt automatically when a source
+CSV, the question registry, the canonical answer table or this module
+changes, or when STORE_FORMAT is bumped.
+
+Usage:
+    df = load_respondents(['Education_Level', 'Type_Of_Disease'])
+    df = load_respondents(ADDRESS_KEYS, categorical=False, require=['A/SectionAadress/Data.csv'])
+
+    python survey_tools/respondents.py            # build A/respondents.npz and report
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from survey_tools.canonicalize import DEFAULT_TABLE, canonicalize_series, default_table
+from survey_tools.schema import DEFAULT_SCHEMA, default_registry, read_questions
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_STORE = ROOT / 'A' / 'respondents.npz'
+
+# Bump when the store layout changes, so existing stores are rebuilt
+STORE_FORMAT = 3
+
+# Files that decide how the sources are turned into the store
+BUILD_INPUTS = [DEFAULT_SCHEMA, DEFAULT_TABLE, Path(__file__).resolve()]
+
+# The Section A address export's headers are not registered questions, so
+# its columns are keyed by position
+ADDRESS_KEYS = ['Consanguinity', 'Socioeconomic_Class', 'Location_Type', 'Spouse_Relation', 'Education_Level']
+
+# Slices in coalescing priority: path under the repository root and, for
+# files whose headers are not registered questions, the keys by position
+SLICES = [
+    ('A/DataA/Data2.csv', None),
+    ('A/DATA.csv', None),
+    ('A/EducationDataSectionA/DATA.csv', None),
+    ('A/SectionAadress/Data.csv', ADDRESS_KEYS),
+]
+
+
+def read_slice(path, positional=None):
+    """
+    One slice with short-key columns and canonical answers.
+
+    Args:
+        path: Slice CSV
+        positional: Keys of the columns by position; None resolves the
+            headers through the question registry
+    """
+    df = read_questions(path, positional=positional)
+    for key in df.columns:
+        if key in default_table().fields:
+            df[key] = canonicalize_series(df[key], key, empty_as_nan=True).astype(object)
+    return df
+
+
+def _signature(paths, root=ROOT):
+    """
+    Store format plus size and modification time of each input (stale-store
+    check), keyed by path relative to root so a moved checkout stays fresh.
+    """
+    signature = {}
+    for path in paths:
+        if path.exists():
+            path = Path(path).resolve()
+            key = path.relative_to(root).as_posix() if path.is_relative_to(root) else str(path)
+            signature[key] = [path.stat().st_size, path.stat().st_mtime_ns]
+    signature['format'] = STORE_FORMAT
+    return signature
+
+
+def build_respondents(slices=SLICES, root=ROOT):
+    """
+    Join the slices into one respondent-level DataFrame.
+
+    Returns:
+        (df indexed by respondent_id with one column per registered
+        question, report dict with sources, rows and conflicts
+        {key: rows where slices disagree})
+    """
+    registry = default_registry()
+    merged, conflicts, sources = {}, {}, []
+    n_rows = 0
+    for relative, positional in slices:
+        path = Path(root) / relative
+        if not path.exists():
+            continue
+        columns = read_slice(path, positional)
+        sources.append(relative)
+        n_rows = max(n_rows, len(columns))
+        for key, series in columns.items():
+            current = merged.get(key)
+            if current is None:
+                merged[key] = series
+                continue
+            current, series = current.align(series)
+            both = current.notna() & series.notna()
+            conflicts[key] = conflicts.get(key, 0) + int((current[both] != series[both]).sum())
+            merged[key] = current.combine_first(series)
+
+    df = pd.DataFrame({key: merged[key].reindex(range(n_rows)) if key in merged else np.nan
+                       for key in registry.questions}, index=pd.RangeIndex(n_rows, name='respondent_id'))
+    answered = np.flatnonzero(df.notna().any(axis=1).to_numpy())
+    df = df.iloc[:answered[-1] + 1 if len(answered) else 0]
+    for key in registry.questions:
+        df[key] = df[key].astype(float) if registry.dtype(key) == 'float' else df[key].astype('category')
+    return df, {'sources': sources, 'rows': len(df), 'conflicts': conflicts}
+
+
+def write_store(df, path=DEFAULT_STORE, meta=None):
+    """Write a respondent DataFrame as a columnar .npz (one member per column)."""
+    arrays = {'respondent_id': df.index.to_numpy(dtype=np.int32)}
+    for key in df.columns:
+        if isinstance(df[key].dtype, pd.CategoricalDtype):
+            arrays[key] = df[key].cat.codes.to_numpy()
+            arrays[f'{key}__levels'] = np.asarray(df[key].cat.categories, dtype=str)
+        else:
+            arrays[key] = df[key].to_numpy(dtype=np.float32)
+    meta = dict(meta or {}, columns=list(df.columns))
+    arrays['__meta__'] = np.array(json.dumps(meta))
+    # Write to a unique temporary file next to the store and swap it in
+    # atomically, so concurrent refreshes never write the same file
+    path = Path(path)
+    handle, temporary = tempfile.mkstemp(prefix=path.stem + '.', suffix='.tmp.npz', dir=path.parent)
+    try:
+        with os.fdopen(handle, 'wb') as file:
+            np.savez(file, **arrays)
+        os.replace(temporary, path)
+    except BaseException:
+        os.unlink(temporary)
+        raise
+
+
+def store_metadata(path=DEFAULT_STORE):
+    """The store's metadata (columns, sources, signature, conflicts)."""
+    with np.load(path, allow_pickle=False) as store:
+        return json.loads(str(store['__meta__']))
+
+
+def refresh_store(path=DEFAULT_STORE, slices=SLICES, root=ROOT, force=False):
+    """
+    Build the store if it is missing or stale (a source CSV or build input
+    changed, or the store format is older).
+
+    Returns:
+        The store's metadata
+    """
+    signature = _signature([Path(root) / relative for relative, _ in slices] + BUILD_INPUTS, Path(root).resolve())
+    if not force and Path(path).exists():
+        meta = store_metadata(path)
+        if meta.get('signature') == signature:
+            return meta
+    df, report = build_respondents(slices, root)
+    write_store(df, path, dict(report, signature=signature))
+    return store_metadata(path)
+
+
+def load_respondents(columns=None, path=DEFAULT_STORE, dropna=False, refresh=True, categorical=True,
+                     require=None):
+    """
+    Project columns out of the respondent store.
+
+    Args:
+        columns: Canonical keys to read (defaults to all)
+        path: Store file
+        dropna: Drop respondents missing any requested column
+        refresh: Rebuild the store first if it is missing or stale
+        categorical: Return answers as categoricals; False gives plain
+            text columns (as read from a CSV)
+        require: Slices (paths as in SLICES) that must be in the store,
+            for columns only those slices provide
+
+    Returns:
+        DataFrame indexed by respondent_id
+
+    Raises:
+        KeyError: for a column not in the store
+        FileNotFoundError: if a required slice was not available
+    """
+    meta = refresh_store(path) if refresh else store_metadata(path)
+    absent = [source for source in (require or []) if source not in meta['sources']]
+    if absent:
+        raise FileNotFoundError(f"Not in the respondent store (missing source CSV): {absent}")
+    columns = meta['columns'] if columns is None else [columns] if isinstance(columns, str) else list(columns)
+    unknown = [col for col in columns if col not in meta['columns']]
+    if unknown:
+        raise KeyError(f"Not in the respondent store: {unknown}")
+
+    with np.load(path, allow_pickle=False) as store:
+        data = {}
+        for col in columns:
+            values = store[col]
+            if f'{col}__levels' in store.files:
+                values = pd.Categorical.from_codes(values, categories=store[f'{col}__levels'])
+                if not categorical:
+                    values = values.astype(object)
+            data[col] = values
+        index = pd.Index(store['respondent_id'], name='respondent_id')
+    df = pd.DataFrame(data, index=index)
+    return df.dropna() if dropna else df
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the Section A respondent store')
+    parser.add_argument('--store', default=str(DEFAULT_STORE), help='Store file (default: A/respondents.npz)')
+    parser.add_argument('--force', action='store_true', help='Rebuild even if the sources are unchanged')
+    args = parser.parse_args()
+
+    meta = refresh_store(args.store, force=args.force)
+    df = load_respondents(path=args.store, refresh=False)
+    print(f"📦 {args.store}: {meta['rows']} respondents from {len(meta['sources'])} slices")
+    for source in meta['sources']:
+        print(f"   {source}")
+    print("\nColumn             answered  levels")
+    for col in df.columns:
+        levels = df[col].cat.categories.size if isinstance(df[col].dtype, pd.CategoricalDtype) else df[col].nunique()
+        print(f"{col:<20} {df[col].notna().sum():>6}  {levels:>6}")
+    for key, count in meta['conflicts'].items():
+        if count:
+            print(f"⚠️  {key}: {count} respondents answered differently in two slices (first slice kept)")
+
+
+if __name__ == '__main__':
+    main()
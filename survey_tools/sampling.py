@@ -0,0 +1,223 @@
+"""
+Approximate answers from stratified reservoir samples.
+
+For exploratory charts over very large pooled exports, a crosstab from a
+few thousand respondents per stratum is as good as an exact one once its
+error bound is shown. StratifiedReservoir keeps a uniform random sample of
+at most `capacity` rows per stratum (section, district, ...) while the
+export is ingested chunk by chunk, and counts every row it sees, so the
+stratum sizes are always exact.
+
+Ingest is reservoir sampling (Algorithm R) vectorized over a chunk: the
+t-th row of a stratum (0-based) is kept outright while the stratum has
+free slots and otherwise replaces slot j = floor(u (t + 1)) when j < k.
+Rows of one chunk that draw the same slot are applied in file order (the
+last one wins), so the result is exactly that of the row-by-row algorithm.
+
+Queries weight every sampled row by N_s / n_s (rows seen / rows kept in
+its stratum) and report Taylor-linearized standard errors with the
+strata as design strata and a finite-population correction of
+(1 - n_s/N_s) per stratum (survey_tools.variance), as ±z·se error bounds.
+While no stratum has overflowed, the reservoir holds every row and
+answers are exact (zero-width bounds) — small data never pays for
+sampling.
+
+Usage:
+    reservoir = StratifiedReservoir('Location_Type', capacity=5000)
+    for chunk in pd.read_csv('pooled.csv', chunksize=100_000):
+        reservoir.ingest(chunk)
+    answer = reservoir.crosstab('Education_Level', 'Consanguinity')
+    print(format_answer(answer))
+
+    python survey_tools/sampling.py pooled.csv "Religion:" "Is your marriage consanguineous?" \\
+        --strata "Location" --capacity 5000
+"""
+
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from survey_tools.variance import crosstab_se
+from survey_tools.weights import weighted_crosstab, weighted_value_counts
+
+DEFAULT_CAPACITY = 5000
+DEFAULT_CONFIDENCE = 0.95
+
+# Stratum label for rows whose stratum value is missing
+MISSING_STRATUM = '(missing)'
+
+
+class StratifiedReservoir:
+    """
+    Per-stratum reservoir samples of a row stream, with exact stratum sizes.
+
+    Attributes:
+        seen: {stratum: rows ingested}
+        samples: {stratum: DataFrame of at most capacity sampled rows}
+    """
+
+    def __init__(self, strata, capacity=DEFAULT_CAPACITY, columns=None, seed=0):
+        self.strata = strata
+        self.capacity = capacity
+        self.columns = columns
+        self.rng = np.random.default_rng(seed)
+        self.seen = {}
+        self.samples = {}
+        self._frame = None
+
+    @property
+    def exact(self):
+        """True while every ingested row is still in the sample."""
+        return all(self.seen[s] <= self.capacity for s in self.seen)
+
+    @property
+    def rows_seen(self):
+        return sum(self.seen.values())
+
+    def ingest(self, chunk):
+        """Add a chunk of rows (a DataFrame containing the strata column)."""
+        if self.columns is not None:
+            chunk = chunk[list(dict.fromkeys([self.strata] + list(self.columns)))]
+        labels = chunk[self.strata].astype(object).where(chunk[self.strata].notna(), MISSING_STRATUM)
+        for stratum, rows in chunk.groupby(labels.to_numpy(), sort=False):
+            self._ingest_stratum(stratum, rows)
+        self._frame = None
+        return self
+
+    def _ingest_stratum(self, stratum, rows):
+        k = self.capacity
+        seen = self.seen.get(stratum, 0)
+        sample = self.samples.get(stratum)
+        # Fill free slots first
+        free = max(0, k - seen)
+        if free:
+            head = rows.iloc[:free]
+            sample = head.copy() if sample is None else pd.concat([sample, head], ignore_index=True)
+        rest = rows.iloc[free:]
+        if len(rest):
+            positions = seen + free + np.arange(len(rest))
+            slots = (self.rng.random(len(rest)) * (positions + 1)).astype(np.int64)
+            accepted = np.flatnonzero(slots < k)
+            # Later rows drawing the same slot overwrite earlier ones
+            slots, last = np.unique(slots[accepted][::-1], return_index=True)
+            chosen = accepted[::-1][last]
+            if len(slots):
+                sample.iloc[slots] = rest.iloc[chosen].to_numpy()
+        self.samples[stratum] = sample.reset_index(drop=True)
+        self.seen[stratum] = seen + len(rows)
+
+    def sample_frame(self):
+        """
+        All sampled rows with their expansion weights.
+
+        Returns:
+            DataFrame of the sampled rows plus 'stratum' and 'weight'
+            (rows seen / rows kept in the stratum); cached until the next
+            ingest
+        """
+        if self._frame is None:
+            frames = [sample.assign(stratum=stratum, weight=self.seen[stratum] / len(sample))
+                      for stratum, sample in self.samples.items() if len(sample)]
+            self._frame = (pd.concat(frames, ignore_index=True) if frames
+                           else pd.DataFrame(columns=['stratum', 'weight']))
+        return self._frame
+
+    def crosstab(self, index, columns=None, percent_of='row', confidence=DEFAULT_CONFIDENCE):
+        """
+        Crosstab percentages (and estimated counts) with error bounds.
+
+        Args:
+            index: Row variable
+            columns: Column variable; None gives a one-way distribution
+            percent_of: 'row', 'column' or 'all'
+            confidence: Level of the ±z·se bounds
+
+        Returns:
+            Dict with pct, se, low, high (DataFrames in percent), count
+            (estimated population counts), exact, sample_size and
+            population
+        """
+        sample = self.sample_frame()
+        exact = self.exact
+        if exact:
+            pct, se = crosstab_se(sample[index], None if columns is None else sample[columns],
+                                  percent_of=percent_of)
+            se = se * 0.0
+        else:
+            # Finite-population correction: a stratum held in full adds no variance
+            fraction = {stratum: len(rows) / self.seen[stratum] for stratum, rows in self.samples.items()
+                        if self.seen[stratum]}
+            pct, se = crosstab_se(sample[index], None if columns is None else sample[columns],
+                                  weights=sample['weight'].to_numpy(), percent_of=percent_of,
+                                  strata=sample['stratum'], fpc=sample['stratum'].map(fraction).to_numpy())
+        z = stats.norm.ppf(0.5 + confidence / 2)
+        count = _weighted_counts(sample, index, columns, pct)
+        return {
+            'pct': pct,
+            'se': se,
+            'low': (pct - z * se).clip(lower=0),
+            'high': (pct + z * se).clip(upper=100),
+            'count': count,
+            'exact': exact,
+            'sample_size': len(sample),
+            'population': self.rows_seen,
+        }
+
+    def value_counts(self, column, confidence=DEFAULT_CONFIDENCE):
+        """One-way distribution of a column (see crosstab)."""
+        return self.crosstab(column, None, percent_of='all', confidence=confidence)
+
+
+def _weighted_counts(sample, index, columns, like):
+    """Estimated population counts (summed weights), shaped like `like`."""
+    weights = sample['weight'].to_numpy()
+    if columns is None:
+        counts = weighted_value_counts(sample[index], weights, sort=False).to_frame(name=like.columns[0])
+    else:
+        counts = weighted_crosstab(sample[index], sample[columns], weights)
+    return counts.reindex(index=like.index, columns=like.columns).fillna(0.0)
+
+
+def format_answer(answer, digits=1):
+    """Percentages with their bounds ('37.5 ± 4.2', or '37.5' when exact), as a DataFrame."""
+    text = answer['pct'].map(f'{{:.{digits}f}}'.format)
+    if answer['exact']:
+        return text
+    margin = (answer['high'] - answer['low']) / 2
+    return text + ' ± ' + margin.map(f'{{:.{digits}f}}'.format)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Approximate crosstab of a large CSV from stratified reservoir samples')
+    parser.add_argument('csv', help='Survey export')
+    parser.add_argument('index', help='Row variable')
+    parser.add_argument('columns', nargs='?', help='Column variable (omit for a one-way table)')
+    parser.add_argument('--strata', required=True, help='Stratum column (section, district, ...)')
+    parser.add_argument('--capacity', type=int, default=DEFAULT_CAPACITY,
+                        help=f'Rows kept per stratum (default: {DEFAULT_CAPACITY})')
+    parser.add_argument('--chunksize', type=int, default=100_000, help='Rows read per chunk (default: 100,000)')
+    parser.add_argument('--confidence', type=float, default=DEFAULT_CONFIDENCE,
+                        help='Confidence level of the bounds (default: 0.95)')
+    args = parser.parse_args()
+
+    wanted = {args.strata, args.index} | ({args.columns} if args.columns else set())
+    reservoir = StratifiedReservoir(args.strata, capacity=args.capacity)
+    for chunk in pd.read_csv(args.csv, chunksize=args.chunksize,
+                             usecols=lambda header: header.strip() in wanted):
+        chunk.columns = chunk.columns.str.strip()
+        reservoir.ingest(chunk.apply(lambda col: col.str.strip() if pd.api.types.is_string_dtype(col) else col))
+
+    answer = reservoir.crosstab(args.index, args.columns, confidence=args.confidence)
+    mode = 'exact' if answer['exact'] else f"sampled, ±{args.confidence:.0%} bounds"
+    print(f"📊 {args.index}{' × ' + args.columns if args.columns else ''}: "
+          f"{answer['sample_size']:,} of {answer['population']:,} rows ({mode})")
+    print(format_answer(answer).to_string())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,181 @@
+"""
+Question-header schema registry.
+
+Survey exports use the full question text as the column header, with
+numbering, stray spaces and embedded newlines that drift between exports
+("2) Is your marriage consanguineous (i.e., with a blood relative)?\\n",
+"  (If Yes) What is the relation between you and your spouse?"). The
+registry (question_schema.json) gives every question a stable short key,
+its dtype and the header spellings seen so far. Headers are matched on a
+normalized form:
+
+    - leading question numbering ('2) ', '7.', 'Q3:') is removed;
+    - pandas' duplicate-header suffix ('.1') is removed;
+    - case, punctuation, spacing and newlines are ignored.
+
+Matching is one dictionary lookup per header, so a wide export with
+hundreds of questions is resolved from its header row alone, and
+read_questions() then parses only the requested columns (usecols) with
+explicit dtypes.
+
+Usage:
+    df = read_questions('DATA.csv', ['Sex', 'Type_Of_Disease', 'Religion'])
+
+    python survey_tools/schema.py A/EducationDataSectionA/DATA.csv
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from survey_tools.canonicalize import comparison_key
+
+DEFAULT_SCHEMA = Path(__file__).resolve().parent / 'question_schema.json'
+
+DTYPES = ('category', 'float')
+
+_NUMBERING = re.compile(r'^\s*(?:q\s*)?\d+\s*[).:\-]\s*', re.IGNORECASE)
+_DUPLICATE_SUFFIX = re.compile(r'\.\d+$')
+
+
+def normalize_header(header):
+    """Matching key of a header ('2) Is your marriage ...?\\n' → 'is your marriage ...')."""
+    text = _DUPLICATE_SUFFIX.sub('', str(header).strip())
+    return comparison_key(_NUMBERING.sub('', text))
+
+
+class QuestionRegistry:
+    """
+    Short keys, dtypes and header spellings of the survey questions.
+
+    JSON layout:
+        {"Religion": {"question": "Religion:", "dtype": "category",
+                      "headers": ["5) Religion:"]}}
+    """
+
+    def __init__(self, questions=None, path=None):
+        self.questions = questions or {}
+        self.path = Path(path) if path else None
+        self._keys = {}
+        for key, entry in self.questions.items():
+            if entry.get('dtype', 'category') not in DTYPES:
+                raise ValueError(f"{key}: dtype must be one of {DTYPES}, got {entry['dtype']!r}")
+            for text in [key, entry.get('question', '')] + entry.get('headers', []):
+                if text:
+                    self._keys[normalize_header(text)] = key
+
+    @classmethod
+    def load(cls, path=DEFAULT_SCHEMA):
+        path = Path(path)
+        return cls(json.loads(path.read_text(encoding='utf-8')), path)
+
+    def key_for(self, header):
+        """Short key of a header, or None if the question is not registered."""
+        return self._keys.get(normalize_header(header))
+
+    def dtype(self, key):
+        return self.questions[key].get('dtype', 'category')
+
+    def match_columns(self, headers):
+        """
+        Registered headers of a file.
+
+        Returns:
+            {header: key} in file order (several headers may share a key)
+        """
+        matched = {}
+        for header in headers:
+            key = self.key_for(header)
+            if key is not None:
+                matched[header] = key
+        return matched
+
+
+_default_registry = None
+
+
+def default_registry():
+    """The repository's question registry (loaded once)."""
+    global _default_registry
+    if _default_registry is None:
+        _default_registry = QuestionRegistry.load()
+    return _default_registry
+
+
+def read_questions(path, keys=None, registry=None, strip=True, positional=None, **options):
+    """
+    Read only the registered columns of a survey CSV, renamed to short keys.
+
+    Headers are resolved from the header row, then the file is parsed with
+    usecols and explicit dtypes: 'category' questions as text (stripped,
+    empty answers as NaN), 'float' questions as numbers (unparseable
+    answers as NaN). A key matched by several headers (a repeated column)
+    is coalesced left to right.
+
+    Args:
+        path: CSV file
+        keys: Short keys to read, in output order (defaults to every
+            registered question in the file)
+        registry: QuestionRegistry (defaults to question_schema.json)
+        strip: Strip whitespace from text answers
+        positional: Keys of the first columns by position, for exports
+            whose headers are not registered questions (the header text is
+            then ignored)
+        options: Passed to pd.read_csv
+
+    Returns:
+        DataFrame with one column per key
+
+    Raises:
+        KeyError: if a requested key has no column in the file
+    """
+    registry = registry or default_registry()
+    headers = pd.read_csv(path, nrows=0, **options).columns
+    if positional is None:
+        matched = registry.match_columns(headers)
+    else:
+        matched = dict(zip(headers, positional))
+    keys = list(dict.fromkeys(matched.values())) if keys is None else list(keys)
+    missing = [key for key in keys if key not in matched.values()]
+    if missing:
+        raise KeyError(f"{path}: no column for {missing}")
+
+    usecols = [header for header, key in matched.items() if key in keys]
+    raw = pd.read_csv(path, usecols=usecols, dtype={header: str for header in usecols}, **options)
+
+    columns = {}
+    for header in usecols:
+        key, values = matched[header], raw[header]
+        if registry.dtype(key) == 'float':
+            values = pd.to_numeric(values, errors='coerce').astype(float)
+        elif strip:
+            values = values.str.strip().replace('', np.nan)
+        columns[key] = values if key not in columns else columns[key].combine_first(values)
+    return pd.DataFrame({key: columns[key] for key in keys})
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Show how the headers of a survey CSV match the question registry')
+    parser.add_argument('csv', help='Survey CSV file')
+    parser.add_argument('--schema', default=str(DEFAULT_SCHEMA), help='Registry JSON (default: question_schema.json)')
+    args = parser.parse_args()
+
+    registry = QuestionRegistry.load(args.schema)
+    headers = pd.read_csv(args.csv, nrows=0).columns
+    matched = registry.match_columns(headers)
+    print(f"📋 {args.csv}: {len(matched)} of {len(headers)} headers registered")
+    for header in headers:
+        key = matched.get(header)
+        label = f"{key} ({registry.dtype(key)})" if key else '⚠️  not registered'
+        print(f"   {header.strip()[:70]!r:<74} → {label}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,280 @@
+"""
+Design-based standard errors for weighted crosstab percentages.
+
+Every cell percentage of a crosstab is a ratio of weighted totals,
+p = Σ w y / Σ w x (y: respondent is in the cell, x: respondent is in the
+cell's row, column or the whole table). Two estimators of its variance are
+provided, both computed for all cells of a table at once:
+
+    Taylor linearization  The linearized values z = w (y - p x) / Σ w x
+                          are totalled per primary sampling unit (PSU)
+                          with one bincount, and the between-PSU variance
+                          within strata is read off those totals.
+    Replicate weights     Jackknife (delete one PSU, or one random group
+                          of respondents when there are no clusters) or
+                          balanced repeated replication (BRR, two PSUs per
+                          stratum, Hadamard-balanced half samples). The
+                          replicate weights are one (respondents ×
+                          replicates) float32 array, and the cell totals of
+                          every replicate come from a single sparse
+                          indicator product, cells × replicates.
+
+Usage:
+    pct, se = crosstab_se(df['Location_Type'], df['Consanguineous_Marriage'],
+                          weights=weights, strata=df['Location_Type'])
+    design = jackknife_replicates(weights, clusters=df['Village'])
+    pct, se = crosstab_se(df['Education_Level'], df['Consanguineous_Marriage'], design=design)
+"""
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.linalg import hadamard
+
+# Delete-a-group jackknife: random groups used when there are no clusters
+DEFAULT_JACKKNIFE_GROUPS = 100
+
+# Replicates multiplied into the indicator matrix at a time
+REPLICATE_CHUNK = 256
+
+METHODS = ('taylor', 'jackknife', 'brr')
+PERCENT_OF = ('row', 'column', 'all')
+
+
+class ReplicateDesign:
+    """
+    Replicate weights and the factors that turn replicate deviations into a
+    variance.
+
+    Attributes:
+        weights: Full-sample weights (n,)
+        replicate_weights: float32 array (n × R)
+        scale: float64 array (R,); variance = Σ_r scale_r (θ_r - θ)²
+        method: 'jackknife' or 'brr'
+    """
+
+    def __init__(self, weights, replicate_weights, scale, method):
+        self.weights = np.asarray(weights, dtype=float)
+        self.replicate_weights = np.asarray(replicate_weights, dtype=np.float32)
+        self.scale = np.asarray(scale, dtype=float)
+        self.method = method
+
+    @property
+    def n_replicates(self):
+        return self.replicate_weights.shape[1]
+
+    def variance(self, estimate, replicate_estimates):
+        """Variance from a full-sample estimate (...) and replicate estimates (..., R)."""
+        deviations = np.asarray(replicate_estimates) - np.asarray(estimate)[..., None]
+        return (np.nan_to_num(deviations) ** 2 * self.scale).sum(axis=-1)
+
+
+def _codes(values, n):
+    """Integer codes of an optional grouping (all zeros when None)."""
+    if values is None:
+        return np.zeros(n, dtype=np.int64), 1
+    codes, uniques = pd.factorize(pd.Series(np.asarray(values)), sort=True)
+    if (codes < 0).any():
+        raise ValueError('design variables (strata, clusters) must not be missing')
+    return codes, len(uniques)
+
+
+def _psu_codes(n, clusters, strata, groups, seed):
+    """PSU code per respondent and stratum code per PSU."""
+    strata_codes, _ = _codes(strata, n)
+    if clusters is not None:
+        cluster_codes, _ = _codes(clusters, n)
+    else:
+        # No clusters: random groups within each stratum act as PSUs
+        rng = np.random.default_rng(seed)
+        cluster_codes = rng.permutation(n) % groups
+    # PSUs are nested in strata
+    psu, psu_index = np.unique(np.column_stack([strata_codes, cluster_codes]), axis=0,
+                               return_inverse=True)
+    return psu_index.ravel(), psu[:, 0]
+
+
+def jackknife_replicates(weights, clusters=None, strata=None, groups=DEFAULT_JACKKNIFE_GROUPS, seed=0):
+    """
+    Delete-one-PSU jackknife replicate weights (JK1 without strata, JKn with).
+
+    Without clusters, respondents are split at random into `groups` groups
+    per stratum and one group is deleted per replicate.
+
+    Returns:
+        ReplicateDesign with one replicate per PSU
+    """
+    weights = np.asarray(weights, dtype=float)
+    n = len(weights)
+    psu, psu_stratum = _psu_codes(n, clusters, strata, groups, seed)
+    n_psu = len(psu_stratum)
+    psus_in_stratum = np.bincount(psu_stratum)
+    if (psus_in_stratum < 2).any():
+        raise ValueError('every stratum needs at least two PSUs for the jackknife')
+
+    stratum_of = psu_stratum[psu]
+    replicate_weights = np.empty((n, n_psu), dtype=np.float32)
+    for r in range(n_psu):
+        h = psu_stratum[r]
+        column = weights.copy()
+        in_h = stratum_of == h
+        column[in_h] *= psus_in_stratum[h] / (psus_in_stratum[h] - 1)
+        column[psu == r] = 0.0
+        replicate_weights[:, r] = column
+
+    m = psus_in_stratum[psu_stratum]
+    return ReplicateDesign(weights, replicate_weights, (m - 1) / m, 'jackknife')
+
+
+def brr_replicates(weights, strata, clusters=None, fay=0.0, seed=0):
+    """
+    Balanced repeated replication with Hadamard-balanced half samples.
+
+    Every stratum must have exactly two PSUs; without clusters each stratum
+    is split into two random halves.
+
+    Args:
+        fay: Fay's coefficient (0 is classic BRR; 0.3-0.5 keeps every
+            respondent in every replicate)
+
+    Returns:
+        ReplicateDesign with R replicates, R the smallest power of two
+        above the number of strata
+    """
+    weights = np.asarray(weights, dtype=float)
+    n = len(weights)
+    psu, psu_stratum = _psu_codes(n, clusters, strata, 2, seed)
+    n_strata = int(psu_stratum.max()) + 1
+    if (np.bincount(psu_stratum, minlength=n_strata) != 2).any():
+        raise ValueError('BRR needs exactly two PSUs per stratum')
+
+    size = 1 << int(np.ceil(np.log2(n_strata + 1)))
+    H = hadamard(size)[:, 1:n_strata + 1]
+    # First PSU of each stratum is the one listed first in psu_stratum order
+    first = np.zeros(len(psu_stratum), dtype=bool)
+    first[np.unique(psu_stratum, return_index=True)[1]] = True
+    keep_first = H[:, psu_stratum].T == 1                      # (PSUs × R)
+    chosen = np.where(first[:, None], keep_first, ~keep_first)
+    factors = np.where(chosen, 2 - fay, fay).astype(np.float32)
+    replicate_weights = weights.astype(np.float32)[:, None] * factors[psu]
+    scale = np.full(size, 1 / (size * (1 - fay) ** 2))
+    return ReplicateDesign(weights, replicate_weights, scale, 'brr')
+
+
+def _cell_layout(index, columns, percent_of):
+    """Cell and denominator codes of the valid respondents."""
+    row_codes, row_levels = pd.factorize(index, sort=True, use_na_sentinel=True)
+    if columns is None:
+        col_codes, col_levels = np.zeros(len(row_codes), dtype=np.int64), pd.Index(['percent'])
+        percent_of = 'column'
+    else:
+        col_codes, col_levels = pd.factorize(columns, sort=True, use_na_sentinel=True)
+    valid = (row_codes >= 0) & (col_codes >= 0)
+    k_rows, k_cols = len(row_levels), len(col_levels)
+    cells = row_codes * k_cols + col_codes
+    rows_of_cell = np.repeat(np.arange(k_rows), k_cols)
+    cols_of_cell = np.tile(np.arange(k_cols), k_rows)
+    if percent_of == 'row':
+        group, group_of_cell, n_groups = row_codes, rows_of_cell, k_rows
+    elif percent_of == 'column':
+        group, group_of_cell, n_groups = col_codes, cols_of_cell, k_cols
+    else:
+        group, group_of_cell, n_groups = np.zeros_like(row_codes), np.zeros(k_rows * k_cols, dtype=np.int64), 1
+    return valid, cells, group, group_of_cell, n_groups, row_levels, col_levels
+
+
+def crosstab_se(index, columns=None, weights=None, percent_of='row', method='taylor',
+                clusters=None, strata=None, design=None, fpc=None):
+    """
+    Weighted cell percentages and their standard errors.
+
+    Args:
+        index: Row variable
+        columns: Column variable; None gives a one-way distribution
+        weights: Respondent weights (defaults to 1; ignored if design is given)
+        percent_of: 'row', 'column' or 'all' (the percentage denominator)
+        method: 'taylor', 'jackknife' or 'brr' (ignored if design is given)
+        clusters: PSU of each respondent (e.g. village); None treats
+            respondents as independent
+        strata: Stratum of each respondent
+        design: Precomputed ReplicateDesign (reused across tables)
+        fpc: Sampling fraction n_s/N_s of each respondent's stratum; the
+            Taylor stratum variance is multiplied by (1 - n_s/N_s), so a
+            fully enumerated stratum contributes none (taylor only)
+
+    Returns:
+        (pct, se): DataFrames shaped like pd.crosstab, in percent
+    """
+    if percent_of not in PERCENT_OF:
+        raise ValueError(f"percent_of must be one of {PERCENT_OF}, got {percent_of!r}")
+    n = len(index)
+    if design is not None:
+        method, weights = design.method, design.weights
+    elif method not in METHODS:
+        raise ValueError(f"method must be one of {METHODS}, got {method!r}")
+    weights = np.ones(n) if weights is None else np.asarray(weights, dtype=float)
+
+    valid, cells, group, group_of_cell, n_groups, row_levels, col_levels = \
+        _cell_layout(index, columns, percent_of)
+    k = len(row_levels) * len(col_levels)
+    w = np.where(valid, weights, 0.0)
+    cell_totals = np.bincount(cells[valid], weights=w[valid], minlength=k)
+    group_totals = np.bincount(group[valid], weights=w[valid], minlength=n_groups)
+    denominators = group_totals[group_of_cell]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        p = cell_totals / denominators
+
+    if method == 'taylor':
+        psu, psu_stratum = _psu_codes(n, clusters, strata, n, 0) if clusters is not None \
+            else (np.arange(n), _codes(strata, n)[0])
+        n_psu = len(psu_stratum)
+        # PSU totals of y (per cell) and x (per denominator group)
+        y = np.bincount(psu[valid] * k + cells[valid], weights=w[valid],
+                        minlength=n_psu * k).reshape(n_psu, k)
+        x = np.bincount(psu[valid] * n_groups + group[valid], weights=w[valid],
+                        minlength=n_psu * n_groups).reshape(n_psu, n_groups)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            z = (y - p * x[:, group_of_cell]) / denominators
+        m = np.bincount(psu_stratum).astype(float)
+        stratum_means = np.zeros((len(m), k))
+        np.add.at(stratum_means, psu_stratum, z)
+        stratum_means /= m[:, None]
+        deviations = z - stratum_means[psu_stratum]
+        factor = np.where(m > 1, m / np.maximum(m - 1, 1), 0.0)
+        if fpc is not None:
+            fraction = np.zeros(len(m))
+            fraction[psu_stratum[psu]] = np.asarray(fpc, dtype=float)
+            factor *= 1 - np.clip(fraction, 0.0, 1.0)
+        factor = factor[psu_stratum]
+        variance = (factor[:, None] * deviations ** 2).sum(axis=0)
+    else:
+        if design is None:
+            design = jackknife_replicates(weights, clusters, strata) if method == 'jackknife' \
+                else brr_replicates(weights, strata, clusters)
+        rows = np.flatnonzero(valid)
+        cell_indicator = sparse.csr_matrix((np.ones(len(rows), dtype=np.float32), (cells[rows], rows)),
+                                           shape=(k, n))
+        group_indicator = sparse.csr_matrix((np.ones(len(rows), dtype=np.float32), (group[rows], rows)),
+                                            shape=(n_groups, n))
+        variance = np.zeros(k)
+        for start in range(0, design.n_replicates, REPLICATE_CHUNK):
+            block = design.replicate_weights[:, start:start + REPLICATE_CHUNK]
+            y_rep = np.asarray(cell_indicator @ block, dtype=float)
+            x_rep = np.asarray(group_indicator @ block, dtype=float)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                deviations = y_rep / x_rep[group_of_cell] - p[:, None]
+            variance += (np.nan_to_num(deviations) ** 2 * design.scale[start:start + block.shape[1]]).sum(axis=1)
+
+    shape = (len(row_levels), len(col_levels))
+    frame = lambda values: pd.DataFrame(values.reshape(shape) * 100,
+                                        index=pd.Index(row_levels, name=getattr(index, 'name', None)),
+                                        columns=pd.Index(col_levels, name=getattr(columns, 'name', None)))
+    return frame(p), frame(np.sqrt(variance))
+
+
+def format_se_table(pct, se, digits=1):
+    """Cells formatted as '37.5 (4.2)'."""
+    return pd.DataFrame(
+        [[f'{p:.{digits}f} ({s:.{digits}f})' if np.isfinite(p) else '–' for p, s in zip(pr, sr)]
+         for pr, sr in zip(pct.to_numpy(), se.to_numpy())],
+        index=pct.index, columns=pct.columns)
@@ -0,0 +1,197 @@
+"""
+Survey weights by raking to known population margins.
+
+Respondents get weights so that the weighted distribution of each raking
+variable (Religion, Location_Type, Socioeconomic_Class, ...) matches the
+population shares in population_margins.json. Raking is iterative
+proportional fitting on the respondent weights: every raking variable is
+factorized once into integer codes, and each step is one weighted
+bincount (current weighted totals per level) plus one gather of the
+per-level adjustment factors back to the respondents:
+
+    w *= (target / np.bincount(codes, weights=w))[codes]
+
+so an iteration over a million respondents is a few array passes.
+
+Respondents with a missing raking variable are left out of that margin
+(its targets are scaled to their weighted total). Population levels absent
+from the sample are dropped and the remaining shares renormalized.
+Margins with no shares are skipped. Weights are returned with mean 1, so
+weighted counts stay on the respondent scale. A margin marked
+"provisional" (placeholder shares awaiting the study region's figures) is
+still raked, but rake() reports it so charts and tables can say so.
+
+Usage:
+    weights = rake(df, load_margins())
+    weighted_crosstab(df['Religion'], df['Consanguinity'], weights)
+"""
+
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_MARGINS = Path(__file__).with_name('population_margins.json')
+
+RAKE_TOLERANCE = 1e-6
+RAKE_MAX_ITER = 100
+
+
+def load_margins(path=DEFAULT_MARGINS):
+    """
+    Population shares per variable from a margins file.
+
+    Returns:
+        {variable: {'aliases': [...], 'shares': {level: share}, 'source': text,
+        'provisional': bool}}
+    """
+    with open(path, encoding='utf-8') as handle:
+        return json.load(handle)
+
+
+def _margin_column(df, name, spec):
+    """Column of df holding the margin variable (its name or an alias)."""
+    for candidate in [name] + list(spec.get('aliases', [])):
+        if candidate in df.columns:
+            return candidate
+    return None
+
+
+def _level_key(value):
+    """Match level labels across types ('2', 2, 2.0 are the same class)."""
+    text = str(value).strip()
+    try:
+        number = float(text)
+        return str(int(number)) if number.is_integer() else text
+    except ValueError:
+        return text
+
+
+def raking_targets(df, margins):
+    """
+    Factorized raking variables and their target shares.
+
+    Returns:
+        List of (column, codes, levels, target_shares) for every margin
+        that has shares and a matching column
+    """
+    targets = []
+    for name, spec in margins.items():
+        shares = {_level_key(level): float(share) for level, share in spec.get('shares', {}).items()}
+        column = _margin_column(df, name, spec)
+        if not shares or column is None:
+            continue
+        codes, levels = pd.factorize(df[column], use_na_sentinel=True)
+        wanted = np.array([shares.get(_level_key(level), np.nan) for level in levels])
+        # Sample levels without a population share are treated as missing
+        codes = np.where((codes >= 0) & ~np.isnan(wanted[np.maximum(codes, 0)]), codes, -1)
+        wanted = np.nan_to_num(wanted)
+        if wanted.sum() > 0:
+            targets.append((column, codes, levels, wanted / wanted.sum()))
+    return targets
+
+
+def rake(df, margins=None, base_weights=None, tol=RAKE_TOLERANCE, max_iter=RAKE_MAX_ITER,
+         cap=None, return_info=False):
+    """
+    Rake respondent weights to population margins.
+
+    Args:
+        df: Respondent DataFrame
+        margins: {variable: {'shares': {level: share}, 'aliases': [...]}}
+            (defaults to load_margins())
+        base_weights: Starting (design) weights; defaults to 1
+        tol: Largest allowed relative gap between weighted and target shares
+        max_iter: Maximum raking cycles
+        cap: Optional upper bound on a weight, as a multiple of the mean
+            weight (trimmed after each cycle)
+        return_info: Also return a dict with iterations, converged, the
+            raked columns, their margin sources ({column: text}) and the
+            raked columns whose margins are provisional
+
+    Returns:
+        float64 array of weights with mean 1 (and the info dict if asked)
+    """
+    margins = load_margins() if margins is None else margins
+    n = len(df)
+    weights = np.ones(n) if base_weights is None else np.asarray(base_weights, dtype=float).copy()
+    targets = raking_targets(df, margins)
+
+    iteration, converged = 0, not targets
+    for iteration in range(1, max_iter + 1 if targets else 1):
+        for _, codes, levels, shares in targets:
+            valid = codes >= 0
+            totals = np.bincount(codes[valid], weights=weights[valid], minlength=len(levels))
+            with np.errstate(divide='ignore', invalid='ignore'):
+                factors = np.where(totals > 0, shares * totals.sum() / totals, 1.0)
+            weights[valid] *= factors[codes[valid]]
+        if cap is not None:
+            np.minimum(weights, cap * weights.mean(), out=weights)
+
+        gap = 0.0
+        for _, codes, levels, shares in targets:
+            valid = codes >= 0
+            totals = np.bincount(codes[valid], weights=weights[valid], minlength=len(levels))
+            gap = max(gap, np.abs(totals / totals.sum() - shares).max() / max(shares.max(), 1e-12))
+        if gap < tol:
+            converged = True
+            break
+
+    if n:
+        weights *= n / weights.sum()
+    if return_info:
+        columns = [column for column, *_ in targets]
+        specs = {_margin_column(df, name, spec): spec for name, spec in margins.items()}
+        return weights, {'iterations': iteration, 'converged': converged, 'columns': columns,
+                         'sources': {column: specs[column].get('source', '') for column in columns},
+                         'provisional': [column for column in columns if specs[column].get('provisional')]}
+    return weights
+
+
+def format_margin_sources(info):
+    """One line per raked margin: 'column: source', flagging provisional targets."""
+    return [f"{column}{' (PROVISIONAL)' if column in info['provisional'] else ''}: {info['sources'][column]}"
+            for column in info['columns']]
+
+
+def design_effect(weights):
+    """Kish design effect of unequal weighting: n Σw² / (Σw)²."""
+    weights = np.asarray(weights, dtype=float)
+    return float(len(weights) * (weights ** 2).sum() / weights.sum() ** 2) if len(weights) else np.nan
+
+
+def effective_sample_size(weights):
+    """(Σw)² / Σw²."""
+    weights = np.asarray(weights, dtype=float)
+    return float(weights.sum() ** 2 / (weights ** 2).sum()) if len(weights) else 0.0
+
+
+def weighted_value_counts(series, weights=None, sort=True):
+    """value_counts with respondent weights (a weighted bincount over the codes)."""
+    codes, levels = pd.factorize(series, sort=True, use_na_sentinel=True)
+    valid = codes >= 0
+    w = None if weights is None else np.asarray(weights, dtype=float)[valid]
+    counts = pd.Series(np.bincount(codes[valid], weights=w, minlength=len(levels)),
+                       index=levels, name='count')
+    return counts.sort_values(ascending=False, kind='stable') if sort else counts
+
+
+def weighted_crosstab(index, columns, weights=None):
+    """
+    pd.crosstab with respondent weights, computed as one weighted bincount.
+
+    Rows missing either value are left out. Without weights the result
+    equals pd.crosstab (as floats).
+    """
+    row_codes, row_levels = pd.factorize(index, sort=True, use_na_sentinel=True)
+    col_codes, col_levels = pd.factorize(columns, sort=True, use_na_sentinel=True)
+    valid = (row_codes >= 0) & (col_codes >= 0)
+    flat = row_codes[valid] * len(col_levels) + col_codes[valid]
+    w = None if weights is None else np.asarray(weights, dtype=float)[valid]
+    counts = np.bincount(flat, weights=w, minlength=len(row_levels) * len(col_levels))
+    table = pd.DataFrame(counts.reshape(len(row_levels), len(col_levels)).astype(float),
+                         index=pd.Index(row_levels, name=getattr(index, 'name', None)),
+                         columns=pd.Index(col_levels, name=getattr(columns, 'name', None)))
+    # Drop levels that only occur in rows with the other value missing
+    return table.loc[table.sum(axis=1) > 0, table.sum(axis=0) > 0]